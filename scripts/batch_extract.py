@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Batch extraction of many athletes' MyApp.db exports.
+
+The source is either a directory or a JSON manifest:
+
+  - Directory: every `<athlete>/MyApp.db` subdirectory (with an optional
+    `<athlete>/polar-user-data/` next to it) and every `<athlete>.db` file.
+  - Manifest: a JSON list of {"athlete": ..., "db": ..., "polar": ...}
+    objects; relative paths are resolved against the manifest's folder. An
+    optional "timezone" overrides the batch timezone for that athlete.
+
+Each athlete is extracted in a bounded process pool into
+`<output_root>/<athlete>/training_*.json`. A fingerprint of the database,
+Polar files, timezone, extractor code and lift config is stored next to the
+outputs so unchanged athletes are skipped.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import extract_data
+from section_cache import code_version
+
+FINGERPRINT_FILE = 'fingerprint.json'
+
+def discover_athletes(source):
+    """Return a list of athlete job dicts (athlete, db, polar) from a directory or manifest."""
+    if os.path.isdir(source):
+        jobs = []
+        for entry in sorted(os.listdir(source)):
+            path = os.path.join(source, entry)
+            if os.path.isdir(path) and os.path.isfile(os.path.join(path, 'MyApp.db')):
+                jobs.append({
+                    'athlete': entry,
+                    'db': os.path.join(path, 'MyApp.db'),
+                    'polar': os.path.join(path, 'polar-user-data'),
+                })
+            elif os.path.isfile(path) and entry.endswith('.db'):
+                jobs.append({'athlete': entry[:-3], 'db': path, 'polar': None})
+        return jobs
+
+    with open(source, encoding='utf-8') as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(source))
+    jobs = []
+    for item in manifest:
+        db_path = os.path.join(base_dir, item['db'])
+        polar = item.get('polar')
+        jobs.append({
+            'athlete': item.get('athlete') or os.path.splitext(os.path.basename(db_path))[0],
+            'db': db_path,
+            'polar': os.path.join(base_dir, polar) if polar else None,
+            'timezone': item.get('timezone'),
+        })
+    return jobs
+
+def athlete_fingerprint(job):
+    """Fingerprint an athlete's inputs: database contents, Polar file listing, timezone,
+    and, as for the section cache, the extractor code and the active lift registry.
+    """
+    return {
+        'db': extract_data.file_fingerprint(job['db']),
+        'polar': extract_data.polar_manifest(job['polar']) if job['polar'] else [],
+        'timezone': job['timezone'],
+        'code': code_version(),
+        'lifts': extract_data.load_lift_registry(),
+    }
+
+def load_previous_fingerprint(out_dir):
+    try:
+        with open(os.path.join(out_dir, FINGERPRINT_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def extract_athlete(job, out_dir, force=False):
+    """Extract one athlete into out_dir; runs inside a worker process."""
+    started = time.perf_counter()
+    result = {'athlete': job['athlete'], 'status': 'ok', 'seconds': 0.0, 'workouts': None, 'error': None}
+    try:
+        fingerprint = athlete_fingerprint(job)
+        # JSON round-trip so tuples compare equal to the lists read back from disk
+        fingerprint = json.loads(json.dumps(fingerprint))
+        output_path = os.path.join(out_dir, 'training_data.json')
+        if not force and os.path.exists(output_path) and load_previous_fingerprint(out_dir) == fingerprint:
+            result['status'] = 'skipped'
+            return result
+
+        os.makedirs(out_dir, exist_ok=True)
+        conn = extract_data.connect_db(job['db'], timezone=job['timezone'], snapshot=job.get('snapshot'))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                data = extract_data.extract_all(conn, polar_dir=job['polar'])
+                extract_data.write_outputs(data, output_path)
+        finally:
+            conn.close()
+
+        with open(os.path.join(out_dir, FINGERPRINT_FILE), 'w') as f:
+            json.dump(fingerprint, f, indent=2)
+        result['workouts'] = data['summary']['totalWorkouts']
+    except (Exception, SystemExit) as e:
+        # connect_db exits on failure; report it like any other error
+        result['status'] = 'failed'
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        result['seconds'] = round(time.perf_counter() - started, 2)
+    return result
+
+def print_results(results, elapsed):
+    """Print the per-athlete summary table."""
+    width = max([len('Athlete')] + [len(r['athlete']) for r in results])
+    print(f"\n{'Athlete':<{width}}  {'Status':<8}  {'Time':>8}  {'Workouts':>8}  Detail")
+    print('-' * (width + 40))
+    for r in results:
+        workouts = '' if r['workouts'] is None else str(r['workouts'])
+        print(f"{r['athlete']:<{width}}  {r['status']:<8}  {r['seconds']:>7.2f}s  {workouts:>8}  {r['error'] or ''}")
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in ('ok', 'skipped', 'failed')}
+    print(f"\n{len(results)} athletes in {elapsed:.2f}s: "
+          f"{counts['ok']} extracted, {counts['skipped']} unchanged, {counts['failed']} failed")
+
+def run_batch(source, output_root, jobs=1, force=False, verbose=False, timezone=None, snapshot=None):
+    """Extract every athlete found in source; returns the number of failures."""
+    athletes = discover_athletes(source)
+    if not athletes:
+        print(f"No athlete databases found in {source}")
+        return 0
+    for job in athletes:
+        job['timezone'] = job.get('timezone') or timezone or extract_data.DEFAULT_TIMEZONE
+        job['snapshot'] = snapshot
+
+    names = [job['athlete'] for job in athletes]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        print(f"Duplicate athlete names in {source}: {', '.join(duplicates)}")
+        return len(duplicates)
+
+    workers = max(1, min(jobs, len(athletes)))
+    print(f"Extracting {len(athletes)} athletes with {workers} worker(s)...")
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(extract_athlete, job, os.path.join(output_root, job['athlete']), force): job
+            for job in athletes
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if verbose:
+                print(f"  {result['athlete']}: {result['status']} ({result['seconds']:.2f}s)")
+
+    results.sort(key=lambda r: r['athlete'])
+    print_results(results, time.perf_counter() - started)
+    return sum(1 for r in results if r['status'] == 'failed')
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract training data for many athletes at once')
+    parser.add_argument('source', help='Directory of athlete databases or a JSON manifest')
+    parser.add_argument('-o', '--out', dest='output_root',
+                        default=os.path.join(extract_data.OUTPUT_DIR, 'athletes'),
+                        help='Root directory for per-athlete output trees')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='Maximum worker processes')
+    parser.add_argument('--force', action='store_true', help='Re-extract athletes whose fingerprint is unchanged')
+    parser.add_argument('--timezone', type=extract_data.timezone_name, default=extract_data.DEFAULT_TIMEZONE,
+                        help='IANA timezone for athletes whose manifest entry sets none')
+    parser.add_argument('--snapshot', choices=extract_data.SNAPSHOT_MODES,
+                        help='Extract each athlete from a consistent read-only image of their database')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
+    args = parser.parse_args()
+
+    failures = run_batch(args.source, args.output_root, jobs=args.jobs, force=args.force, verbose=args.verbose,
+                         timezone=args.timezone, snapshot=args.snapshot)
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
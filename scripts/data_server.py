@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Local HTTP data server around the extractor.
+
+Serves each extraction section as `/data/<section>.json` (e.g.
+`/data/bodyWeight.json`) plus the dashboard bundles `/data/training_core.json`,
+`/data/training_deferred.json` and `/data/training_data.json`. Sections are
+computed lazily on first request and kept in memory until the database or
+Polar files change; after midnight only the sections relative to today are
+recomputed. Responses carry an ETag and conditional requests
+(If-None-Match) are answered with 304 Not Modified.
+
+Concurrent requests for the same section wait on a per-section lock, so a
+section is computed once no matter how many readers ask for it.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import extract_data
+
+SECTION_KEYS = [key for key, _, _, _ in extract_data.SECTIONS]
+
+# Dashboard bundles: name -> (sections needed, payload builder)
+BUNDLES = {
+    'training_core': (extract_data.CORE_SECTIONS, extract_data.core_payload),
+    'training_deferred': (extract_data.DEFERRED_SECTIONS, extract_data.deferred_payload),
+    'training_data': (SECTION_KEYS, lambda data: data),
+}
+
+def db_inode(signature):
+    return signature['db'][0][1] if signature['db'] else None
+
+class Generation:
+    """Computed results for one version of the inputs."""
+
+    def __init__(self, signature):
+        self.signature = signature
+        self.values = {}
+        self.responses = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def lock_for(self, name):
+        with self._locks_guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+class SectionStore:
+    """Lazily computes and caches sections, invalidated when the source signatures change."""
+
+    def __init__(self, db_path, polar_dir=extract_data.POLAR_DIR, timezone=None):
+        self.db_path = db_path
+        self.polar_dir = polar_dir
+        self.timezone = timezone
+        self.polar_cache = {}
+        self.computations = 0
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        self._generation = None
+        self._generation_lock = threading.Lock()
+
+    def current(self):
+        """Return the generation for the current inputs, starting a new one if they changed."""
+        signature = extract_data.source_signatures(self.db_path, self.polar_dir)
+        # Sections relative to the current date go stale at midnight, as in --watch
+        signature['today'] = date.today().isoformat()
+        with self._generation_lock:
+            previous = self._generation
+            if previous is None or previous.signature != signature:
+                if previous is not None and previous.signature['db'] != signature['db']:
+                    with self._conn_lock:
+                        if self._conn is not None and db_inode(previous.signature) != db_inode(signature):
+                            # The database file was replaced; reconnect on next use
+                            self._conn.close()
+                            self._conn = None
+                        elif self._conn is not None:
+                            self._conn.memo.clear()
+                generation = Generation(signature)
+                if previous is not None and all(previous.signature[source] == signature[source]
+                                                for source in signature if source != 'today'):
+                    # Only the date changed: keep every section that does not read it
+                    stale = set(extract_data.sections_reading(['today']))
+                    generation.values = {key: value for key, value in previous.values.items() if key not in stale}
+                self._generation = generation
+            return self._generation
+
+    def _section(self, generation, key):
+        if key in generation.values:
+            return generation.values[key]
+        with generation.lock_for(key):
+            if key in generation.values:
+                value = generation.values[key]
+            else:
+                # One connection is shared, so computations are serialized
+                with self._conn_lock:
+                    if self._conn is None:
+                        self._conn = extract_data.connect_db(self.db_path, check_same_thread=False,
+                                                             timezone=self.timezone)
+                    value = extract_data.extract_all(self._conn, self.polar_dir, sections=[key],
+                                                     polar_cache=self.polar_cache, progress=False)[key]
+                    self.computations += 1
+                generation.values[key] = value
+        return value
+
+    def response(self, name):
+        """Return (body bytes, etag) for a section or bundle name; KeyError if unknown."""
+        generation = self.current()
+        cached = generation.responses.get(name)
+        if cached is not None:
+            return cached
+        if name in BUNDLES:
+            keys, build = BUNDLES[name]
+        elif name in SECTION_KEYS:
+            keys, build = [name], lambda data: data[name]
+        else:
+            raise KeyError(name)
+
+        with generation.lock_for(f"response:{name}"):
+            cached = generation.responses.get(name)
+            if cached is None:
+                data = {key: self._section(generation, key) for key in keys}
+                body = json.dumps(build(data), indent=2).encode('utf-8')
+                etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+                cached = (body, etag)
+                generation.responses[name] = cached
+        return cached
+
+def etag_matches(header, etag):
+    """Evaluate an If-None-Match header (weak comparison) against our ETag."""
+    candidates = [c.strip() for c in header.split(',')]
+    return '*' in candidates or any(c.removeprefix('W/') == etag for c in candidates)
+
+class DataRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'TrainingDataServer/1.0'
+
+    def do_GET(self):
+        self._respond(include_body=True)
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    def _respond(self, include_body):
+        path = urlsplit(self.path).path
+        if path in ('/data', '/data/'):
+            body = json.dumps({'sections': SECTION_KEYS, 'bundles': list(BUNDLES)}, indent=2).encode('utf-8')
+            self._send(HTTPStatus.OK, body, include_body)
+            return
+
+        m = re.fullmatch(r'/data/([A-Za-z_]+)\.json', path)
+        if not m:
+            self._send(HTTPStatus.NOT_FOUND, b'{"error": "not found"}', include_body)
+            return
+
+        try:
+            body, etag = self.server.store.response(m.group(1))
+        except KeyError:
+            self._send(HTTPStatus.NOT_FOUND, b'{"error": "unknown section"}', include_body)
+            return
+        except Exception as e:
+            error = json.dumps({'error': f"{type(e).__name__}: {e}"}).encode('utf-8')
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, error, include_body)
+            return
+
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and etag_matches(if_none_match, etag):
+            self._send(HTTPStatus.NOT_MODIFIED, b'', False, etag)
+        else:
+            self._send(HTTPStatus.OK, body, include_body, etag)
+
+    def _send(self, status, body, include_body, etag=None):
+        self.send_response(status)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        # Always revalidate; unchanged data costs a 304
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(db_path, polar_dir=extract_data.POLAR_DIR, host='127.0.0.1', port=8765, verbose=False,
+                timezone=None):
+    server = ThreadingHTTPServer((host, port), DataRequestHandler)
+    server.daemon_threads = True
+    server.store = SectionStore(db_path, polar_dir, timezone)
+    server.verbose = verbose
+    return server
+
+def serve(db_path, polar_dir=extract_data.POLAR_DIR, host='127.0.0.1', port=8765, verbose=False, timezone=None):
+    server = make_server(db_path, polar_dir, host, port, verbose, timezone)
+    print(f"Serving training data from {db_path} at http://{host}:{server.server_address[1]}/data/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped server")
+    finally:
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve extractor sections over HTTP with lazy computation and ETags')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('--polar-dir', default=extract_data.POLAR_DIR, help='Directory of Polar training-session JSON files')
+    parser.add_argument('--timezone', type=extract_data.timezone_name, default=extract_data.DEFAULT_TIMEZONE,
+                        help='IANA timezone for assigning workouts to days')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('-p', '--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    serve(args.db_path, args.polar_dir, args.host, args.port, args.verbose, args.timezone)
+
+if __name__ == '__main__':
+    main()
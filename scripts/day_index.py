@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Dense per-day training index with prefix sums.
+
+One array slot per calendar day from the first workout to the last holds that
+day's volume, sets, reps, workouts and minutes. Prefix sums over each array
+make the total for any date range two lookups, so "last 90 days" or "this
+training block" never needs another scan of history_exercises.
+
+    python day_index.py --from 2023-01-01 --to 2023-03-31
+    python day_index.py --last 90
+"""
+
+import argparse
+import json
+from array import array
+from datetime import date, timedelta
+
+from local_days import ensure_local_days
+
+# liftingWorkouts counts only workouts with at least one working set (reps > 0),
+# matching the COUNT(DISTINCT h.id) of the joined volume queries
+FIELDS = ('volumeLbs', 'volumeKg', 'sets', 'reps', 'workouts', 'liftingWorkouts', 'minutes', 'activeDays')
+INTEGER_FIELDS = ('sets', 'reps', 'workouts', 'liftingWorkouts', 'activeDays')
+
+DAILY_TOTALS_QUERY = """
+    SELECT
+        hl.day as workout_day,
+        COUNT(*) as workouts,
+        COUNT(v.history_id) as lifting_workouts,
+        SUM(h.duration) as minutes,
+        SUM(v.volume_lbs) as volume_lbs,
+        SUM(v.volume_kg) as volume_kg,
+        SUM(v.sets) as sets,
+        SUM(v.reps) as reps
+    FROM history h
+    JOIN history_local hl ON hl.id = h.id
+    LEFT JOIN (
+        SELECT
+            history_id,
+            SUM(weightlb * reps) as volume_lbs,
+            SUM(weightkg * reps) as volume_kg,
+            COUNT(*) as sets,
+            SUM(reps) as reps
+        FROM history_exercises
+        WHERE reps > 0
+        GROUP BY history_id
+    ) v ON v.history_id = h.id
+    GROUP BY hl.day
+    ORDER BY hl.day
+"""
+
+def to_date(value):
+    """Accept a date or a YYYY-MM-DD string."""
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+class DayIndex:
+    """Per-day arrays from `start` with prefix sums for O(1) range aggregates."""
+
+    def __init__(self, start, days):
+        self.start = start
+        self.days = days
+        self.values = {field: array('d', bytes(8 * days)) for field in FIELDS}
+        self.prefix = None
+
+    @property
+    def end(self):
+        return self.start + timedelta(days=self.days - 1) if self.days else None
+
+    def offset(self, day):
+        return (to_date(day) - self.start).days
+
+    def finalize(self):
+        """Build the prefix sums; prefix[f][i] is the total of the first i days."""
+        self.prefix = {}
+        for field, values in self.values.items():
+            running = 0.0
+            prefix = array('d', [0.0])
+            for value in values:
+                running += value
+                prefix.append(running)
+            self.prefix[field] = prefix
+        return self
+
+    def range_totals(self, start=None, end=None):
+        """Totals for the inclusive date range [start, end], clamped to the indexed span."""
+        lo = 0 if start is None else max(0, self.offset(start))
+        hi = self.days - 1 if end is None else min(self.days - 1, self.offset(end))
+        totals = {}
+        for field in FIELDS:
+            total = self.prefix[field][hi + 1] - self.prefix[field][lo] if hi >= lo else 0.0
+            totals[field] = int(round(total)) if field in INTEGER_FIELDS else round(total, 2)
+        return lo, hi, totals
+
+    def range_stats(self, start=None, end=None):
+        """Totals plus the same derived averages get_summary_stats reports, for any date range."""
+        lo, hi, totals = self.range_totals(start, end)
+        days = max(0, hi - lo + 1)
+        workouts = totals['workouts']
+        weeks = days / 7
+        return {
+            'start': (self.start + timedelta(days=lo)).isoformat() if days else None,
+            'end': (self.start + timedelta(days=hi)).isoformat() if days else None,
+            'days': days,
+            'totalWorkouts': workouts,
+            'trainingDays': totals['activeDays'],
+            'totalSets': totals['sets'],
+            'totalReps': totals['reps'],
+            'totalVolumeLbs': totals['volumeLbs'],
+            'totalVolumeKg': totals['volumeKg'],
+            'totalHours': round(totals['minutes'] / 60, 1),
+            'avgWorkoutDuration': round(totals['minutes'] / workouts, 1) if workouts > 0 else 0,
+            'avgVolumePerWorkoutLbs': round(totals['volumeLbs'] / workouts, 2) if workouts > 0 else 0,
+            'avgVolumePerWorkoutKg': round(totals['volumeKg'] / workouts, 2) if workouts > 0 else 0,
+            'avgSetsPerWorkout': round(totals['sets'] / workouts, 1) if workouts > 0 else 0,
+            'workoutsPerWeekAvg': round(workouts / weeks, 1) if weeks > 0 else 0,
+        }
+
+    def day(self, i):
+        return self.start + timedelta(days=i)
+
+    def lifting_days(self):
+        """Yield (date, volume lbs, volume kg, workouts) for every day with working sets."""
+        values = self.values
+        lifting = values['liftingWorkouts']
+        for i in range(self.days):
+            if lifting[i]:
+                yield self.day(i), values['volumeLbs'][i], values['volumeKg'][i], int(lifting[i])
+
+    def last_days(self, n):
+        """Stats for the n days ending on the last indexed day."""
+        if not self.days:
+            return self.range_stats()
+        return self.range_stats(self.end - timedelta(days=n - 1), self.end)
+
+def build_day_index(conn):
+    """Build the dense per-day index from the history tables in a single grouped query.
+
+    Days are local calendar days in conn.timezone, keyed by their integer ordinal.
+    """
+    ensure_local_days(conn)
+    # Every workout has a local day, so the span is known before the grouped rows are streamed
+    first_day, last_day = conn.execute("SELECT MIN(day), MAX(day) FROM history_local").fetchone()
+    if first_day is None:
+        return DayIndex(date.today(), 0).finalize()
+
+    index = DayIndex(date.fromordinal(first_day), last_day - first_day + 1)
+    values = index.values
+    for workout_day, workouts, lifting_workouts, minutes, volume_lbs, volume_kg, sets, reps in conn.execute(DAILY_TOTALS_QUERY):
+        i = workout_day - first_day
+        values['workouts'][i] = workouts
+        values['liftingWorkouts'][i] = lifting_workouts
+        values['minutes'][i] = minutes or 0
+        values['volumeLbs'][i] = volume_lbs or 0
+        values['volumeKg'][i] = volume_kg or 0
+        values['sets'][i] = sets or 0
+        values['reps'][i] = reps or 0
+        values['activeDays'][i] = 1
+    return index.finalize()
+
+def main():
+    import extract_data
+
+    parser = argparse.ArgumentParser(description='Aggregate training totals over an arbitrary date range')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('--from', dest='start', help='First day of the range (YYYY-MM-DD, default: first workout)')
+    parser.add_argument('--to', dest='end', help='Last day of the range (YYYY-MM-DD, default: last workout)')
+    parser.add_argument('--last', type=int, metavar='DAYS', help='Range covering the last DAYS days of history')
+    parser.add_argument('--timezone', type=extract_data.timezone_name, default=extract_data.DEFAULT_TIMEZONE,
+                        help='IANA timezone for assigning workouts to days')
+    args = parser.parse_args()
+
+    conn = extract_data.connect_db(args.db_path, timezone=args.timezone)
+    index = build_day_index(conn)
+    conn.close()
+
+    stats = index.last_days(args.last) if args.last else index.range_stats(args.start, args.end)
+    print(json.dumps(stats, indent=2))
+
+if __name__ == '__main__':
+    main()
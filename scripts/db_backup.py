@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Consistent backups of MyApp.db through SQLite's online backup API.
+
+Pages are copied in batches, so a large database never blocks writers for the
+whole copy, and the result is a consistent snapshot even if the app writes
+during the backup (the backup restarts from the changed pages). The copy is
+checked with `PRAGMA quick_check` before it replaces the destination.
+
+Backups go either to an explicit path or into a directory of rotated,
+timestamped generations, optionally gzip-compressed:
+
+    python db_backup.py -o ../data/MyApp.db.backup
+    python db_backup.py --dir ../data/backups --keep 5 --compress
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+import extract_data
+
+DEFAULT_PAGES = 1024
+
+def print_progress(status, remaining, total):
+    done = total - remaining
+    print(f"\r  Backing up: {done * 100 // max(total, 1):3d}% ({done}/{total} pages)", end='', flush=True)
+
+def verify_backup(path):
+    """Return None if the copy passes PRAGMA quick_check, else the first problem reported."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        result = conn.execute("PRAGMA quick_check").fetchone()[0]
+    finally:
+        conn.close()
+    return None if result == 'ok' else result
+
+def generation_path(backup_dir, db_path, compress=False):
+    """Timestamped backup path for a new generation of db_path in backup_dir.
+
+    The stamp goes down to microseconds, so two backups in the same second do
+    not share a name, and sorting the names still sorts the generations by age.
+    """
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    suffix = '.db.gz' if compress else '.db'
+    return os.path.join(backup_dir, f"{stem}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{suffix}")
+
+def rotate_generations(backup_dir, db_path, keep):
+    """Delete all but the newest `keep` generations of db_path; returns the removed paths."""
+    stem = os.path.splitext(os.path.basename(db_path))[0] + '-'
+    generations = sorted(
+        name for name in os.listdir(backup_dir)
+        if name.startswith(stem) and (name.endswith('.db') or name.endswith('.db.gz'))
+    )
+    removed = []
+    for name in generations[:max(0, len(generations) - keep)]:
+        path = os.path.join(backup_dir, name)
+        os.remove(path)
+        removed.append(path)
+    return removed
+
+def backup_database(db_path, dest_path, pages=DEFAULT_PAGES, progress=True, verify=True):
+    """Copy db_path to dest_path with the online backup API; a .gz dest is compressed.
+
+    The copy is written beside the destination and renamed into place only after
+    it passes verification, so a failed backup never replaces a good one.
+    """
+    compress = dest_path.endswith('.gz')
+    tmp_path = f"{dest_path[:-3] if compress else dest_path}.tmp-{os.getpid()}"
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+
+    try:
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(target, pages=pages, progress=print_progress if progress else None)
+            finally:
+                target.close()
+        finally:
+            source.close()
+        if progress:
+            print()
+
+        if verify:
+            problem = verify_backup(tmp_path)
+            if problem:
+                raise sqlite3.DatabaseError(f"backup failed integrity check: {problem}")
+        if compress:
+            with open(tmp_path, 'rb') as src, gzip.open(tmp_path + '.gz', 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            os.replace(tmp_path + '.gz', dest_path)
+        else:
+            os.replace(tmp_path, dest_path)
+    finally:
+        for path in (tmp_path, tmp_path + '.gz'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {
+        'path': dest_path,
+        'bytes': os.path.getsize(dest_path),
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+def backup_generation(db_path, backup_dir, keep=None, compress=False, pages=DEFAULT_PAGES, progress=True,
+                      verify=True):
+    """Write a new timestamped generation into backup_dir and prune old ones beyond `keep`."""
+    os.makedirs(backup_dir, exist_ok=True)
+    result = backup_database(db_path, generation_path(backup_dir, db_path, compress), pages, progress, verify)
+    result['removed'] = rotate_generations(backup_dir, db_path, keep) if keep is not None else []
+    return result
+
+def generation_count(value):
+    """argparse type for --keep: at least one generation."""
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"must keep at least 1 generation, not {count}")
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description='Back up the SQLite database with the online backup API')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('-o', '--out', dest='dest_path', help='Backup file (.gz to compress); default: <db>.backup')
+    target.add_argument('--dir', dest='backup_dir', help='Directory of timestamped backup generations')
+    parser.add_argument('--keep', type=generation_count, help='With --dir, number of generations to keep')
+    parser.add_argument('--compress', action='store_true', help='With --dir, gzip each generation')
+    parser.add_argument('--pages', type=int, default=DEFAULT_PAGES, help='Pages copied per backup step')
+    parser.add_argument('--no-verify', action='store_true', help='Skip the integrity check of the copy')
+    parser.add_argument('-q', '--quiet', action='store_true', help='No progress output')
+    args = parser.parse_args()
+
+    try:
+        if args.backup_dir:
+            result = backup_generation(args.db_path, args.backup_dir, args.keep, args.compress, args.pages,
+                                       not args.quiet, not args.no_verify)
+        else:
+            result = backup_database(args.db_path, args.dest_path or args.db_path + '.backup', args.pages,
+                                     not args.quiet, not args.no_verify)
+    except sqlite3.Error as e:
+        print(f"Backup failed: {e}")
+        sys.exit(1)
+
+    print(f"Backed up {args.db_path} to {result['path']} ({result['bytes']:,} bytes in {result['seconds']}s)")
+    for path in result.get('removed', []):
+        print(f"  removed old generation {path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Delta files between successive extractions of the deferred payload.
+
+Each written training_deferred.json carries a `version`: a hash of its
+contents. Before it is replaced, the previous file is diffed against the new
+payload section by section and the result is written next to it as
+training_deferred.delta.json:
+
+    {"from": "<previous version>", "to": "<new version>",
+     "sections": {"<key>": <op>, ...}, "remove": ["<key>", ...]}
+
+Only changed sections appear. An op is one of
+
+  - {"op": "splice", "start": i, "end": j, "items": [...]}: replace
+    list[i:j] with items; appended series points are a splice at the end
+  - {"op": "patch", "fields": {"<key>": <op>, ...}, "remove": [...]}: an
+    object with only its changed fields
+  - {"op": "replace", "value": ...}: anything else
+
+A client holding version `from` applies the ops and has version `to`; any
+other client fetches the full file.
+
+    python delta.py old/training_deferred.json new/training_deferred.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+DELTA_SUFFIX = '.delta.json'
+
+def payload_version(payload):
+    """Content hash of a payload (without its version field)."""
+    body = {key: value for key, value in payload.items() if key != 'version'}
+    encoded = json.dumps(body, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+def diff(old, new):
+    """The op turning old into new, or None when they are equal."""
+    if old == new:
+        return None
+    if isinstance(old, dict) and isinstance(new, dict):
+        op = {'op': 'patch', 'fields': {}}
+        for key, value in new.items():
+            if key not in old:
+                op['fields'][key] = {'op': 'replace', 'value': value}
+            elif old[key] != value:
+                op['fields'][key] = diff(old[key], value)
+        removed = [key for key in old if key not in new]
+        if removed:
+            op['remove'] = removed
+        return op
+    if isinstance(old, list) and isinstance(new, list):
+        # Keep the common head and tail; appends and in-place edits ship only the middle
+        limit = min(len(old), len(new))
+        start = 0
+        while start < limit and old[start] == new[start]:
+            start += 1
+        tail = 0
+        while tail < limit - start and old[-1 - tail] == new[-1 - tail]:
+            tail += 1
+        if start or tail:
+            return {'op': 'splice', 'start': start, 'end': len(old) - tail, 'items': new[start:len(new) - tail]}
+    return {'op': 'replace', 'value': new}
+
+def apply(value, op):
+    """Apply an op from diff() to value and return the result (value is not modified)."""
+    kind = op['op']
+    if kind == 'replace':
+        return op['value']
+    if kind == 'patch':
+        if not isinstance(value, dict):
+            raise ValueError('patch applied to a non-object')
+        result = {key: item for key, item in value.items() if key not in op.get('remove', ())}
+        for key, field_op in op['fields'].items():
+            result[key] = apply(result.get(key), field_op)
+        return result
+    if kind == 'splice':
+        if not isinstance(value, list) or op['end'] > len(value):
+            raise ValueError('splice out of range')
+        return value[:op['start']] + op['items'] + value[op['end']:]
+    raise ValueError(f"unknown delta op: {kind}")
+
+def build_delta(previous, payload):
+    """Delta from a previous versioned payload to a new one; None when there is no usable previous version."""
+    if not previous or 'version' not in previous or previous['version'] == payload['version']:
+        return None
+    sections = {}
+    for key, value in payload.items():
+        if key == 'version':
+            continue
+        op = diff(previous.get(key), value) if key in previous else {'op': 'replace', 'value': value}
+        if op is not None:
+            sections[key] = op
+    return {
+        'from': previous['version'],
+        'to': payload['version'],
+        'sections': sections,
+        'remove': [key for key in previous if key not in payload],
+    }
+
+def apply_delta(previous, delta):
+    """The payload a delta produces from the version it starts at."""
+    if previous.get('version') != delta['from']:
+        raise ValueError(f"delta starts at {delta['from']}, not {previous.get('version')}")
+    result = apply(previous, {'op': 'patch', 'fields': delta['sections'], 'remove': delta['remove']})
+    result['version'] = delta['to']
+    return result
+
+def delta_path(path):
+    root, _ = os.path.splitext(path)
+    return root + DELTA_SUFFIX
+
+def read_previous(path):
+    """The payload currently at path, or None if it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the per-section delta between two deferred payloads')
+    parser.add_argument('old', help='Previous training_deferred.json')
+    parser.add_argument('new', help='New training_deferred.json')
+    args = parser.parse_args()
+
+    old, new = read_previous(args.old), read_previous(args.new)
+    for payload in (old, new):
+        payload['version'] = payload_version(payload)
+    delta = build_delta(old, new)
+    if delta is None:
+        print('No changes')
+        return
+    full = len(json.dumps(new, separators=(',', ':')))
+    size = len(json.dumps(delta, separators=(',', ':')))
+    for key, op in delta['sections'].items():
+        print(f"{key:<24} {op['op']:<8} {len(json.dumps(op, separators=(',', ':'))):>10,} bytes")
+    print(f"Delta {size:,} bytes vs full payload {full:,} bytes ({size / full:.1%})")
+    assert apply_delta(old, delta) == new
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Detect workout ranges whose timestamps look shifted by a timezone error.
+
+Workouts are split into segments of consecutive workouts on the same program.
+A single time-ordered pass over `history` counts, per segment, how many
+workouts started in each 10-minute bucket of the local day and on each
+weekday; everything after that works on those counts, not on rows. A
+segment is flagged when its workouts cluster tightly at a time of day far from
+the athlete's usual training time (e.g. 3-5 AM instead of mid-day).
+
+The proposed shift is the hour difference between the two. Whether that shift
+crosses midnight is decided by the day pattern: of the shift and its +/- 24h
+alternatives, the one whose weekdays best match the athlete's usual training
+days wins. Each proposal is printed as a fix_timestamps.py command.
+
+When the winning shift moves workouts onto other weekdays, only the day is
+known: every shift that lands them on the same days fits the weekdays equally
+well, and the athlete's usual time of day says nothing about the time the
+shifted range was trained at. Such a range is reported as ambiguous, with the
+span of shifts that fit, instead of a single proposal.
+
+    python detect_tz_shift.py --timezone America/New_York
+    python detect_tz_shift.py --json proposals.json
+"""
+
+import argparse
+import json
+import math
+import time
+from datetime import datetime, timezone
+
+import extract_data
+from local_days import DEFAULT_TIMEZONE, materialize_offsets, offset_lookup
+
+BUCKET_MINUTES = 10
+BUCKETS = 24 * 60 // BUCKET_MINUTES
+DAY_SECONDS = 86400
+
+# Unit vectors for each bucket's centre on the 24h clock, for circular means
+BUCKET_SIN = [math.sin(2 * math.pi * (b + 0.5) / BUCKETS) for b in range(BUCKETS)]
+BUCKET_COS = [math.cos(2 * math.pi * (b + 0.5) / BUCKETS) for b in range(BUCKETS)]
+
+# Weekday is Monday = 0, like date.weekday(); 1970-01-01 was a Thursday
+BUCKET_SECONDS = BUCKET_MINUTES * 60
+WORKOUT_QUERY = f"""
+    SELECT date, program_id, date / 1000 + {offset_lookup('date')} AS s
+    FROM history
+    WHERE date IS NOT NULL
+    ORDER BY date, id
+"""
+
+class Segment:
+    """Time-of-day and weekday counts of one run of workouts on the same program."""
+
+    __slots__ = ('program_id', 'counts', 'cells', 'workouts', 'first', 'last', 'sin', 'cos')
+
+    def __init__(self, program_id, first):
+        self.program_id = program_id
+        self.counts = {}
+        self.cells = []
+        self.workouts = 0
+        self.first = first
+        self.last = first
+        self.sin = 0.0
+        self.cos = 0.0
+
+    def finish(self):
+        """Turn the (bucket, weekday) counts into cells and circular sums."""
+        self.cells = [(bucket, weekday, n) for (bucket, weekday), n in self.counts.items()]
+        self.workouts = sum(self.counts.values())
+        self.sin = sum(BUCKET_SIN[bucket] * n for bucket, _, n in self.cells)
+        self.cos = sum(BUCKET_COS[bucket] * n for bucket, _, n in self.cells)
+        self.counts = None
+
+    @property
+    def mean_hour(self):
+        return circular_hour(self.sin, self.cos)
+
+    @property
+    def concentration(self):
+        """Mean resultant length: 1.0 when every workout starts at the same time."""
+        return math.hypot(self.sin, self.cos) / self.workouts if self.workouts else 0.0
+
+def circular_hour(sin_total, cos_total):
+    return (math.atan2(sin_total, cos_total) / (2 * math.pi) * 24) % 24
+
+def hour_difference(a, b):
+    """a - b on the 24h clock, wrapped into (-12, 12]."""
+    diff = (a - b) % 24
+    return diff - 24 if diff > 12 else diff
+
+def load_segments(conn):
+    """Stream workouts in time order once, splitting them into segments; returns segments in order."""
+    materialize_offsets(conn, getattr(conn, 'timezone', DEFAULT_TIMEZONE))
+    segments = []
+    seg = None
+    for date, program_id, s in conn.execute(WORKOUT_QUERY):
+        if seg is None or program_id != seg.program_id:
+            seg = Segment(program_id, date)
+            segments.append(seg)
+            counts = seg.counts
+        key = ((s % DAY_SECONDS) // BUCKET_SECONDS, (s // DAY_SECONDS + 3) % 7)
+        counts[key] = counts.get(key, 0) + 1
+        seg.last = date
+    for seg in segments:
+        seg.finish()
+    return segments
+
+def weekday_distribution(cells, offset_seconds=0):
+    """Share of workouts per weekday after shifting each cell by offset_seconds."""
+    counts = [0] * 7
+    total = 0
+    for bucket, weekday, workouts in cells:
+        seconds = (bucket + 0.5) * BUCKET_MINUTES * 60 + offset_seconds
+        counts[(weekday + int(seconds // DAY_SECONDS)) % 7] += workouts
+        total += workouts
+    return [c / total for c in counts] if total else counts
+
+def weekday_overlap(a, b):
+    return sum(min(x, y) for x, y in zip(a, b))
+
+def same_day_shifts(cells, hours):
+    """(lo, hi): the whole-hour shifts around `hours` that put every workout on the same day as `hours` does."""
+    def days(h):
+        return [int(((bucket + 0.5) * BUCKET_SECONDS + h * 3600) // DAY_SECONDS) for bucket, _, _ in cells]
+
+    target = days(hours)
+    lo = hi = hours
+    while lo > hours - 24 and days(lo - 1) == target:
+        lo -= 1
+    while hi < hours + 24 and days(hi + 1) == target:
+        hi += 1
+    return lo, hi
+
+def detect_shifts(segments, min_workouts=5, threshold_hours=3.0, min_concentration=0.75):
+    """Return proposals for segments whose time of day is shifted from the athlete's baseline."""
+    flagged = set()
+    # Two rounds: flagged segments are excluded from the baseline they are judged against
+    for _ in range(2):
+        base_sin = sum(s.sin for i, s in enumerate(segments) if i not in flagged)
+        base_cos = sum(s.cos for i, s in enumerate(segments) if i not in flagged)
+        baseline_hour = circular_hour(base_sin, base_cos)
+        flagged = {
+            i for i, s in enumerate(segments)
+            if s.workouts >= min_workouts
+            and s.concentration >= min_concentration
+            and abs(hour_difference(s.mean_hour, baseline_hour)) >= threshold_hours
+        }
+
+    baseline_cells = [cell for i, s in enumerate(segments) if i not in flagged for cell in s.cells]
+    baseline_weekdays = weekday_distribution(baseline_cells)
+
+    proposals = []
+    for i in sorted(flagged):
+        seg = segments[i]
+        hours = round(-hour_difference(seg.mean_hour, baseline_hour))
+        # Shortest shift first, so ties keep the smallest correction
+        candidates = sorted({hours, hours - 24, hours + 24}, key=abs)
+        scores = {h: weekday_overlap(weekday_distribution(seg.cells, h * 3600), baseline_weekdays)
+                  for h in candidates}
+        best = max(candidates, key=lambda h: scores[h])
+        lo, hi = same_day_shifts(seg.cells, best)
+
+        reasons = [f"starts at {seg.mean_hour:.1f}h vs usual {baseline_hour:.1f}h"]
+        if seg.mean_hour < 6:
+            reasons.append('night-time cluster')
+        if best != candidates[0]:
+            reasons.append('weekday pattern implies a day shift')
+        # The weekdays pin down the day, not the hour within it
+        ambiguous = not lo <= 0 <= hi
+        if ambiguous:
+            reasons.append('shift moves workouts to other days')
+
+        proposals.append({
+            'programId': seg.program_id,
+            'from': seg.first,
+            'to': seg.last + 1,
+            'workouts': seg.workouts,
+            'meanHour': round(seg.mean_hour, 2),
+            'baselineHour': round(baseline_hour, 2),
+            'concentration': round(seg.concentration, 3),
+            'offsetHours': None if ambiguous else best,
+            'offsetRange': [lo, hi],
+            'weekdayMatch': round(scores[best], 3),
+            'reasons': reasons,
+        })
+    return proposals
+
+def fix_command(proposal):
+    parts = ['python fix_timestamps.py']
+    if proposal['programId'] is not None:
+        parts.append(f"--program {proposal['programId']}")
+    offset = 'HOURS' if proposal['offsetHours'] is None else f"{proposal['offsetHours']:+d}"
+    parts.append(f"--from {proposal['from']} --to {proposal['to']} --offset {offset}")
+    return ' '.join(parts)
+
+def print_proposals(conn, proposals, limit=20):
+    names = dict(conn.execute("SELECT id, routine FROM programs"))
+    if not proposals:
+        print("No shifted workout ranges found")
+        return
+    print(f"{len(proposals)} suspicious range(s):")
+    for p in proposals[:limit]:
+        first = datetime.fromtimestamp(p['from'] / 1000, timezone.utc).strftime('%Y-%m-%d')
+        last = datetime.fromtimestamp((p['to'] - 1) / 1000, timezone.utc).strftime('%Y-%m-%d')
+        print(f"\n  {names.get(p['programId'], 'Unknown Program')}: {p['workouts']} workouts, {first} to {last}")
+        print(f"    {'; '.join(p['reasons'])}")
+        if p['offsetHours'] is None:
+            lo, hi = p['offsetRange']
+            print(f"    ambiguous shift between {lo:+d}h and {hi:+d}h (weekday match {p['weekdayMatch']:.0%});"
+                  " pick HOURS from the original training log")
+        else:
+            print(f"    proposed shift {p['offsetHours']:+d}h (weekday match {p['weekdayMatch']:.0%})")
+        print(f"    {fix_command(p)}")
+    if len(proposals) > limit:
+        print(f"\n  ... and {len(proposals) - limit} more (see --json)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Find workout ranges whose timestamps look timezone-shifted')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('--timezone', type=extract_data.timezone_name, default=extract_data.DEFAULT_TIMEZONE,
+                        help='IANA timezone the athlete trains in')
+    parser.add_argument('--min-workouts', type=int, default=5, help='Ignore segments with fewer workouts')
+    parser.add_argument('--threshold', type=float, default=3.0, help='Minimum time-of-day shift in hours to flag')
+    parser.add_argument('--limit', type=int, default=20, help='Proposals printed')
+    parser.add_argument('--json', dest='json_path', help='Write all proposals to this JSON file')
+    args = parser.parse_args()
+
+    conn = extract_data.connect_db(args.db_path, timezone=args.timezone)
+    started = time.perf_counter()
+    segments = load_segments(conn)
+    proposals = detect_shifts(segments, args.min_workouts, args.threshold)
+    elapsed = time.perf_counter() - started
+
+    print_proposals(conn, proposals, args.limit)
+    print(f"\nAnalyzed {sum(s.workouts for s in segments):,} workouts in {len(segments):,} segments in {elapsed:.2f}s")
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(proposals, f, indent=2)
+    conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Shape-preserving downsampling of chart series (Largest-Triangle-Three-Buckets).
+
+LTTB keeps the first and last point and splits the rest into equal buckets,
+picking from each bucket the point that forms the largest triangle with the
+point already kept and the average of the next bucket. Peaks, troughs and
+trend changes survive; runs of similar points collapse. One pass, O(n).
+
+Levels are shipped as index lists into the full series, so the dashboard can
+draw a coarse level first and switch to the full series on zoom without a
+second copy of every point in the payload.
+
+    python downsample.py --budget 200
+"""
+
+import argparse
+import json
+from datetime import date
+
+# Point budgets shipped for each long series; the full series is always the last level
+LEVEL_BUDGETS = (200, 1000)
+
+def lttb_indices(xs, ys, threshold):
+    """Indices of the `threshold` points LTTB keeps from the series (xs ascending)."""
+    n = len(xs)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][:max(threshold, 0)]
+
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= n - 1:
+            avg_x, avg_y = xs[n - 1], ys[n - 1]
+        else:
+            count = next_end - next_start
+            avg_x = sum(xs[next_start:next_end]) / count
+            avg_y = sum(ys[next_start:next_end]) / count
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+def series_levels(points, value_key, budgets=LEVEL_BUDGETS):
+    """LTTB index lists of a dated series ({'date': 'YYYY-MM-DD', value_key: ...} points) per budget.
+
+    Budgets at or above the series length are left out: the full series is that level.
+    """
+    levels = {}
+    if not any(budget < len(points) for budget in budgets):
+        return levels
+    xs = [date.fromisoformat(p['date']).toordinal() for p in points]
+    ys = [p[value_key] or 0 for p in points]
+    for budget in budgets:
+        if budget < len(points):
+            levels[str(budget)] = lttb_indices(xs, ys, budget)
+    return levels
+
+def chart_levels(data, budgets=LEVEL_BUDGETS):
+    """Downsampled levels of the long series the dashboard charts (daily volume and per-lift e1RM)."""
+    return {
+        'budgets': list(budgets),
+        'volumeDaily': series_levels(data['volumeTimeSeries'].get('daily', []), 'volumeLbs', budgets),
+        'e1rm': {
+            lift: series_levels(series['e1rmHistory'], 'e1rmLbs', budgets)
+            for lift, series in data['bigThreeE1RM'].items()
+        },
+    }
+
+def main():
+    import extract_data
+
+    parser = argparse.ArgumentParser(description='Report how far LTTB shrinks the long chart series')
+    parser.add_argument('-i', '--input', default=extract_data.OUTPUT_PATH, help='Extracted training_data.json')
+    parser.add_argument('--budget', type=int, action='append', help='Point budget (repeatable)')
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        data = json.load(f)
+    budgets = tuple(args.budget or LEVEL_BUDGETS)
+    levels = chart_levels(data, budgets)
+
+    series = [('volumeDaily', len(data['volumeTimeSeries'].get('daily', [])), levels['volumeDaily'])]
+    for lift, lift_levels in levels['e1rm'].items():
+        series.append((f"e1rm.{lift}", len(data['bigThreeE1RM'][lift]['e1rmHistory']), lift_levels))
+    for name, full, lift_levels in series:
+        sizes = ', '.join(f"{budget}: {len(lift_levels[str(budget)]) if str(budget) in lift_levels else full}"
+                          for budget in budgets)
+        print(f"{name:<22} full {full:>7,}  ({sizes})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Estimated one-rep max over whole set arrays.
+
+Each formula is a multiplier of the set's weight that depends only on its
+reps, so for whole-rep formulas it is a table lookup, not a function call per
+set and unit. The RPE-adjusted formula adds the reps left in reserve
+(10 - RPE) before applying Epley, falling back to plain Epley when a set has
+no RPE. Per-workout bests are a grouped max over the resulting column.
+
+Sets above MAX_E1RM_REPS reps get no estimate: every formula degrades quickly
+past 6-8 reps.
+
+An extraction computes only the formula selected by "e1rmFormula" in
+lifts.json, one bulk pass per lift; the other formulas are available to
+this module's CLI (--formula, --benchmark) but never reach the output.
+
+    python e1rm.py --formula brzycki
+    python e1rm.py --benchmark -d /tmp/MyApp-100x.db
+"""
+
+import argparse
+import time
+
+MAX_E1RM_REPS = 8
+
+# Below every estimate, so the first set of a group always becomes its best
+NO_VALUE = float('-inf')
+
+def epley(reps):
+    # A single is its own 1RM; weight x (1 + reps/30) would add 3%
+    return 1.0 if reps == 1 else 1 + reps / 30
+
+def brzycki(reps):
+    return 36 / (37 - reps)
+
+def lombardi(reps):
+    return reps ** 0.10
+
+# Formula name -> reps multiplier, for 1..MAX_E1RM_REPS reps; 'rpe' also reads the set's RPE
+E1RM_FORMULAS = {
+    'epley': epley,
+    'brzycki': brzycki,
+    'lombardi': lombardi,
+    'rpe': epley,
+}
+DEFAULT_E1RM_FORMULA = 'epley'
+
+FACTORS = {name: [None] + [multiplier(r) for r in range(1, MAX_E1RM_REPS + 1)]
+           for name, multiplier in E1RM_FORMULAS.items()}
+
+def rpe_factors(reps, rpe):
+    """Epley multipliers on reps + reps in reserve; sets without an RPE use their reps."""
+    factors = FACTORS['epley']
+    return [
+        (factors[r] if not x or x >= 10 else epley(r + 10 - x)) if r <= MAX_E1RM_REPS else None
+        for r, x in zip(reps, rpe)
+    ]
+
+def e1rm_columns(weights, reps, formula=DEFAULT_E1RM_FORMULA, rpe=None):
+    """e1RM of every set under one formula, as one list per weight column (None above MAX_E1RM_REPS reps).
+
+    weights is a sequence of weight columns (e.g. lbs and kg) sharing the reps;
+    NULL weights count as 0, as they always have.
+    """
+    if formula == 'rpe' and rpe is not None:
+        factors = rpe_factors(reps, rpe)
+    else:
+        table = FACTORS[formula]
+        factors = [table[r] if r <= MAX_E1RM_REPS else None for r in reps]
+    return [
+        [(w or 0) * f if f is not None else None for w, f in zip(column, factors)]
+        for column in weights
+    ]
+
+def best_per_group(groups, values):
+    """{group: index of its first maximal value}, in order of first appearance; None values are skipped."""
+    best = {}
+    best_value = {}
+    current = best_value.get
+    for i, group, value in zip(range(len(values)), groups, values):
+        if value is not None and value > current(group, NO_VALUE):
+            best_value[group] = value
+            best[group] = i
+    return best
+
+def scalar_loop(sets):
+    """The per-set, per-unit Epley loop e1RM used to be computed with, for --benchmark."""
+    bests = {}
+    for date, weight_lbs, weight_kg, reps in zip(sets.ymd, sets.weightlb, sets.weightkg, sets.reps):
+        if reps > MAX_E1RM_REPS:
+            continue
+        weight_lbs = weight_lbs or 0
+        weight_kg = weight_kg or 0
+        e1rm_lbs = weight_lbs if reps == 1 else weight_lbs * (1 + reps / 30)
+        e1rm_kg = weight_kg if reps == 1 else weight_kg * (1 + reps / 30)
+        if date not in bests or e1rm_lbs > bests[date]['lbs']:
+            bests[date] = {'lbs': e1rm_lbs, 'kg': e1rm_kg}
+    return bests
+
+def best_of(run, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def benchmark(lift_sets, formula=DEFAULT_E1RM_FORMULA, repeat=3):
+    """Best-of-`repeat` seconds: the scalar loop, one bulk formula, and every formula in one call each."""
+    def scalar():
+        for sets in lift_sets.values():
+            scalar_loop(sets)
+
+    def bulk(formulas):
+        def run():
+            for sets in lift_sets.values():
+                for name in formulas:
+                    lbs, _ = e1rm_columns((sets.weightlb, sets.weightkg), sets.reps, name, sets.rpe)
+                    best_per_group(sets.ymd, lbs)
+        return run
+
+    return {
+        'scalar': best_of(scalar, repeat),
+        'bulk': best_of(bulk([formula]), repeat),
+        'all': best_of(bulk(list(E1RM_FORMULAS)), repeat),
+    }
+
+def main():
+    import extract_data
+
+    parser = argparse.ArgumentParser(description='Best e1RM per lift with a selectable formula')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('--formula', choices=sorted(E1RM_FORMULAS), help='Formula (default: the one in lifts.json)')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time the old per-set loop against bulk computation of every formula')
+    args = parser.parse_args()
+
+    conn = extract_data.connect_db(args.db_path)
+    lift_sets = extract_data.get_lift_sets(conn)
+    formula = args.formula or extract_data.get_lift_registry(conn)['e1rmFormula']
+    conn.close()
+
+    if args.benchmark:
+        total = sum(len(sets) for sets in lift_sets.values())
+        timings = benchmark(lift_sets, formula)
+        print(f"{total:,} sets")
+        # The e1RM and powerlifting-totals sections each ran the scalar loop; they now share one bulk pass
+        rows = [
+            ('scalar loop x 2 sections (before)', 2 * timings['scalar']),
+            (f'bulk {formula}, shared (now)', timings['bulk']),
+            (f'bulk, all {len(E1RM_FORMULAS)} formulas', timings['all']),
+        ]
+        for label, seconds in rows:
+            print(f"  {label:<36} {seconds:6.3f}s  {total / seconds / 1e6:5.2f}M sets/s")
+        return
+
+    for lift, sets in lift_sets.items():
+        if not sets:
+            continue
+        lbs, kg = e1rm_columns((sets.weightlb, sets.weightkg), sets.reps, formula, sets.rpe)
+        best = max(best_per_group(sets.ymd, lbs).values(), key=lambda i: lbs[i])
+        print(f"{lift:<10} {lbs[best]:8.1f} lbs / {kg[best]:6.1f} kg  "
+              f"({sets.weightlb[best]} x {sets.reps[best]} on {sets.ymd[best]}, {formula})")
+
+if __name__ == '__main__':
+    main()
@@ -8,52 +8,179 @@ import sqlite3
 import json
 import argparse
 import os
-from datetime import datetime
+from datetime import date, datetime
 import sys
+import time
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+from day_index import build_day_index
+from delta import build_delta, delta_path, payload_version, read_previous
+from downsample import chart_levels
+from e1rm import DEFAULT_E1RM_FORMULA, E1RM_FORMULAS, MAX_E1RM_REPS, best_per_group, e1rm_columns
+from local_days import DEFAULT_TIMEZONE as UTC_TIMEZONE, day_to_iso, ensure_local_days, timezone_name
+from training_load import build_training_load
 
 # Paths relative to the scripts folder
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(SCRIPT_DIR, '..', 'data', 'MyApp.db')
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, '..', 'static', 'data')
 OUTPUT_PATH = os.path.join(OUTPUT_DIR, 'training_data.json')
+POLAR_DIR = os.path.join(SCRIPT_DIR, '..', 'data', 'polar-user-data')
+# Persistent section results (see section_cache.py); --no-cache bypasses it
+CACHE_DIR = os.environ.get('TRAINING_CACHE_DIR') or os.path.join(SCRIPT_DIR, '..', 'data', 'section-cache')
+
+# IANA timezone used to assign workouts and weigh-ins to calendar days
+DEFAULT_TIMEZONE = os.environ.get('TRAINING_TIMEZONE') or UTC_TIMEZONE
+
+# Tracked lifts (exercise name variations, bar travel, benchmarks) and lift groups
+LIFTS_CONFIG_PATH = os.environ.get('TRAINING_LIFTS') or os.path.join(SCRIPT_DIR, 'lifts.json')
+
+# Lift group whose members make up the powerlifting total, BW multiple total and Wilks
+POWERLIFTING_GROUP = 'powerlifting'
+
+# --snapshot modes: 'memory' copies the database into RAM with the backup API;
+# 'mmap' opens it read-only and immutable, memory-mapped with a large page cache
+SNAPSHOT_MODES = ('memory', 'mmap')
+SNAPSHOT_MMAP_BYTES = 1 << 30
+SNAPSHOT_CACHE_KIB = 256 * 1024
+
+class ExtractConnection(sqlite3.Connection):
+    """SQLite connection that also memoizes intermediate results shared between sections.
+
+    Long-lived callers (--watch, --serve) clear conn.memo when the database changes.
+    `timezone` selects the calendar days workouts are grouped into (see local_days.py).
+    `snapshot` is the --snapshot mode the connection was opened with, if any, and
+    `snapshot_seconds` what taking it cost. `db_path` and `db_signature` (taken
+    just before opening) identify the database file for the section cache.
+    Rows are plain tuples: queries are unpacked positionally while the cursor
+    is iterated, never fetched whole.
+    """
 
-# Big 3 exercise name variations
-SQUAT_NAMES = ['Squat', 'Back Squat', 'Front Squat', 'Squats']
-BENCH_NAMES = ['Bench Press', 'Bench', 'Flat Bench Press']
-DEADLIFT_NAMES = ['Deadlift', 'Conventional Deadlift', 'Deadlifts']
-OHP_NAMES = ['Overhead Press', 'OHP', 'Military Press', 'Standing Press', 'Shoulder Press', 'Barbell Overhead Press']
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.memo = {}
+        self.timezone = DEFAULT_TIMEZONE
+        self.snapshot = None
+        self.snapshot_seconds = 0.0
+        self.db_path = None
+        self.db_signature = None
+
+def memoized(conn, key, build):
+    """Return conn.memo[key], computing it with build(conn) on first use."""
+    memo = getattr(conn, 'memo', None)
+    if memo is None:
+        return build(conn)
+    if key not in memo:
+        memo[key] = build(conn)
+    return memo[key]
+
+def open_snapshot(db_path, mode, check_same_thread=True):
+    """Open a read-only image of db_path that cannot change under a running extraction.
+
+    'memory' copies every page into a private in-memory database, so later writes
+    to the file (e.g. a phone sync) are not seen at all. 'mmap' skips the copy
+    and maps the file instead; SQLite takes no locks on an immutable database,
+    so it is only consistent if nothing writes the file during the run.
+    """
+    if mode == 'memory':
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        conn = sqlite3.connect(':memory:', check_same_thread=check_same_thread, factory=ExtractConnection)
+        try:
+            source.backup(conn)
+        finally:
+            source.close()
+        return conn
+    if mode == 'mmap':
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro&immutable=1", uri=True,
+                               check_same_thread=check_same_thread, factory=ExtractConnection)
+        conn.execute(f"PRAGMA mmap_size = {SNAPSHOT_MMAP_BYTES}")
+        conn.execute(f"PRAGMA cache_size = -{SNAPSHOT_CACHE_KIB}")
+        return conn
+    raise ValueError(f"unknown snapshot mode: {mode}")
 
-def connect_db(db_path=DB_PATH):
-    """Connect to the SQLite database."""
+def connect_db(db_path=DB_PATH, check_same_thread=True, timezone=None, snapshot=None):
+    """Connect to the SQLite database, or to a snapshot of it (see open_snapshot)."""
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
+        started = time.perf_counter()
+        signature = db_signature(db_path)
+        if snapshot:
+            conn = open_snapshot(db_path, snapshot, check_same_thread)
+        else:
+            conn = sqlite3.connect(db_path, check_same_thread=check_same_thread, factory=ExtractConnection)
+        conn.timezone = timezone or DEFAULT_TIMEZONE
+        conn.snapshot = snapshot
+        conn.snapshot_seconds = time.perf_counter() - started if snapshot else 0.0
+        conn.db_path = db_path
+        conn.db_signature = signature
         return conn
     except sqlite3.Error as e:
         print(f"Error connecting to database: {e}")
         sys.exit(1)
 
-def ms_to_date(ms):
-    """Convert milliseconds timestamp to YYYY-MM-DD string."""
-    if ms is None:
-        return None
-    return datetime.fromtimestamp(ms / 1000).strftime('%Y-%m-%d')
+def list_polar_files(polar_dir=POLAR_DIR):
+    """List Polar training-session JSON files in a stable order."""
+    import glob as glob_module
+
+    if not polar_dir:
+        return []
+
+    pattern = os.path.join(polar_dir, 'training-session-*.json')
+    return sorted(glob_module.glob(pattern))
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def polar_manifest(polar_dir=POLAR_DIR):
+    """Return a (name, size, mtime) listing of the Polar files for change detection."""
+    manifest = []
+    for path in list_polar_files(polar_dir):
+        st = os.stat(path)
+        manifest.append((os.path.basename(path), st.st_size, int(st.st_mtime)))
+    return manifest
+
+def db_signature(db_path):
+    """Stat-based signature (inode, size, mtime) of a database and its journal files."""
+    signature = []
+    for suffix in ('', '-wal', '-journal'):
+        try:
+            st = os.stat(db_path + suffix)
+        except FileNotFoundError:
+            continue
+        signature.append((suffix, st.st_ino, st.st_size, st.st_mtime_ns))
+    return signature
+
+def source_signatures(db_path, polar_dir=POLAR_DIR):
+    """Cheap change-detection signatures for each extraction source ('db', 'polar')."""
+    return {
+        'db': db_signature(db_path),
+        'polar': polar_manifest(polar_dir),
+    }
 
 def get_summary_stats(conn):
     """Calculate summary statistics."""
     cursor = conn.cursor()
 
     # Total workouts
-    cursor.execute("SELECT COUNT(*) as count FROM history")
-    total_workouts = cursor.fetchone()['count']
+    cursor.execute("SELECT COUNT(*) FROM history")
+    total_workouts, = cursor.fetchone()
 
     # Total sets (excluding warmups: reps = -1)
     cursor.execute("""
-        SELECT COUNT(*) as count
+        SELECT COUNT(*)
         FROM history_exercises
         WHERE reps > 0
     """)
-    total_sets = cursor.fetchone()['count']
+    total_sets, = cursor.fetchone()
 
     # Total volume in lbs and kg
     cursor.execute("""
@@ -65,20 +192,22 @@ def get_summary_stats(conn):
         AND weightlb IS NOT NULL
         AND weightkg IS NOT NULL
     """)
-    volume_row = cursor.fetchone()
-    total_volume_lbs = round(volume_row['total_volume_lbs'] or 0, 2)
-    total_volume_kg = round(volume_row['total_volume_kg'] or 0, 2)
+    total_volume_lbs, total_volume_kg = cursor.fetchone()
+    total_volume_lbs = round(total_volume_lbs or 0, 2)
+    total_volume_kg = round(total_volume_kg or 0, 2)
 
     # Total hours (duration is in minutes)
     cursor.execute("SELECT SUM(duration) as total_minutes FROM history WHERE duration IS NOT NULL")
-    total_minutes = cursor.fetchone()['total_minutes'] or 0
+    total_minutes = cursor.fetchone()[0] or 0
     total_hours = round(total_minutes / 60, 1)
 
-    # Date range
+    # Date range (local calendar days)
     cursor.execute("SELECT MIN(date) as first, MAX(date) as last FROM history")
-    date_range = cursor.fetchone()
-    first_workout = ms_to_date(date_range['first'])
-    last_workout = ms_to_date(date_range['last'])
+    first_ms, last_ms = cursor.fetchone()
+    cursor.execute("SELECT MIN(day) as first, MAX(day) as last FROM history_local")
+    first_day, last_day = cursor.fetchone()
+    first_workout = day_to_iso(first_day) if first_day else None
+    last_workout = day_to_iso(last_day) if last_day else None
 
     # Calculate derived statistics
     avg_workout_duration = round(total_minutes / total_workouts, 1) if total_workouts > 0 else 0
@@ -87,9 +216,9 @@ def get_summary_stats(conn):
     avg_sets_per_workout = round(total_sets / total_workouts, 1) if total_workouts > 0 else 0
 
     # Calculate workouts per week average
-    if date_range['first'] and date_range['last']:
-        first_date = datetime.fromtimestamp(date_range['first'] / 1000)
-        last_date = datetime.fromtimestamp(date_range['last'] / 1000)
+    if first_ms and last_ms:
+        first_date = datetime.fromtimestamp(first_ms / 1000)
+        last_date = datetime.fromtimestamp(last_ms / 1000)
         total_days = (last_date - first_date).days + 1
         total_weeks = total_days / 7
         workouts_per_week_avg = round(total_workouts / total_weeks, 1) if total_weeks > 0 else 0
@@ -98,55 +227,31 @@ def get_summary_stats(conn):
 
     # Total reps ever
     cursor.execute("SELECT SUM(reps) as total_reps FROM history_exercises WHERE reps > 0")
-    total_reps = cursor.fetchone()['total_reps'] or 0
+    total_reps = cursor.fetchone()[0] or 0
 
     # Total tons (lbs / 2000)
     total_tons = round(total_volume_lbs / 2000, 1) if total_volume_lbs > 0 else 0
 
-    # Best month ever
-    cursor.execute("""
-        SELECT
-            strftime('%Y-%m', h.date/1000, 'unixepoch') as month,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg
-        FROM history h
-        JOIN history_exercises he ON h.id = he.history_id
-        WHERE he.reps > 0
-        GROUP BY month
-        ORDER BY volume_lbs DESC
-        LIMIT 1
-    """)
-    best_month_row = cursor.fetchone()
+    # Best month and year ever, from the same rollups as the volume time series
     best_month_ever = None
-    if best_month_row:
+    monthly = rollup_daily_volume(get_day_index(conn), VOLUME_ROLLUPS['monthly'][1])
+    if monthly:
+        month, volume_lbs, volume_kg, _ = max(monthly, key=lambda bucket: bucket[1])
         best_month_ever = {
-            'month': best_month_row['month'],
-            'volumeLbs': round(best_month_row['volume_lbs'] or 0, 2),
-            'volumeKg': round(best_month_row['volume_kg'] or 0, 2)
+            'month': month,
+            'volumeLbs': round(volume_lbs, 2),
+            'volumeKg': round(volume_kg, 2)
         }
 
-    # Best year ever
-    cursor.execute("""
-        SELECT
-            strftime('%Y', h.date/1000, 'unixepoch') as year,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg,
-            COUNT(DISTINCT h.id) as workouts
-        FROM history h
-        JOIN history_exercises he ON h.id = he.history_id
-        WHERE he.reps > 0
-        GROUP BY year
-        ORDER BY volume_lbs DESC
-        LIMIT 1
-    """)
-    best_year_row = cursor.fetchone()
     best_year_ever = None
-    if best_year_row:
+    yearly = rollup_daily_volume(get_day_index(conn), VOLUME_ROLLUPS['yearly'][1])
+    if yearly:
+        year, volume_lbs, volume_kg, workouts = max(yearly, key=lambda bucket: bucket[1])
         best_year_ever = {
-            'year': int(best_year_row['year']),
-            'volumeLbs': round(best_year_row['volume_lbs'] or 0, 2),
-            'volumeKg': round(best_year_row['volume_kg'] or 0, 2),
-            'workouts': best_year_row['workouts']
+            'year': year,
+            'volumeLbs': round(volume_lbs, 2),
+            'volumeKg': round(volume_kg, 2),
+            'workouts': workouts
         }
 
     return {
@@ -168,131 +273,151 @@ def get_summary_stats(conn):
         'workoutsPerWeekAvg': workouts_per_week_avg
     }
 
+def get_day_index(conn):
+    """Dense per-day totals (see day_index.py), built once per connection."""
+    return memoized(conn, 'day_index', build_day_index)
+
+# Volume time series buckets: series name -> (output key, bucket key for a date).
+# '%Y-W%W' matches SQLite's strftime week (Monday-based, week 00 before the first Monday).
+VOLUME_ROLLUPS = {
+    'weekly': ('week', lambda d: d.strftime('%Y-W%W')),
+    'monthly': ('month', lambda d: d.strftime('%Y-%m')),
+    'yearly': ('year', lambda d: d.year),
+    'isoWeekly': ('isoWeek', lambda d: '%d-W%02d' % d.isocalendar()[:2]),
+    'quarterly': ('quarter', lambda d: f"{d.year}-Q{(d.month - 1) // 3 + 1}"),
+}
+
+def rollup_daily_volume(day_index, bucket_key):
+    """Roll the daily lifting volume up into ordered (key, lbs, kg, workouts) buckets."""
+    buckets = {}
+    for day, volume_lbs, volume_kg, workouts in day_index.lifting_days():
+        key = bucket_key(day)
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = [volume_lbs, volume_kg, workouts]
+        else:
+            bucket[0] += volume_lbs
+            bucket[1] += volume_kg
+            bucket[2] += workouts
+    return [(key, lbs, kg, workouts) for key, (lbs, kg, workouts) in buckets.items()]
+
 def get_volume_time_series(conn):
-    """Calculate volume aggregations over time."""
-    cursor = conn.cursor()
+    """Calculate volume aggregations over time.
 
-    # Daily aggregations
-    cursor.execute("""
-        SELECT
-            date(h.date/1000, 'unixepoch') as workout_date,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg,
-            COUNT(DISTINCT h.id) as workout_count
-        FROM history h
-        JOIN history_exercises he ON h.id = he.history_id
-        WHERE he.reps > 0
-        GROUP BY workout_date
-        ORDER BY workout_date
-    """)
+    Daily totals come from the day index; every coarser series is rolled up from
+    them in memory rather than re-scanning history_exercises per bucket size.
+    """
+    day_index = get_day_index(conn)
 
     daily = []
-    for row in cursor.fetchall():
+    for day, volume_lbs, volume_kg, workouts in day_index.lifting_days():
         daily.append({
-            'date': row['workout_date'],
-            'volumeLbs': round(row['volume_lbs'] or 0, 2),
-            'volumeKg': round(row['volume_kg'] or 0, 2),
-            'workouts': row['workout_count']
+            'date': day.isoformat(),
+            'volumeLbs': round(volume_lbs or 0, 2),
+            'volumeKg': round(volume_kg or 0, 2),
+            'workouts': workouts
         })
 
-    # Weekly aggregations
-    cursor.execute("""
-        SELECT
-            strftime('%Y-W%W', h.date/1000, 'unixepoch') as week,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg,
-            COUNT(DISTINCT h.id) as workout_count
-        FROM history h
-        JOIN history_exercises he ON h.id = he.history_id
-        WHERE he.reps > 0
-        GROUP BY week
-        ORDER BY week
-    """)
+    series = {'daily': daily}
+    for name, (key, bucket_key) in VOLUME_ROLLUPS.items():
+        series[name] = [
+            {
+                key: bucket,
+                'volumeLbs': round(volume_lbs or 0, 2),
+                'volumeKg': round(volume_kg or 0, 2),
+                'workouts': workouts
+            }
+            for bucket, volume_lbs, volume_kg, workouts in rollup_daily_volume(day_index, bucket_key)
+        ]
 
-    weekly = []
-    for row in cursor.fetchall():
-        weekly.append({
-            'week': row['week'],
-            'volumeLbs': round(row['volume_lbs'] or 0, 2),
-            'volumeKg': round(row['volume_kg'] or 0, 2),
-            'workouts': row['workout_count']
-        })
+    return series
 
-    # Monthly aggregations
-    cursor.execute("""
-        SELECT
-            strftime('%Y-%m', h.date/1000, 'unixepoch') as month,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg,
-            COUNT(DISTINCT h.id) as workout_count
-        FROM history h
-        JOIN history_exercises he ON h.id = he.history_id
-        WHERE he.reps > 0
-        GROUP BY month
-        ORDER BY month
-    """)
+def get_training_load(conn, polar_calendar=None):
+    """Rolling 7/28-day load, ACWR and monotony per day (see training_load.py)."""
+    return build_training_load(get_day_index(conn), polar_calendar)
 
-    monthly = []
-    for row in cursor.fetchall():
-        monthly.append({
-            'month': row['month'],
-            'volumeLbs': round(row['volume_lbs'] or 0, 2),
-            'volumeKg': round(row['volume_kg'] or 0, 2),
-            'workouts': row['workout_count']
-        })
+# Notable workouts: entries per category, and the layoff that makes a comeback
+NOTABLE_COUNT = 5
+COMEBACK_GAP_DAYS = 14
 
-    # Yearly aggregations
-    cursor.execute("""
-        SELECT
-            strftime('%Y', h.date/1000, 'unixepoch') as year,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg,
-            COUNT(DISTINCT h.id) as workout_count
-        FROM history h
-        JOIN history_exercises he ON h.id = he.history_id
-        WHERE he.reps > 0
-        GROUP BY year
-        ORDER BY year
-    """)
+WEEKDAY_NAMES = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday')
 
-    yearly = []
-    for row in cursor.fetchall():
-        yearly.append({
-            'year': int(row['year']),
-            'volumeLbs': round(row['volume_lbs'] or 0, 2),
-            'volumeKg': round(row['volume_kg'] or 0, 2),
-            'workouts': row['workout_count']
-        })
+WORKOUTS_QUERY = """
+    SELECT h.id, h.date, hl.day, hl.weekday, hl.ymd, h.program_id,
+           SUM(he.weightlb * he.reps), SUM(he.weightkg * he.reps), COUNT(he.id)
+    FROM history h
+    JOIN history_local hl ON hl.id = h.id
+    LEFT JOIN history_exercises he ON h.id = he.history_id AND he.reps > 0
+    GROUP BY h.id
+    ORDER BY h.date, h.id
+"""
 
-    return {
-        'daily': daily,
-        'weekly': weekly,
-        'monthly': monthly,
-        'yearly': yearly
-    }
+class WorkoutTable:
+    """One row per workout in date order, as parallel arrays.
+
+    volume_lbs/volume_kg are None for a workout without working sets;
+    gap_days is the time since the previous workout in days (None for the first).
+    """
+
+    __slots__ = ('id', 'date', 'day', 'weekday', 'ymd', 'program_id',
+                 'volume_lbs', 'volume_kg', 'sets', 'gap_days')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, [])
+
+    def __len__(self):
+        return len(self.id)
+
+def load_workouts(conn):
+    """Aggregate every workout's working sets in one grouped scan; returns a WorkoutTable."""
+    ensure_local_days(conn)
+    cursor = conn.cursor()
+
+    workouts = WorkoutTable()
+    previous = None
+    for history_id, date_ms, day, weekday, ymd, program_id, volume_lbs, volume_kg, sets in cursor.execute(WORKOUTS_QUERY):
+        seconds = date_ms // 1000
+        workouts.id.append(history_id)
+        workouts.date.append(date_ms)
+        workouts.day.append(day)
+        workouts.weekday.append(weekday)
+        workouts.ymd.append(ymd)
+        workouts.program_id.append(program_id)
+        workouts.volume_lbs.append(volume_lbs)
+        workouts.volume_kg.append(volume_kg)
+        workouts.sets.append(sets)
+        workouts.gap_days.append(None if previous is None else (seconds - previous) / 86400)
+        previous = seconds
+    return workouts
+
+def get_workouts(conn):
+    """Per-workout aggregate shared by the calendar, day-of-week, notable and milestone sections."""
+    return memoized(conn, 'workouts', load_workouts)
 
 def get_workout_calendar(conn):
     """Generate workout calendar data for heatmap."""
-    cursor = conn.cursor()
+    workouts = get_workouts(conn)
 
-    cursor.execute("""
-        SELECT
-            date(h.date/1000, 'unixepoch') as workout_date,
-            COUNT(DISTINCT h.id) as workout_count,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg
-        FROM history h
-        LEFT JOIN history_exercises he ON h.id = he.history_id AND he.reps > 0
-        GROUP BY workout_date
-        ORDER BY workout_date
-    """)
+    # day -> [ymd, workouts, volume lbs, volume kg]; volumes stay None for days without sets
+    by_day = {}
+    for day, ymd, volume_lbs, volume_kg in zip(workouts.day, workouts.ymd, workouts.volume_lbs, workouts.volume_kg):
+        totals = by_day.get(day)
+        if totals is None:
+            by_day[day] = totals = [ymd, 0, None, None]
+        totals[1] += 1
+        if volume_lbs is not None:
+            totals[2] = (totals[2] or 0) + volume_lbs
+        if volume_kg is not None:
+            totals[3] = (totals[3] or 0) + volume_kg
 
     calendar = {}
-    for row in cursor.fetchall():
-        calendar[row['workout_date']] = {
-            'count': row['workout_count'],
-            'volumeLbs': round(row['volume_lbs'] or 0, 2),
-            'volumeKg': round(row['volume_kg'] or 0, 2)
+    for day in sorted(by_day):
+        ymd, count, volume_lbs, volume_kg = by_day[day]
+        calendar[ymd] = {
+            'count': count,
+            'volumeLbs': round(volume_lbs or 0, 2),
+            'volumeKg': round(volume_kg or 0, 2)
         }
 
     return calendar
@@ -307,78 +432,64 @@ def get_exercise_progress(conn):
             e.exercise_name,
             SUM(he.weightlb * he.reps) as total_volume_lbs,
             SUM(he.weightkg * he.reps) as total_volume_kg,
-            MIN(date(h.date/1000, 'unixepoch')) as first_performed,
-            MAX(date(h.date/1000, 'unixepoch')) as last_performed
+            MIN(hl.ymd) as first_performed,
+            MAX(hl.ymd) as last_performed
         FROM exercises e
         JOIN history_exercises he ON e.id = he.exercise_id
-        JOIN history h ON he.history_id = h.id
+        JOIN history_local hl ON he.history_id = hl.id
         WHERE he.reps > 0
         GROUP BY e.exercise_name
         ORDER BY total_volume_lbs DESC
     """)
 
     exercise_progress = {}
-
-    for row in cursor.fetchall():
-        exercise_name = row['exercise_name']
-
-        # Get PR history for this exercise (max weight for each rep range)
-        cursor.execute("""
-            SELECT
-                date(h.date/1000, 'unixepoch') as workout_date,
-                he.weightlb,
-                he.weightkg,
-                he.reps
-            FROM history_exercises he
-            JOIN history h ON he.history_id = h.id
-            JOIN exercises e ON he.exercise_id = e.id
-            WHERE e.exercise_name = ? AND he.reps > 0
-            ORDER BY h.date, he.weightlb DESC
-        """, (exercise_name,))
-
-        # Track PRs (best weight for each rep count)
-        prs_by_reps = {}
-        prs = []
-
-        for pr_row in cursor.fetchall():
-            reps = pr_row['reps']
-            weight_lbs = pr_row['weightlb'] or 0
-            weight_kg = pr_row['weightkg'] or 0
-
-            if reps not in prs_by_reps or weight_lbs > prs_by_reps[reps]['weightLbs']:
-                prs_by_reps[reps] = {
-                    'date': pr_row['workout_date'],
-                    'weightLbs': round(weight_lbs, 2),
-                    'weightKg': round(weight_kg, 2),
-                    'reps': reps
-                }
-
-        # Convert to sorted list
-        prs = sorted(prs_by_reps.values(), key=lambda x: x['date'])
-
+    for exercise_name, total_volume_lbs, total_volume_kg, first_performed, last_performed in cursor:
         exercise_progress[exercise_name] = {
-            'totalVolumeLbs': round(row['total_volume_lbs'] or 0, 2),
-            'totalVolumeKg': round(row['total_volume_kg'] or 0, 2),
-            'firstPerformed': row['first_performed'],
-            'lastPerformed': row['last_performed'],
-            'prs': prs
+            'totalVolumeLbs': round(total_volume_lbs or 0, 2),
+            'totalVolumeKg': round(total_volume_kg or 0, 2),
+            'firstPerformed': first_performed,
+            'lastPerformed': last_performed,
+            'prs': []
         }
 
-    return exercise_progress
+    # PR history (max weight for each rep count): every exercise's sets in one
+    # stream, grouped by exercise, holding only the current exercise's PRs
+    cursor.execute("""
+        SELECT
+            e.exercise_name,
+            hl.ymd as workout_date,
+            he.weightlb,
+            he.weightkg,
+            he.reps
+        FROM history_exercises he
+        JOIN history h ON he.history_id = h.id
+        JOIN history_local hl ON hl.id = h.id
+        JOIN exercises e ON he.exercise_id = e.id
+        WHERE he.reps > 0
+        ORDER BY e.exercise_name, h.date, he.weightlb DESC
+    """)
 
-def calculate_e1rm(weight, reps):
-    """Calculate estimated 1RM using Epley formula.
+    current = None
+    prs_by_reps = {}
+    for exercise_name, workout_date, weight_lbs, weight_kg, reps in cursor:
+        if exercise_name != current:
+            if current is not None:
+                exercise_progress[current]['prs'] = sorted(prs_by_reps.values(), key=lambda x: x['date'])
+            current = exercise_name
+            prs_by_reps = {}
+
+        weight_lbs = weight_lbs or 0
+        if reps not in prs_by_reps or weight_lbs > prs_by_reps[reps]['weightLbs']:
+            prs_by_reps[reps] = {
+                'date': workout_date,
+                'weightLbs': round(weight_lbs, 2),
+                'weightKg': round(weight_kg or 0, 2),
+                'reps': reps
+            }
+    if current is not None:
+        exercise_progress[current]['prs'] = sorted(prs_by_reps.values(), key=lambda x: x['date'])
 
-    Note: E1RM formulas become increasingly inaccurate above 5-6 reps.
-    We cap calculations at 8 reps for reasonable accuracy.
-    - 1-5 reps: ±5% accuracy
-    - 6-8 reps: ±10% accuracy
-    - 9+ reps: Poor accuracy, not recommended
-    """
-    if reps == 1:
-        return weight
-    # Epley formula: weight × (1 + reps/30)
-    return weight * (1 + reps / 30)
+    return exercise_progress
 
 def calculate_wilks(total_kg, bodyweight_kg, is_male=True):
     """Calculate Wilks score for powerlifting total.
@@ -412,64 +523,188 @@ def calculate_wilks(total_kg, bodyweight_kg, is_male=True):
 
     return round(total_kg * coeff, 2)
 
+def load_lift_registry(path=LIFTS_CONFIG_PATH):
+    """Read the tracked lifts and lift groups from a JSON config (see lifts.json).
+
+    Returns {'lifts': [lift, ...], 'groups': {name: [lift key, ...]}, 'e1rmFormula': name};
+    lifts keep the config order, which is also their order in every per-lift section.
+    """
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+
+    lifts = config.get('lifts', [])
+    owner = {}
+    for lift in lifts:
+        if lift['key'] in {l['key'] for l in lifts if l is not lift}:
+            raise ValueError(f"{path}: lift '{lift['key']}' is defined more than once")
+        for name in lift['names']:
+            other = owner.setdefault(name.lower(), lift['key'])
+            if other != lift['key']:
+                raise ValueError(f"{path}: exercise '{name}' is listed under both '{other}' and '{lift['key']}'")
+
+    groups = config.get('groups', {})
+    keys = {lift['key'] for lift in lifts}
+    for group, members in groups.items():
+        unknown = [key for key in members if key not in keys]
+        if unknown:
+            raise ValueError(f"{path}: group '{group}' names unknown lift(s): {', '.join(unknown)}")
+
+    formula = config.get('e1rmFormula', DEFAULT_E1RM_FORMULA)
+    if formula not in E1RM_FORMULAS:
+        raise ValueError(f"{path}: unknown e1rmFormula '{formula}' (expected one of: {', '.join(E1RM_FORMULAS)})")
+
+    return {'lifts': lifts, 'groups': groups, 'e1rmFormula': formula}
+
+def get_lift_registry(conn):
+    """The lift registry, read once per connection."""
+    return memoized(conn, 'lift_registry', lambda conn: load_lift_registry())
+
+def lift_group(conn, name):
+    """Lift keys of a configured group (empty if the group is not configured)."""
+    return get_lift_registry(conn)['groups'].get(name, [])
+
+class LiftSets:
+    """Working sets (reps > 0) of one tracked lift in workout order, as parallel arrays.
+
+    Ties on the workout timestamp keep set id order, so "first set with the
+    best value" matches what the per-lift queries used to return. The integer
+    columns are typed arrays (8 bytes a set rather than an int object and a
+    list slot); the weight and RPE columns stay lists because they hold NULLs,
+    but of shared values (see load_lift_sets).
+    """
+
+    __slots__ = ('exercise_names', 'exercise_id', 'history_id', 'date', 'day', 'ymd', 'ym',
+                 'weightlb', 'weightkg', 'reps', 'rpe')
+
+    def __init__(self, exercise_names):
+        self.exercise_names = exercise_names
+        self.exercise_id = array('q')
+        self.history_id = array('q')
+        self.date = array('q')
+        self.day = array('q')
+        self.ymd = []
+        self.ym = []
+        self.weightlb = []
+        self.weightkg = []
+        self.reps = array('q')
+        self.rpe = []
+
+    def __len__(self):
+        return len(self.reps)
+
+    @property
+    def exercise_name(self):
+        """Name of the exercise the lift was first trained as."""
+        return self.exercise_names[self.exercise_id[0]] if self.exercise_id else None
+
+LIFT_SETS_QUERY = """
+    SELECT he.exercise_id, h.id, h.date, hl.day, hl.ymd, hl.ym, he.weightlb, he.weightkg, he.reps, he.RPE
+    FROM history_exercises he
+    JOIN history h ON he.history_id = h.id
+    JOIN history_local hl ON hl.id = h.id
+    WHERE he.exercise_id IN ({ids})
+    AND he.reps > 0
+    ORDER BY h.date, he.id
+"""
+
+def load_lift_sets(conn):
+    """Fetch the working sets of every tracked lift in one scan; returns {lift: LiftSets}.
+
+    The scan covers all lifts at once, so its cost depends on the number of
+    sets, not on how many lifts are configured.
+    """
+    ensure_local_days(conn)
+    cursor = conn.cursor()
+
+    # Same matching as LOWER(e.exercise_name) IN (LOWER(?), ...)
+    registry = get_lift_registry(conn)
+    lift_by_name = {name.lower(): lift['key'] for lift in registry['lifts'] for name in lift['names']}
+    exercise_lift = {}
+    exercise_names = {}
+    for exercise_id, name, lowered in cursor.execute("SELECT id, exercise_name, LOWER(exercise_name) FROM exercises"):
+        if lowered in lift_by_name:
+            exercise_lift[exercise_id] = lift_by_name[lowered]
+            exercise_names[exercise_id] = name
+
+    lifts = {lift['key']: LiftSets(exercise_names) for lift in registry['lifts']}
+    if not exercise_lift:
+        return lifts
+    cursor.execute(LIFT_SETS_QUERY.format(ids=','.join(str(i) for i in exercise_lift)))
+    # Sets of a workout arrive together; they share its date strings instead of a copy per row.
+    # Weights and RPEs (REAL columns) take few distinct values, so each value is one shared float.
+    workout_id = workout_ymd = workout_ym = None
+    share = {}.setdefault
+    for exercise_id, history_id, date, day, ymd, ym, weightlb, weightkg, reps, rpe in cursor:
+        if history_id == workout_id:
+            ymd, ym = workout_ymd, workout_ym
+        else:
+            workout_id, workout_ymd, workout_ym = history_id, ymd, ym
+        sets = lifts[exercise_lift[exercise_id]]
+        sets.exercise_id.append(exercise_id)
+        sets.history_id.append(history_id)
+        sets.date.append(date)
+        sets.day.append(day)
+        sets.ymd.append(ymd)
+        sets.ym.append(ym)
+        sets.weightlb.append(share(weightlb, weightlb))
+        sets.weightkg.append(share(weightkg, weightkg))
+        sets.reps.append(reps)
+        sets.rpe.append(share(rpe, rpe))
+    return lifts
+
+def get_lift_sets(conn):
+    """Per-lift working sets shared by every per-lift section, fetched once per connection."""
+    return memoized(conn, 'lift_sets', load_lift_sets)
+
+def load_workout_e1rms(conn):
+    """e1RM of every working set with the configured formula, and each date's best set.
+
+    Returns {lift: (e1rm lbs, e1rm kg, {ymd: index of the date's first best set})},
+    the lists parallel to the lift's LiftSets (None above MAX_E1RM_REPS reps).
+    """
+    formula = get_lift_registry(conn)['e1rmFormula']
+    workout_e1rms = {}
+    for lift, sets in get_lift_sets(conn).items():
+        e1rm_lbs, e1rm_kg = e1rm_columns((sets.weightlb, sets.weightkg), sets.reps, formula, sets.rpe)
+        workout_e1rms[lift] = (e1rm_lbs, e1rm_kg, best_per_group(sets.ymd, e1rm_lbs))
+    return workout_e1rms
+
+def get_workout_e1rms(conn):
+    """Per-set e1RMs and per-date bests shared by the e1RM, totals and PR sections."""
+    return memoized(conn, 'workout_e1rms', load_workout_e1rms)
+
+def max_or_none(current, value):
+    """MAX() over one more value: NULLs are ignored, and an all-NULL group stays NULL."""
+    if value is None:
+        return current
+    return value if current is None or value > current else current
+
 def get_big_three_e1rm(conn):
     """Get estimated 1RM data for Big 3 lifts from every workout."""
-    cursor = conn.cursor()
     big_three_e1rm = {}
+    workout_e1rms = get_workout_e1rms(conn)
 
-    for canonical_name, name_list in [('squat', SQUAT_NAMES), ('bench', BENCH_NAMES), ('deadlift', DEADLIFT_NAMES), ('ohp', OHP_NAMES)]:
-        # Get all sets for this exercise
-        cursor.execute(f"""
-            SELECT
-                date(h.date/1000, 'unixepoch') as workout_date,
-                he.weightlb,
-                he.weightkg,
-                he.reps,
-                e.exercise_name
-            FROM history_exercises he
-            JOIN history h ON he.history_id = h.id
-            JOIN exercises e ON he.exercise_id = e.id
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0
-            ORDER BY h.date
-        """, name_list)
-
-        rows = cursor.fetchall()
-        if not rows:
+    for canonical_name, sets in get_lift_sets(conn).items():
+        if not sets:
             continue
 
-        # Group by workout date and find best e1RM per workout
-        workout_e1rms = {}
-        for row in rows:
-            date = row['workout_date']
-            weight_lbs = row['weightlb'] or 0
-            weight_kg = row['weightkg'] or 0
-            reps = row['reps']
-
-            # Skip sets with more than 8 reps (e1RM formula less accurate)
-            # E1RM accuracy degrades significantly above 6-8 reps
-            if reps > 8:
-                continue
-
-            e1rm_lbs = calculate_e1rm(weight_lbs, reps)
-            e1rm_kg = calculate_e1rm(weight_kg, reps)
-
-            if date not in workout_e1rms or e1rm_lbs > workout_e1rms[date]['e1rmLbs']:
-                workout_e1rms[date] = {
-                    'date': date,
-                    'e1rmLbs': round(e1rm_lbs, 2),
-                    'e1rmKg': round(e1rm_kg, 2),
-                    'actualWeightLbs': round(weight_lbs, 2),
-                    'actualWeightKg': round(weight_kg, 2),
-                    'reps': reps
-                }
-
-        # Convert to sorted list
-        e1rm_data = sorted(workout_e1rms.values(), key=lambda x: x['date'])
+        # Best e1RM per workout date (sets above 8 reps have none)
+        e1rm_lbs, e1rm_kg, best = workout_e1rms[canonical_name]
+        e1rm_data = [
+            {
+                'date': date,
+                'e1rmLbs': round(e1rm_lbs[i], 2),
+                'e1rmKg': round(e1rm_kg[i], 2),
+                'actualWeightLbs': round(sets.weightlb[i] or 0, 2),
+                'actualWeightKg': round(sets.weightkg[i] or 0, 2),
+                'reps': sets.reps[i]
+            }
+            for date, i in sorted(best.items())
+        ]
 
         if e1rm_data:
             big_three_e1rm[canonical_name] = {
-                'exerciseName': rows[0]['exercise_name'],
+                'exerciseName': sets.exercise_name,
                 'e1rmHistory': e1rm_data
             }
 
@@ -477,265 +712,184 @@ def get_big_three_e1rm(conn):
 
 def get_big_three_volume(conn):
     """Get volume time series for Big 3 lifts (daily aggregation)."""
-    cursor = conn.cursor()
     big_three_volume = {}
 
-    for canonical_name, name_list in [('squat', SQUAT_NAMES), ('bench', BENCH_NAMES), ('deadlift', DEADLIFT_NAMES), ('ohp', OHP_NAMES)]:
-        # Get daily volume for this exercise
-        cursor.execute(f"""
-            SELECT
-                date(h.date/1000, 'unixepoch') as workout_date,
-                SUM(he.weightlb * he.reps) as volume_lbs,
-                SUM(he.weightkg * he.reps) as volume_kg,
-                e.exercise_name
-            FROM history_exercises he
-            JOIN history h ON he.history_id = h.id
-            JOIN exercises e ON he.exercise_id = e.id
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0
-            GROUP BY workout_date
-            ORDER BY workout_date
-        """, name_list)
-
-        rows = cursor.fetchall()
-        if not rows:
+    for canonical_name, sets in get_lift_sets(conn).items():
+        if not sets:
             continue
 
+        # day -> [date, volume lbs, volume kg]; a NULL weight adds nothing, like SUM()
+        days = {}
+        for day, date, weight_lbs, weight_kg, reps in zip(sets.day, sets.ymd, sets.weightlb, sets.weightkg, sets.reps):
+            totals = days.get(day)
+            if totals is None:
+                totals = days[day] = [date, None, None]
+            if weight_lbs is not None:
+                totals[1] = (totals[1] or 0) + weight_lbs * reps
+            if weight_kg is not None:
+                totals[2] = (totals[2] or 0) + weight_kg * reps
+
         daily_volume = []
-        for row in rows:
+        for day in sorted(days):
+            date, volume_lbs, volume_kg = days[day]
             daily_volume.append({
-                'date': row['workout_date'],
-                'volumeLbs': round(row['volume_lbs'] or 0, 2),
-                'volumeKg': round(row['volume_kg'] or 0, 2)
+                'date': date,
+                'volumeLbs': round(volume_lbs or 0, 2),
+                'volumeKg': round(volume_kg or 0, 2)
             })
 
-        if daily_volume:
-            big_three_volume[canonical_name] = {
-                'exerciseName': rows[0]['exercise_name'],
-                'dailyVolume': daily_volume
-            }
+        big_three_volume[canonical_name] = {
+            'exerciseName': sets.exercise_name,
+            'dailyVolume': daily_volume
+        }
 
     return big_three_volume
 
-
+PR_EVENTS_QUERY = """
+    SELECT pr_date, exercise_id, reps
+    FROM (
+        SELECT
+            hl.ymd as pr_date,
+            he.exercise_id,
+            he.reps,
+            MAX(he.weightlb) as max_weight_day,
+            MAX(MAX(he.weightlb)) OVER (
+                PARTITION BY he.exercise_id, he.reps
+                ORDER BY h.date
+                ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+            ) as prev_max
+        FROM history_exercises he
+        JOIN history h ON he.history_id = h.id
+        JOIN history_local hl ON hl.id = h.id
+        WHERE he.reps > 0 AND he.reps <= 8
+        GROUP BY he.exercise_id, he.reps, h.date
+    ) subq
+    WHERE prev_max IS NOT NULL AND max_weight_day > prev_max
+    ORDER BY pr_date
+"""
 
 def get_programs(conn):
     """Get program history and statistics."""
     cursor = conn.cursor()
 
+    # Days on which an exercise+rep combination beat its previous best weight.
+    # Only reps 1-8 count, for consistency with E1RM accuracy standards.
+    # One scan serves every program; each takes the slice within its date range.
+    pr_dates = []
+    pr_keys = []
+    for pr_date, exercise_id, reps in cursor.execute(PR_EVENTS_QUERY):
+        pr_dates.append(pr_date)
+        pr_keys.append((exercise_id, reps))
+
     cursor.execute("""
         SELECT
             p.id as program_id,
             p.routine as name,
-            MIN(date(h.date/1000, 'unixepoch')) as start_date,
-            MAX(date(h.date/1000, 'unixepoch')) as end_date,
+            MIN(hl.ymd) as start_date,
+            MAX(hl.ymd) as end_date,
             COUNT(DISTINCT h.id) as workout_count,
             SUM(he.weightlb * he.reps) as total_volume_lbs,
             SUM(he.weightkg * he.reps) as total_volume_kg
         FROM programs p
         JOIN history h ON p.id = h.program_id
+        JOIN history_local hl ON hl.id = h.id
         LEFT JOIN history_exercises he ON h.id = he.history_id AND he.reps > 0
         GROUP BY p.id, p.routine
         ORDER BY start_date
     """)
 
     programs = []
-    for row in cursor.fetchall():
-        program_id = row['program_id']
-        start_date = row['start_date']
-        end_date = row['end_date']
-
-        # Count unique PRs set during this program's date range (distinct exercise+rep combinations where weight increased)
-        # Only count reps 1-8 for consistency with E1RM accuracy standards
-        cursor.execute("""
-            SELECT COUNT(DISTINCT exercise_id || '-' || reps) as pr_count
-            FROM (
-                SELECT
-                    date(h.date/1000, 'unixepoch') as pr_date,
-                    he.exercise_id,
-                    he.reps,
-                    MAX(he.weightlb) as max_weight_day,
-                    MAX(MAX(he.weightlb)) OVER (
-                        PARTITION BY he.exercise_id, he.reps
-                        ORDER BY h.date
-                        ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
-                    ) as prev_max
-                FROM history_exercises he
-                JOIN history h ON he.history_id = h.id
-                WHERE he.reps > 0 AND he.reps <= 8
-                GROUP BY he.exercise_id, he.reps, h.date
-            ) subq
-            WHERE prev_max IS NOT NULL AND max_weight_day > prev_max
-            AND pr_date BETWEEN ? AND ?
-        """, (start_date, end_date))
-
-        pr_count = cursor.fetchone()['pr_count']
+    for _, name, start_date, end_date, workout_count, total_volume_lbs, total_volume_kg in cursor:
+        # Count unique PRs set during this program's date range (distinct exercise+rep combinations)
+        in_range = pr_keys[bisect_left(pr_dates, start_date):bisect_right(pr_dates, end_date)]
 
         programs.append({
-            'name': row['name'],
+            'name': name,
             'startDate': start_date,
             'endDate': end_date,
-            'workouts': row['workout_count'],
-            'totalVolumeLbs': round(row['total_volume_lbs'] or 0, 2),
-            'totalVolumeKg': round(row['total_volume_kg'] or 0, 2),
-            'prsSet': pr_count
+            'workouts': workout_count,
+            'totalVolumeLbs': round(total_volume_lbs or 0, 2),
+            'totalVolumeKg': round(total_volume_kg or 0, 2),
+            'prsSet': len(set(in_range))
         })
 
     return programs
 
 def get_workouts_by_day_of_week(conn):
     """Calculate average volume and frequency by day of week."""
-    cursor = conn.cursor()
-
-    cursor.execute("""
-        SELECT
-            CAST(strftime('%w', h.date/1000, 'unixepoch') AS INTEGER) as day_num,
-            CASE CAST(strftime('%w', h.date/1000, 'unixepoch') AS INTEGER)
-                WHEN 0 THEN 'Sunday'
-                WHEN 1 THEN 'Monday'
-                WHEN 2 THEN 'Tuesday'
-                WHEN 3 THEN 'Wednesday'
-                WHEN 4 THEN 'Thursday'
-                WHEN 5 THEN 'Friday'
-                WHEN 6 THEN 'Saturday'
-            END as day_name,
-            COUNT(DISTINCT h.id) as workout_count,
-            AVG(daily_volume_lbs) as avg_volume_lbs,
-            AVG(daily_volume_kg) as avg_volume_kg
-        FROM history h
-        LEFT JOIN (
-            SELECT
-                history_id,
-                SUM(weightlb * reps) as daily_volume_lbs,
-                SUM(weightkg * reps) as daily_volume_kg
-            FROM history_exercises
-            WHERE reps > 0
-            GROUP BY history_id
-        ) volumes ON h.id = volumes.history_id
-        GROUP BY day_num
-        ORDER BY day_num
-    """)
+    workouts = get_workouts(conn)
+
+    # weekday -> [workouts, volume lbs, workouts with lbs, volume kg, workouts with kg]
+    totals = {}
+    for weekday, volume_lbs, volume_kg in zip(workouts.weekday, workouts.volume_lbs, workouts.volume_kg):
+        day_totals = totals.setdefault(weekday, [0, 0, 0, 0, 0])
+        day_totals[0] += 1
+        # Like AVG(), the averages skip workouts without working sets
+        if volume_lbs is not None:
+            day_totals[1] += volume_lbs
+            day_totals[2] += 1
+        if volume_kg is not None:
+            day_totals[3] += volume_kg
+            day_totals[4] += 1
 
     by_day = {}
-    for row in cursor.fetchall():
-        by_day[row['day_name']] = {
-            'count': row['workout_count'],
-            'avgVolumeLbs': round(row['avg_volume_lbs'] or 0, 2),
-            'avgVolumeKg': round(row['avg_volume_kg'] or 0, 2)
+    for weekday in sorted(totals):
+        count, volume_lbs, with_lbs, volume_kg, with_kg = totals[weekday]
+        by_day[WEEKDAY_NAMES[weekday]] = {
+            'count': count,
+            'avgVolumeLbs': round(volume_lbs / with_lbs, 2) if with_lbs else 0,
+            'avgVolumeKg': round(volume_kg / with_kg, 2) if with_kg else 0
         }
 
     return by_day
 
 def get_notable_workouts(conn):
     """Identify notable workouts (volume records, set records, comebacks)."""
+    workouts = get_workouts(conn)
     cursor = conn.cursor()
-    notable = []
+    program_names = dict(cursor.execute("SELECT id, routine FROM programs"))
+    no_volume = float('-inf')
+
+    def workout(i, reason, category):
+        return {
+            'date': workouts.ymd[i],
+            'reason': reason,
+            'volumeLbs': round(workouts.volume_lbs[i] or 0, 2),
+            'volumeKg': round(workouts.volume_kg[i] or 0, 2),
+            'details': program_names.get(workouts.program_id[i]) or 'Unknown Program',
+            'category': category
+        }
 
-    # Top 5 Volume Records
-    cursor.execute("""
-        SELECT
-            date(h.date/1000, 'unixepoch') as workout_date,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg,
-            p.routine as program_name
-        FROM history h
-        LEFT JOIN history_exercises he ON h.id = he.history_id AND he.reps > 0
-        LEFT JOIN programs p ON h.program_id = p.id
-        GROUP BY h.id
-        ORDER BY volume_lbs DESC
-        LIMIT 5
-    """)
+    notable = []
+    rows = range(len(workouts))
 
-    for i, row in enumerate(cursor.fetchall(), 1):
-        notable.append({
-            'date': row['workout_date'],
-            'reason': f'Volume Record #{i}',
-            'volumeLbs': round(row['volume_lbs'] or 0, 2),
-            'volumeKg': round(row['volume_kg'] or 0, 2),
-            'details': row['program_name'] or 'Unknown Program',
-            'category': 'volume'
-        })
+    # Top 5 Volume Records; a heap keeps only the current top 5 while scanning,
+    # and ties go to the lower workout id
+    volume, ids = workouts.volume_lbs, workouts.id
+    top_volume = heapq.nlargest(NOTABLE_COUNT, rows,
+                                key=lambda i: (no_volume if volume[i] is None else volume[i], -ids[i]))
+    for rank, i in enumerate(top_volume, 1):
+        notable.append(workout(i, f'Volume Record #{rank}', 'volume'))
 
     # Top 5 Most Sets
-    cursor.execute("""
-        SELECT
-            date(h.date/1000, 'unixepoch') as workout_date,
-            COUNT(*) as set_count,
-            SUM(he.weightlb * he.reps) as volume_lbs,
-            SUM(he.weightkg * he.reps) as volume_kg,
-            p.routine as program_name
-        FROM history h
-        LEFT JOIN history_exercises he ON h.id = he.history_id AND he.reps > 0
-        LEFT JOIN programs p ON h.program_id = p.id
-        GROUP BY h.id
-        ORDER BY set_count DESC
-        LIMIT 5
-    """)
+    sets = workouts.sets
+    for rank, i in enumerate(heapq.nlargest(NOTABLE_COUNT, rows, key=lambda i: (sets[i], -ids[i])), 1):
+        notable.append(workout(i, f'Most Sets #{rank} ({sets[i]} sets)', 'sets'))
 
-    for i, row in enumerate(cursor.fetchall(), 1):
-        notable.append({
-            'date': row['workout_date'],
-            'reason': f'Most Sets #{i} ({row["set_count"]} sets)',
-            'volumeLbs': round(row['volume_lbs'] or 0, 2),
-            'volumeKg': round(row['volume_kg'] or 0, 2),
-            'details': row['program_name'] or 'Unknown Program',
-            'category': 'sets'
-        })
-
-    # Find comeback workouts (first workout after 14+ day gap)
-    cursor.execute("""
-        SELECT
-            workout_date,
-            volume_lbs,
-            volume_kg,
-            program_name,
-            days_gap
-        FROM (
-            SELECT
-                date(h.date/1000, 'unixepoch') as workout_date,
-                SUM(he.weightlb * he.reps) as volume_lbs,
-                SUM(he.weightkg * he.reps) as volume_kg,
-                p.routine as program_name,
-                JULIANDAY(datetime(h.date/1000, 'unixepoch')) - JULIANDAY(LAG(datetime(h.date/1000, 'unixepoch')) OVER (ORDER BY h.date)) as days_gap
-            FROM history h
-            LEFT JOIN history_exercises he ON h.id = he.history_id AND he.reps > 0
-            LEFT JOIN programs p ON h.program_id = p.id
-            GROUP BY h.id
-        ) subq
-        WHERE days_gap >= 14
-        ORDER BY workout_date DESC
-        LIMIT 5
-    """)
-
-    for row in cursor.fetchall():
-        notable.append({
-            'date': row['workout_date'],
-            'reason': f'Comeback ({int(row["days_gap"])} days off)',
-            'volumeLbs': round(row['volume_lbs'] or 0, 2),
-            'volumeKg': round(row['volume_kg'] or 0, 2),
-            'details': row['program_name'] or 'Unknown Program',
-            'category': 'comeback'
-        })
+    # Latest comeback workouts (first workout after 14+ day gap)
+    gaps = workouts.gap_days
+    comebacks = [i for i in rows if gaps[i] is not None and gaps[i] >= COMEBACK_GAP_DAYS]
+    for i in heapq.nlargest(NOTABLE_COUNT, comebacks, key=workouts.ymd.__getitem__):
+        notable.append(workout(i, f'Comeback ({int(gaps[i])} days off)', 'comeback'))
 
     # Sort by date descending
     notable.sort(key=lambda x: x['date'], reverse=True)
 
     return notable
 
-def get_milestones(conn, summary):
+def get_milestones(conn):
     """Calculate volume and workout count milestones."""
-    cursor = conn.cursor()
-
-    # Get cumulative volume over time
-    cursor.execute("""
-        SELECT
-            date(h.date/1000, 'unixepoch') as workout_date,
-            SUM(he.weightlb * he.reps) as volume_lbs
-        FROM history h
-        LEFT JOIN history_exercises he ON h.id = he.history_id AND he.reps > 0
-        GROUP BY h.id
-        ORDER BY h.date
-    """)
+    workouts = get_workouts(conn)
 
     milestones = []
     cumulative_volume = 0
@@ -746,14 +900,15 @@ def get_milestones(conn, summary):
     volume_idx = 0
     workout_idx = 0
 
-    for row in cursor.fetchall():
-        cumulative_volume += (row['volume_lbs'] or 0)
+    # Cumulative volume over time
+    for workout_date, volume_lbs in zip(workouts.ymd, workouts.volume_lbs):
+        cumulative_volume += (volume_lbs or 0)
         workout_count += 1
 
         # Check volume milestones
         while volume_idx < len(volume_milestones) and cumulative_volume >= volume_milestones[volume_idx]:
             milestones.append({
-                'date': row['workout_date'],
+                'date': workout_date,
                 'milestone': f'{volume_milestones[volume_idx]:,} lbs total volume',
                 'type': 'volume',
                 'icon': '<i class="fa-solid fa-chart-column"></i>'
@@ -763,7 +918,7 @@ def get_milestones(conn, summary):
         # Check workout count milestones
         while workout_idx < len(workout_milestones) and workout_count >= workout_milestones[workout_idx]:
             milestones.append({
-                'date': row['workout_date'],
+                'date': workout_date,
                 'milestone': f'{workout_milestones[workout_idx]} workouts completed',
                 'type': 'workouts',
                 'icon': '<i class="fa-solid fa-dumbbell"></i>'
@@ -777,8 +932,6 @@ def get_milestones(conn, summary):
 
 def get_plate_milestones(conn):
     """Calculate when plate milestones were first achieved for Big 3 lifts."""
-    cursor = conn.cursor()
-
     # Plate thresholds in lbs
     plate_thresholds = {
         1: 135,   # 1 plate per side
@@ -790,37 +943,32 @@ def get_plate_milestones(conn):
 
     plate_milestones = {}
 
-    for canonical_name, name_list in [('squat', SQUAT_NAMES), ('bench', BENCH_NAMES), ('deadlift', DEADLIFT_NAMES), ('ohp', OHP_NAMES)]:
-        # Get all sets ordered by date
-        cursor.execute(f"""
-            SELECT
-                date(h.date/1000, 'unixepoch') as workout_date,
-                MAX(he.weightlb) as max_weight_lbs,
-                MAX(he.weightkg) as max_weight_kg
-            FROM history_exercises he
-            JOIN history h ON he.history_id = h.id
-            JOIN exercises e ON he.exercise_id = e.id
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0
-            GROUP BY workout_date
-            ORDER BY h.date
-        """, name_list)
-
-        rows = cursor.fetchall()
-        if not rows:
+    for canonical_name, sets in get_lift_sets(conn).items():
+        if not sets:
             continue
 
+        # Heaviest set of each training day
+        days = {}
+        for day, date, weight_lbs, weight_kg in zip(sets.day, sets.ymd, sets.weightlb, sets.weightkg):
+            best = days.get(day)
+            if best is None:
+                days[day] = [date, weight_lbs, weight_kg]
+            else:
+                best[1] = max_or_none(best[1], weight_lbs)
+                best[2] = max_or_none(best[2], weight_kg)
+
         achieved = {}
-        for row in rows:
-            max_weight = row['max_weight_lbs'] or 0
+        for day in sorted(days):
+            date, max_weight, max_weight_kg = days[day]
+            max_weight = max_weight or 0
             for plates, threshold in plate_thresholds.items():
                 if plates not in achieved and max_weight >= threshold:
                     achieved[plates] = {
-                        'date': row['workout_date'],
+                        'date': date,
                         'weightLbs': threshold,
                         'weightKg': round(threshold * 0.453592, 1),
                         'actualWeightLbs': round(max_weight, 2),
-                        'actualWeightKg': round(row['max_weight_kg'] or 0, 2)
+                        'actualWeightKg': round(max_weight_kg or 0, 2)
                     }
 
         plate_milestones[canonical_name] = achieved
@@ -828,42 +976,18 @@ def get_plate_milestones(conn):
     return plate_milestones
 
 def get_powerlifting_totals(conn):
-    """Calculate combined S+B+D totals over time for 1000 lb club tracking."""
-    cursor = conn.cursor()
+    """Calculate combined S+B+D totals over time for 1000 lb club tracking.
 
-    # Get all e1RM data for each lift by date
-    lift_e1rms = {}
+    The lifts in the total are the configured powerlifting group.
+    """
+    workout_e1rms = get_workout_e1rms(conn)
+    members = lift_group(conn, POWERLIFTING_GROUP)
 
-    for canonical_name, name_list in [('squat', SQUAT_NAMES), ('bench', BENCH_NAMES), ('deadlift', DEADLIFT_NAMES)]:
-        cursor.execute(f"""
-            SELECT
-                date(h.date/1000, 'unixepoch') as workout_date,
-                he.weightlb,
-                he.weightkg,
-                he.reps
-            FROM history_exercises he
-            JOIN history h ON he.history_id = h.id
-            JOIN exercises e ON he.exercise_id = e.id
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0 AND he.reps <= 8
-            ORDER BY h.date
-        """, name_list)
-
-        # Track best e1RM for each workout date
-        workout_e1rms = {}
-        for row in cursor.fetchall():
-            date = row['workout_date']
-            weight_lbs = row['weightlb'] or 0
-            weight_kg = row['weightkg'] or 0
-            reps = row['reps']
-
-            e1rm_lbs = calculate_e1rm(weight_lbs, reps)
-            e1rm_kg = calculate_e1rm(weight_kg, reps)
-
-            if date not in workout_e1rms or e1rm_lbs > workout_e1rms[date]['lbs']:
-                workout_e1rms[date] = {'lbs': e1rm_lbs, 'kg': e1rm_kg}
-
-        lift_e1rms[canonical_name] = workout_e1rms
+    # Best e1RM of each lift for each workout date
+    lift_e1rms = {}
+    for canonical_name in members:
+        e1rm_lbs, e1rm_kg, best = workout_e1rms[canonical_name]
+        lift_e1rms[canonical_name] = {date: {'lbs': e1rm_lbs[i], 'kg': e1rm_kg[i]} for date, i in best.items()}
 
     # Get all unique dates and track running max for each lift
     all_dates = set()
@@ -873,8 +997,8 @@ def get_powerlifting_totals(conn):
 
     # Calculate running total for each date
     totals_history = []
-    running_max = {'squat': 0, 'bench': 0, 'deadlift': 0}
-    running_max_kg = {'squat': 0, 'bench': 0, 'deadlift': 0}
+    running_max = {lift: 0 for lift in members}
+    running_max_kg = {lift: 0 for lift in members}
 
     club_milestones = {
         500: None,
@@ -889,7 +1013,7 @@ def get_powerlifting_totals(conn):
 
     for date in all_dates:
         # Update running max for any lift trained on this date
-        for lift in ['squat', 'bench', 'deadlift']:
+        for lift in members:
             if date in lift_e1rms.get(lift, {}):
                 if lift_e1rms[lift][date]['lbs'] > running_max[lift]:
                     running_max[lift] = lift_e1rms[lift][date]['lbs']
@@ -902,9 +1026,7 @@ def get_powerlifting_totals(conn):
             'date': date,
             'totalLbs': round(total_lbs, 2),
             'totalKg': round(total_kg, 2),
-            'squatE1rm': round(running_max['squat'], 2),
-            'benchE1rm': round(running_max['bench'], 2),
-            'deadliftE1rm': round(running_max['deadlift'], 2)
+            **{f'{lift}E1rm': round(running_max[lift], 2) for lift in members}
         })
 
         # Check club milestones
@@ -914,9 +1036,7 @@ def get_powerlifting_totals(conn):
                     'date': date,
                     'totalLbs': round(total_lbs, 2),
                     'totalKg': round(total_kg, 2),
-                    'squat': round(running_max['squat'], 2),
-                    'bench': round(running_max['bench'], 2),
-                    'deadlift': round(running_max['deadlift'], 2)
+                    **{lift: round(running_max[lift], 2) for lift in members}
                 }
 
     # Get current (latest) total
@@ -932,70 +1052,42 @@ def get_powerlifting_totals(conn):
 
 def get_all_time_prs(conn):
     """Get all-time PR records for Big 3 lifts."""
-    cursor = conn.cursor()
-
     all_time_prs = {}
+    workout_e1rms = get_workout_e1rms(conn)
 
-    for canonical_name, name_list in [('squat', SQUAT_NAMES), ('bench', BENCH_NAMES), ('deadlift', DEADLIFT_NAMES), ('ohp', OHP_NAMES)]:
-        # Get max weight for each rep range with the date it was achieved
-        cursor.execute(f"""
-            SELECT
-                he.reps,
-                he.weightlb as weight_lbs,
-                he.weightkg as weight_kg,
-                date(h.date/1000, 'unixepoch') as pr_date
-            FROM history_exercises he
-            JOIN history h ON he.history_id = h.id
-            JOIN exercises e ON he.exercise_id = e.id
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0 AND he.reps <= 8
-            AND he.weightlb = (
-                SELECT MAX(he2.weightlb)
-                FROM history_exercises he2
-                JOIN exercises e2 ON he2.exercise_id = e2.id
-                WHERE LOWER(e2.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-                AND he2.reps = he.reps
-            )
-            GROUP BY he.reps
-            ORDER BY he.reps
-        """, name_list + name_list)
+    for canonical_name, sets in get_lift_sets(conn).items():
+        weights = sets.weightlb
+        e1rm_lbs, e1rm_kg, _ = workout_e1rms[canonical_name]
 
-        rep_prs = {}
-        for row in cursor.fetchall():
-            reps = row['reps']
-            weight_lbs = row['weight_lbs'] or 0
-            weight_kg = row['weight_kg'] or 0
-            e1rm_lbs = calculate_e1rm(weight_lbs, reps)
-            e1rm_kg = calculate_e1rm(weight_kg, reps)
+        # First set with the heaviest weight at each rep count (1-8), and overall
+        best_by_reps = {}
+        heaviest = None
+        for i, (weight_lbs, reps) in enumerate(zip(weights, sets.reps)):
+            if weight_lbs is None:
+                continue
+            if heaviest is None or weight_lbs > weights[heaviest]:
+                heaviest = i
+            if reps <= MAX_E1RM_REPS and (reps not in best_by_reps or weight_lbs > weights[best_by_reps[reps]]):
+                best_by_reps[reps] = i
 
+        rep_prs = {}
+        for reps in sorted(best_by_reps):
+            i = best_by_reps[reps]
             rep_prs[reps] = {
-                'weightLbs': round(weight_lbs, 2),
-                'weightKg': round(weight_kg, 2),
-                'e1rmLbs': round(e1rm_lbs, 2),
-                'e1rmKg': round(e1rm_kg, 2),
-                'date': row['pr_date']
+                'weightLbs': round(weights[i], 2),
+                'weightKg': round(sets.weightkg[i] or 0, 2),
+                'e1rmLbs': round(e1rm_lbs[i], 2),
+                'e1rmKg': round(e1rm_kg[i], 2),
+                'date': sets.ymd[i]
             }
 
-        # Get absolute max weight ever lifted (any reps) with the date
-        cursor.execute(f"""
-            SELECT
-                he.weightlb as max_weight_lbs,
-                he.weightkg as max_weight_kg,
-                date(h.date/1000, 'unixepoch') as achieved_date
-            FROM history_exercises he
-            JOIN history h ON he.history_id = h.id
-            JOIN exercises e ON he.exercise_id = e.id
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0
-            ORDER BY he.weightlb DESC
-            LIMIT 1
-        """, name_list)
-
-        max_row = cursor.fetchone()
+        # Absolute max weight ever lifted (any reps) with the date; all-NULL weights fall back to the first set
+        if heaviest is None and sets:
+            heaviest = 0
         max_ever = {
-            'weightLbs': round(max_row['max_weight_lbs'] or 0, 2) if max_row else 0,
-            'weightKg': round(max_row['max_weight_kg'] or 0, 2) if max_row else 0,
-            'date': max_row['achieved_date'] if max_row else None
+            'weightLbs': round(weights[heaviest] or 0, 2) if heaviest is not None else 0,
+            'weightKg': round(sets.weightkg[heaviest] or 0, 2) if heaviest is not None else 0,
+            'date': sets.ymd[heaviest] if heaviest is not None else None
         }
 
         # Find best e1RM with full details for chart markers
@@ -1022,39 +1114,25 @@ def get_all_time_prs(conn):
 
 def get_days_since_last_pr(conn):
     """Calculate days since most recent PR for each Big 3 lift."""
-    from datetime import datetime, date
-    cursor = conn.cursor()
-
     days_since = {}
     today = date.today()
 
-    for canonical_name, name_list in [('squat', SQUAT_NAMES), ('bench', BENCH_NAMES), ('deadlift', DEADLIFT_NAMES), ('ohp', OHP_NAMES)]:
-        # Get most recent PR date for this lift
-        cursor.execute(f"""
-            SELECT MAX(date(h.date/1000, 'unixepoch')) as latest_pr_date
-            FROM (
-                SELECT
-                    h.date,
-                    he.weightlb,
-                    he.reps,
-                    MAX(he.weightlb) OVER (
-                        PARTITION BY he.reps
-                        ORDER BY h.date
-                        ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
-                    ) as prev_max
-                FROM history_exercises he
-                JOIN history h ON he.history_id = h.id
-                JOIN exercises e ON he.exercise_id = e.id
-                WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-                AND he.reps > 0 AND he.reps <= 8
-            ) subq
-            JOIN history h ON subq.date = h.date
-            WHERE prev_max IS NULL OR weightlb > prev_max
-        """, name_list)
-
-        result = cursor.fetchone()
-        if result and result['latest_pr_date']:
-            latest_pr = datetime.strptime(result['latest_pr_date'], '%Y-%m-%d').date()
+    for canonical_name, sets in get_lift_sets(conn).items():
+        # A PR is a set heavier than every earlier set with the same reps,
+        # over the rep range e1RMs are estimated for
+        best_by_reps = {}
+        latest_pr_date = None
+        for ymd, weight_lbs, reps in zip(sets.ymd, sets.weightlb, sets.reps):
+            if reps > MAX_E1RM_REPS:
+                continue
+            previous = best_by_reps.get(reps)
+            if previous is None or (weight_lbs is not None and weight_lbs > previous):
+                if latest_pr_date is None or ymd > latest_pr_date:
+                    latest_pr_date = ymd
+            best_by_reps[reps] = max_or_none(previous, weight_lbs)
+
+        if latest_pr_date:
+            latest_pr = datetime.strptime(latest_pr_date, '%Y-%m-%d').date()
             days_since[canonical_name] = (today - latest_pr).days
         else:
             days_since[canonical_name] = None
@@ -1062,17 +1140,10 @@ def get_days_since_last_pr(conn):
     return days_since
 
 def get_bar_travel_stats(conn):
-    """Calculate bar travel distance statistics for Big 4 lifts."""
-    cursor = conn.cursor()
-
-    # Bar travel distance per rep in inches (measured by user)
+    """Calculate bar travel distance statistics for every tracked lift."""
+    # Bar travel distance per rep in inches (measured by user, see lifts.json)
     # These are full rep distances (down + up for squat/bench, up + down for deadlift/ohp)
-    BAR_TRAVEL_INCHES = {
-        'squat': 47,        # 23.5" down + 23.5" up
-        'bench': 38,        # 19" down + 19" up
-        'deadlift': 50.3,   # (34" - 8.85") × 2 = 25.15" × 2
-        'ohp': 48,          # 24" up + 24" down
-    }
+    BAR_TRAVEL_INCHES = {lift['key']: lift.get('barTravelInches', 0) for lift in get_lift_registry(conn)['lifts']}
 
     # Landmark heights in inches for fun comparisons
     LANDMARKS = {
@@ -1086,20 +1157,8 @@ def get_bar_travel_stats(conn):
     bar_travel = {}
     total_distance_inches = 0
 
-    for canonical_name, name_list in [('squat', SQUAT_NAMES), ('bench', BENCH_NAMES),
-                                        ('deadlift', DEADLIFT_NAMES), ('ohp', OHP_NAMES)]:
-        # Get total reps for this exercise
-        cursor.execute(f"""
-            SELECT SUM(he.reps) as total_reps
-            FROM history_exercises he
-            JOIN exercises e ON he.exercise_id = e.id
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0
-        """, name_list)
-
-        row = cursor.fetchone()
-        total_reps = row['total_reps'] or 0
-
+    for canonical_name, sets in get_lift_sets(conn).items():
+        total_reps = sum(sets.reps)
         distance_per_rep = BAR_TRAVEL_INCHES.get(canonical_name, 0)
         total_inches = total_reps * distance_per_rep
         total_distance_inches += total_inches
@@ -1150,214 +1209,324 @@ def get_bar_travel_stats(conn):
         'distancePerRepInches': BAR_TRAVEL_INCHES,
     }
 
-def get_body_weight_data(conn):
-    """Extract body weight data and calculate relative strength metrics."""
-    cursor = conn.cursor()
-
-    # Get body weight timeline (monthly averages)
-    cursor.execute("""
-        SELECT
-            strftime('%Y-%m', date/1000, 'unixepoch') as month,
-            MIN(weightlb) as min_lbs,
-            MAX(weightlb) as max_lbs,
-            AVG(weightlb) as avg_lbs,
-            MIN(weightkg) as min_kg,
-            MAX(weightkg) as max_kg,
-            AVG(weightkg) as avg_kg,
-            COUNT(*) as entries
-        FROM body_weight
-        GROUP BY month
-        ORDER BY month
-    """)
-
-    monthly_timeline = []
-    for row in cursor.fetchall():
-        monthly_timeline.append({
-            'month': row['month'],
-            'minLbs': round(row['min_lbs'] or 0, 1),
-            'maxLbs': round(row['max_lbs'] or 0, 1),
-            'avgLbs': round(row['avg_lbs'] or 0, 1),
-            'minKg': round(row['min_kg'] or 0, 1),
-            'maxKg': round(row['max_kg'] or 0, 1),
-            'avgKg': round(row['avg_kg'] or 0, 1),
-            'entries': row['entries']
-        })
-
-    # Get current body weight (most recent)
-    cursor.execute("""
-        SELECT weightlb, weightkg, date(date/1000, 'unixepoch') as date
-        FROM body_weight
-        ORDER BY date DESC
-        LIMIT 1
-    """)
-    current_row = cursor.fetchone()
-    current_bw = {
-        'lbs': round(current_row['weightlb'], 1) if current_row else None,
-        'kg': round(current_row['weightkg'], 1) if current_row else None,
-        'date': current_row['date'] if current_row else None
+# A run of identical weigh-ins covering this many days or more is reported as stale
+STALE_WEIGHT_DAYS = 30
+# Trailing windows (days) of the body weight rolling averages
+BODY_WEIGHT_ROLLING_DAYS = (7, 30)
+
+class WeightStats:
+    """Running MIN/MAX/AVG of one body weight column; NULLs are skipped like in SQL."""
+
+    __slots__ = ('min', 'max', 'total', 'count')
+
+    def __init__(self):
+        self.min = None
+        self.max = None
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value):
+        if value is None:
+            return
+        if self.count:
+            if value < self.min:
+                self.min = value
+            elif value > self.max:
+                self.max = value
+        else:
+            self.min = self.max = value
+        self.total += value
+        self.count += 1
+
+    def merge(self, other):
+        """Fold another WeightStats (e.g. one month) into this one."""
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+            self.total += other.total
+            self.count += other.count
+
+    @property
+    def avg(self):
+        return self.total / self.count if self.count else None
+
+class RollingMean:
+    """Mean lbs and kg of the weigh-ins in the last `days` days (including the current day)."""
+
+    __slots__ = ('days', 'window', 'lbs', 'kg', 'lbs_count', 'kg_count')
+
+    def __init__(self, days):
+        self.days = days
+        self.window = deque()
+        self.lbs = self.kg = 0.0
+        self.lbs_count = self.kg_count = 0
+
+    def add(self, day, lbs, kg):
+        self.window.append((day, lbs, kg))
+        if lbs is not None:
+            self.lbs += lbs
+            self.lbs_count += 1
+        if kg is not None:
+            self.kg += kg
+            self.kg_count += 1
+
+    def means(self, day):
+        """(lbs, kg) means as of `day`, after dropping weigh-ins that left the window."""
+        window = self.window
+        while window and window[0][0] <= day - self.days:
+            _, lbs, kg = window.popleft()
+            if lbs is not None:
+                self.lbs -= lbs
+                self.lbs_count -= 1
+            if kg is not None:
+                self.kg -= kg
+                self.kg_count -= 1
+        return (round(self.lbs / self.lbs_count, 1) if self.lbs_count else None,
+                round(self.kg / self.kg_count, 1) if self.kg_count else None)
+
+def weight_stats_entry(lbs, kg):
+    return {
+        'minLbs': round(lbs.min or 0, 1),
+        'maxLbs': round(lbs.max or 0, 1),
+        'avgLbs': round(lbs.avg or 0, 1),
+        'minKg': round(kg.min or 0, 1),
+        'maxKg': round(kg.max or 0, 1),
+        'avgKg': round(kg.avg or 0, 1),
     }
 
-    # Get earliest body weight
-    cursor.execute("""
-        SELECT weightlb, weightkg, date(date/1000, 'unixepoch') as date
-        FROM body_weight
-        ORDER BY date ASC
-        LIMIT 1
-    """)
-    first_row = cursor.fetchone()
-    starting_bw = {
-        'lbs': round(first_row['weightlb'], 1) if first_row else None,
-        'kg': round(first_row['weightkg'], 1) if first_row else None,
-        'date': first_row['date'] if first_row else None
-    }
+def weight_entry(row):
+    _, ymd, _, weight_lbs, weight_kg = row
+    return {'lbs': round(weight_lbs, 1), 'kg': round(weight_kg, 1), 'date': ymd}
 
-    # Get body weight stats
-    cursor.execute("""
-        SELECT
-            MIN(weightlb) as min_lbs,
-            MAX(weightlb) as max_lbs,
-            AVG(weightlb) as avg_lbs,
-            MIN(weightkg) as min_kg,
-            MAX(weightkg) as max_kg,
-            AVG(weightkg) as avg_kg,
-            COUNT(*) as total_entries
-        FROM body_weight
-    """)
-    stats_row = cursor.fetchone()
-    bw_stats = {
-        'minLbs': round(stats_row['min_lbs'] or 0, 1),
-        'maxLbs': round(stats_row['max_lbs'] or 0, 1),
-        'avgLbs': round(stats_row['avg_lbs'] or 0, 1),
-        'minKg': round(stats_row['min_kg'] or 0, 1),
-        'maxKg': round(stats_row['max_kg'] or 0, 1),
-        'avgKg': round(stats_row['avg_kg'] or 0, 1),
-        'totalEntries': stats_row['total_entries']
-    }
+def get_body_weight_data(conn):
+    """Extract body weight data: first/current weigh-in, stats, monthly timeline,
+    rolling averages and stale runs, from one ordered pass over body_weight.
 
-    # Detect stale periods (where body weight doesn't change for 30+ days)
+    Only the current month, the open stale run and the rolling windows are
+    held while scanning; everything else is output.
+    """
+    cursor = conn.cursor()
     cursor.execute("""
-        SELECT
-            weightlb,
-            MIN(date(date/1000, 'unixepoch')) as start_date,
-            MAX(date(date/1000, 'unixepoch')) as end_date,
-            COUNT(*) as count
-        FROM body_weight
-        GROUP BY weightlb
-        HAVING COUNT(*) > 30
-        ORDER BY count DESC
+        SELECT bwl.day, bwl.ymd, bwl.ym, bw.weightlb, bw.weightkg
+        FROM body_weight_local bwl
+        JOIN body_weight bw ON bw.id = bwl.id
+        ORDER BY bwl.day, bwl.id
     """)
 
+    first_row = last_row = None
+    total_lbs, total_kg = WeightStats(), WeightStats()
+    total_entries = 0
+
+    monthly_timeline = []
+    month = month_lbs = month_kg = None
+    month_start = 0
+
+    def close_month():
+        if month is not None:
+            monthly_timeline.append({'month': month, **weight_stats_entry(month_lbs, month_kg),
+                                     'entries': total_entries - month_start})
+            total_lbs.merge(month_lbs)
+            total_kg.merge(month_kg)
+
+    # Trailing averages at the end of each weigh-in day, as parallel columns
+    windows = [RollingMean(days) for days in BODY_WEIGHT_ROLLING_DAYS]
+    rolling_averages = {'windowDays': list(BODY_WEIGHT_ROLLING_DAYS), 'dates': []}
+    columns = []
+    for days in BODY_WEIGHT_ROLLING_DAYS:
+        columns.append((rolling_averages.setdefault(f'avg{days}Lbs', []),
+                        rolling_averages.setdefault(f'avg{days}Kg', [])))
+
+    def close_day(day, ymd):
+        rolling_averages['dates'].append(ymd)
+        for window, (lbs_column, kg_column) in zip(windows, columns):
+            lbs, kg = window.means(day)
+            lbs_column.append(lbs)
+            kg_column.append(kg)
+
+    # Stale runs: consecutive weigh-ins with the same weight (run-length encoded)
     stale_periods = []
-    for row in cursor.fetchall():
-        stale_periods.append({
-            'weightLbs': round(row['weightlb'], 1),
-            'startDate': row['start_date'],
-            'endDate': row['end_date'],
-            'count': row['count']
-        })
+    run_weight = run_start = run_end = None
+    run_count = 0
+
+    def close_run():
+        days = run_end[0] - run_start[0] + 1 if run_weight is not None else 0
+        if run_count > 1 and days >= STALE_WEIGHT_DAYS:
+            stale_periods.append({
+                'weightLbs': round(run_weight, 1),
+                'startDate': run_start[1],
+                'endDate': run_end[1],
+                'count': run_count,
+                'days': days
+            })
 
+    for row in cursor:
+        day, ymd, ym, weight_lbs, weight_kg = row
+        if last_row is None:
+            first_row = row
+        elif last_row[0] != day:
+            close_day(last_row[0], last_row[1])
+        last_row = row
+
+        if ym != month:
+            close_month()
+            month, month_lbs, month_kg, month_start = ym, WeightStats(), WeightStats(), total_entries
+        total_entries += 1
+        month_lbs.add(weight_lbs)
+        month_kg.add(weight_kg)
+
+        for window in windows:
+            window.add(day, weight_lbs, weight_kg)
+
+        if weight_lbs is None or weight_lbs != run_weight:
+            close_run()
+            run_weight, run_start, run_count = weight_lbs, (day, ymd), 0
+        run_end = (day, ymd)
+        run_count += 1
+
+    if last_row is not None:
+        close_day(last_row[0], last_row[1])
+    close_month()
+    close_run()
+
+    empty = {'lbs': None, 'kg': None, 'date': None}
     return {
-        'current': current_bw,
-        'starting': starting_bw,
-        'stats': bw_stats,
+        'current': weight_entry(last_row) if last_row else empty,
+        'starting': weight_entry(first_row) if first_row else dict(empty),
+        'stats': {**weight_stats_entry(total_lbs, total_kg), 'totalEntries': total_entries},
         'monthlyTimeline': monthly_timeline,
+        'rollingAverages': rolling_averages,
         'stalePeriods': stale_periods
     }
 
+# How workouts without a weigh-in on their own day get a body weight: 'prior' uses
+# the latest earlier weigh-in, 'interpolate' blends the weigh-ins on either side
+BODY_WEIGHT_AS_OF = 'prior'
+# Weigh-ins further than this from the workout day are not used
+BODY_WEIGHT_MAX_AGE_DAYS = 30
+
+def first_weigh_ins(rows):
+    """The first of each day's (day, weight lbs, weight kg) rows, from rows in day order."""
+    previous_day = None
+    for row in rows:
+        if row[0] != previous_day:
+            previous_day = row[0]
+            yield row
+
+def load_workout_body_weights(conn, method=BODY_WEIGHT_AS_OF, max_age_days=BODY_WEIGHT_MAX_AGE_DAYS):
+    """As-of join of every workout day to the athlete's body weight.
+
+    Workout days and weigh-ins are both streamed in day order and merged in
+    one pass, holding only the weigh-ins on either side of the current day.
+    A day with its own weigh-in uses it (the first one recorded, if several);
+    otherwise the nearest earlier weigh-in, or with method='interpolate' a
+    linear blend of the weigh-ins before and after.
+    Returns {day: (weight_lbs, weight_kg)}; days with no weigh-in within
+    max_age_days are left out.
+    """
+    weigh_ins = first_weigh_ins(conn.execute("""
+        SELECT bwl.day, bw.weightlb, bw.weightkg
+        FROM body_weight_local bwl
+        JOIN body_weight bw ON bw.id = bwl.id
+        WHERE bw.weightlb IS NOT NULL
+        ORDER BY bwl.day, bw.id
+    """))
+
+    body_weights = {}
+    prior = None
+    after = next(weigh_ins, None)
+    for (day,) in conn.execute("SELECT DISTINCT day FROM history_local ORDER BY day"):
+        # Advance to the first weigh-in after this workout day
+        while after is not None and after[0] <= day:
+            prior, after = after, next(weigh_ins, None)
+
+        if prior and prior[0] == day:
+            body_weights[day] = prior[1:]
+        elif (method == 'interpolate' and prior and after
+              and day - prior[0] <= max_age_days and after[0] - day <= max_age_days):
+            t = (day - prior[0]) / (after[0] - prior[0])
+            weight_kg = None if prior[2] is None or after[2] is None else prior[2] + (after[2] - prior[2]) * t
+            body_weights[day] = (prior[1] + (after[1] - prior[1]) * t, weight_kg)
+        elif prior and day - prior[0] <= max_age_days:
+            body_weights[day] = prior[1:]
+    return body_weights
+
+def get_workout_body_weights(conn):
+    """Body weight for each workout day, shared by every body-weight-relative metric."""
+    return memoized(conn, 'workout_body_weights', load_workout_body_weights)
+
+def workout_body_weight_multiples(conn, sets):
+    """Heaviest set of each workout of a lift, against the body weight on that day.
+
+    Returns one row per workout with a body weight (see load_workout_body_weights),
+    in history id order.
+    """
+    body_weight = get_workout_body_weights(conn)
+
+    workouts = {}
+    for history_id, date, day, ymd, ym, weight_lbs, weight_kg in zip(
+            sets.history_id, sets.date, sets.day, sets.ymd, sets.ym, sets.weightlb, sets.weightkg):
+        if day not in body_weight:
+            continue
+        row = workouts.get(history_id)
+        if row is None:
+            body_weight_lbs, body_weight_kg = body_weight[day]
+            row = workouts[history_id] = {
+                'history_id': history_id,
+                'date': date,
+                'workout_date': ymd,
+                'month': ym,
+                'max_lift_lbs': None,
+                'max_lift_kg': None,
+                'body_weight_lbs': body_weight_lbs,
+                'body_weight_kg': body_weight_kg,
+            }
+        row['max_lift_lbs'] = max_or_none(row['max_lift_lbs'], weight_lbs)
+        row['max_lift_kg'] = max_or_none(row['max_lift_kg'], weight_kg)
+
+    rows = [workouts[history_id] for history_id in sorted(workouts)]
+    for row in rows:
+        lift, body = row['max_lift_lbs'], row['body_weight_lbs']
+        row['bw_multiple'] = round(lift / body, 2) if lift is not None and body else None
+    return rows
+
 def get_relative_strength(conn):
     """Calculate relative strength metrics (body weight multiples) for Big 3."""
     cursor = conn.cursor()
 
     relative_strength = {}
 
-    for canonical_name, name_list in [('squat', SQUAT_NAMES), ('bench', BENCH_NAMES),
-                                        ('deadlift', DEADLIFT_NAMES), ('ohp', OHP_NAMES)]:
-        # Get best body weight multiple for each workout
-        cursor.execute(f"""
-            SELECT
-                date(h.date/1000, 'unixepoch') as workout_date,
-                MAX(he.weightlb) as max_lift_lbs,
-                MAX(he.weightkg) as max_lift_kg,
-                bw.weightlb as body_weight_lbs,
-                bw.weightkg as body_weight_kg,
-                ROUND(MAX(he.weightlb) / bw.weightlb, 2) as bw_multiple
-            FROM history h
-            JOIN history_exercises he ON h.id = he.history_id
-            JOIN exercises e ON he.exercise_id = e.id
-            LEFT JOIN body_weight bw ON date(h.date/1000, 'unixepoch') = date(bw.date/1000, 'unixepoch')
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0
-            AND bw.weightlb IS NOT NULL
-            GROUP BY h.id
-            ORDER BY bw_multiple DESC
-            LIMIT 1
-        """, name_list)
-
-        best_row = cursor.fetchone()
-
-        # Get timeline of BW multiples (monthly bests) using subquery
-        cursor.execute(f"""
-            SELECT
-                month,
-                MAX(max_lift_lbs) as max_lift_lbs,
-                MAX(max_lift_kg) as max_lift_kg,
-                AVG(body_weight_lbs) as avg_bw_lbs,
-                AVG(body_weight_kg) as avg_bw_kg,
-                MAX(bw_multiple) as best_bw_multiple
-            FROM (
-                SELECT
-                    strftime('%Y-%m', h.date/1000, 'unixepoch') as month,
-                    MAX(he.weightlb) as max_lift_lbs,
-                    MAX(he.weightkg) as max_lift_kg,
-                    bw.weightlb as body_weight_lbs,
-                    bw.weightkg as body_weight_kg,
-                    ROUND(MAX(he.weightlb) / bw.weightlb, 2) as bw_multiple
-                FROM history h
-                JOIN history_exercises he ON h.id = he.history_id
-                JOIN exercises e ON he.exercise_id = e.id
-                LEFT JOIN body_weight bw ON date(h.date/1000, 'unixepoch') = date(bw.date/1000, 'unixepoch')
-                WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-                AND he.reps > 0
-                AND bw.weightlb IS NOT NULL
-                GROUP BY h.id
-            ) subq
-            GROUP BY month
-            ORDER BY month
-        """, name_list)
+    for canonical_name, sets in get_lift_sets(conn).items():
+        workouts = workout_body_weight_multiples(conn, sets)
+
+        # Best body weight multiple of any workout (first one on ties)
+        best_row = None
+        for row in workouts:
+            if row['bw_multiple'] is not None and (best_row is None or row['bw_multiple'] > best_row['bw_multiple']):
+                best_row = row
+
+        # Timeline of BW multiples (monthly bests)
+        months = {}
+        for row in workouts:
+            months.setdefault(row['month'], []).append(row)
 
         monthly_progression = []
-        for row in cursor.fetchall():
+        for month in sorted(months):
+            rows = months[month]
+            lifts_lbs = [r['max_lift_lbs'] for r in rows if r['max_lift_lbs'] is not None]
+            lifts_kg = [r['max_lift_kg'] for r in rows if r['max_lift_kg'] is not None]
+            body_kg = [r['body_weight_kg'] for r in rows if r['body_weight_kg'] is not None]
+            multiples = [r['bw_multiple'] for r in rows if r['bw_multiple'] is not None]
             monthly_progression.append({
-                'month': row['month'],
-                'maxLiftLbs': round(row['max_lift_lbs'] or 0, 1),
-                'maxLiftKg': round(row['max_lift_kg'] or 0, 1),
-                'avgBwLbs': round(row['avg_bw_lbs'] or 0, 1),
-                'avgBwKg': round(row['avg_bw_kg'] or 0, 1),
-                'bwMultiple': row['best_bw_multiple'] or 0
+                'month': month,
+                'maxLiftLbs': round(max(lifts_lbs, default=0), 1),
+                'maxLiftKg': round(max(lifts_kg, default=0), 1),
+                'avgBwLbs': round(sum(r['body_weight_lbs'] for r in rows) / len(rows), 1),
+                'avgBwKg': round(sum(body_kg) / len(body_kg) if body_kg else 0, 1),
+                'bwMultiple': max(multiples, default=0) or 0
             })
 
-        # Get current BW multiple (most recent workout for this lift)
-        cursor.execute(f"""
-            SELECT
-                date(h.date/1000, 'unixepoch') as workout_date,
-                MAX(he.weightlb) as max_lift_lbs,
-                MAX(he.weightkg) as max_lift_kg,
-                bw.weightlb as body_weight_lbs,
-                bw.weightkg as body_weight_kg,
-                ROUND(MAX(he.weightlb) / bw.weightlb, 2) as bw_multiple
-            FROM history h
-            JOIN history_exercises he ON h.id = he.history_id
-            JOIN exercises e ON he.exercise_id = e.id
-            LEFT JOIN body_weight bw ON date(h.date/1000, 'unixepoch') = date(bw.date/1000, 'unixepoch')
-            WHERE LOWER(e.exercise_name) IN ({','.join(['LOWER(?)'] * len(name_list))})
-            AND he.reps > 0
-            AND bw.weightlb IS NOT NULL
-            GROUP BY h.id
-            ORDER BY h.date DESC
-            LIMIT 1
-        """, name_list)
-
-        current_row = cursor.fetchone()
+        # Current BW multiple (most recent workout for this lift)
+        current_row = max(workouts, key=lambda r: r['date']) if workouts else None
 
         relative_strength[canonical_name] = {
             'best': {
@@ -1380,24 +1549,19 @@ def get_relative_strength(conn):
         }
 
     # Calculate combined total BW multiple (S+B+D best multiples)
-    squat_best = relative_strength.get('squat', {}).get('best', {}).get('multiple', 0) or 0
-    bench_best = relative_strength.get('bench', {}).get('best', {}).get('multiple', 0) or 0
-    deadlift_best = relative_strength.get('deadlift', {}).get('best', {}).get('multiple', 0) or 0
-    total_multiple = round(squat_best + bench_best + deadlift_best, 2)
+    members = lift_group(conn, POWERLIFTING_GROUP)
+    member_bests = {lift: relative_strength.get(lift, {}).get('best', {}).get('multiple', 0) or 0 for lift in members}
+    total_multiple = round(sum(member_bests.values()), 2)
 
     relative_strength['totalMultiple'] = {
         'best': total_multiple,
-        'squat': squat_best,
-        'bench': bench_best,
-        'deadlift': deadlift_best
+        **member_bests
     }
 
     # Standard benchmarks for reference
     relative_strength['benchmarks'] = {
-        'squat': {'beginner': 1.0, 'intermediate': 1.5, 'advanced': 2.0, 'elite': 2.5},
-        'bench': {'beginner': 0.75, 'intermediate': 1.0, 'advanced': 1.5, 'elite': 2.0},
-        'deadlift': {'beginner': 1.25, 'intermediate': 1.75, 'advanced': 2.5, 'elite': 3.0},
-        'ohp': {'beginner': 0.5, 'intermediate': 0.75, 'advanced': 1.0, 'elite': 1.25}
+        lift['key']: lift['bodyWeightBenchmarks']
+        for lift in get_lift_registry(conn)['lifts'] if 'bodyWeightBenchmarks' in lift
     }
 
     # Calculate Wilks scores
@@ -1409,22 +1573,16 @@ def get_relative_strength(conn):
         LIMIT 1
     """)
     current_bw_row = cursor.fetchone()
-    current_bw_kg = current_bw_row['body_weight_kg'] if current_bw_row else 0
+    current_bw_kg = current_bw_row[0] if current_bw_row else 0
 
     # Calculate current Wilks using current body weight and best e1RMs
-    squat_best = relative_strength.get('squat', {}).get('best', {})
-    bench_best = relative_strength.get('bench', {}).get('best', {})
-    deadlift_best = relative_strength.get('deadlift', {}).get('best', {})
+    member_bests = [relative_strength.get(lift, {}).get('best', {}) for lift in members]
 
     # Get best lifts in kg for Wilks calculation
-    squat_kg = squat_best.get('liftKg', 0) or 0
-    bench_kg = bench_best.get('liftKg', 0) or 0
-    deadlift_kg = deadlift_best.get('liftKg', 0) or 0
-
-    best_total_kg = squat_kg + bench_kg + deadlift_kg
+    best_total_kg = sum(best.get('liftKg', 0) or 0 for best in member_bests)
 
     # Use body weight from best lift dates if available, otherwise current
-    best_bw_kg = squat_best.get('bodyWeightKg') or bench_best.get('bodyWeightKg') or deadlift_best.get('bodyWeightKg') or current_bw_kg
+    best_bw_kg = next((best['bodyWeightKg'] for best in member_bests if best.get('bodyWeightKg')), None) or current_bw_kg
 
     best_wilks = calculate_wilks(best_total_kg, best_bw_kg)
     current_wilks = calculate_wilks(best_total_kg, current_bw_kg) if current_bw_kg > 0 else 0
@@ -1463,7 +1621,56 @@ def parse_pt_seconds(duration_str):
     return total_seconds / 60.0
 
 
-def get_polar_sessions():
+def parse_polar_session(filepath):
+    """Parse one Polar training-session file into (date, session dict), or None if unusable."""
+    try:
+        with open(filepath, encoding='utf-8') as f:
+            d = json.load(f)
+    except Exception:
+        return None
+
+    start_time = d.get('startTime', '')
+    if not start_time:
+        return None
+    date_str = start_time[:10]  # YYYY-MM-DD
+
+    avg_hr = d.get('averageHeartRate') or 0
+    max_hr = d.get('maximumHeartRate') or 0
+    kcal = d.get('kiloCalories') or 0
+    duration_minutes = parse_pt_seconds(d.get('duration', ''))
+
+    # Extract exercise-level fields
+    exercises = d.get('exercises', [])
+    ex = exercises[0] if exercises else {}
+    min_hr = (ex.get('heartRate') or {}).get('min') or 0
+    sport = ex.get('sport', '') or d.get('name', 'UNKNOWN')
+
+    load_info = d.get('loadInformation') or ex.get('loadInformation') or {}
+    cardio_load = load_info.get('cardioLoad') or None
+    cardio_load_interp = load_info.get('cardioLoadInterpretation') or None
+
+    phys = d.get('physicalInformationSnapshot') or {}
+    vo2_max = phys.get('vo2Max') or None
+    resting_hr = phys.get('restingHeartRate') or None
+    weight_kg = phys.get('weight, kg') or None
+
+    session = {
+        'avgHr': avg_hr,
+        'maxHr': max_hr,
+        'minHr': min_hr,
+        'durationMinutes': duration_minutes,
+        'kiloCalories': kcal,
+        'sport': sport,
+        'cardioLoad': cardio_load,
+        'cardioLoadInterpretation': cardio_load_interp,
+        'vo2Max': vo2_max,
+        'restingHeartRate': resting_hr,
+        'weightKg': weight_kg,
+    }
+    return date_str, session
+
+
+def get_polar_sessions(polar_dir=POLAR_DIR, session_cache=None):
     """
     Extract per-session aggregate data from Polar training-session JSON files.
 
@@ -1472,63 +1679,38 @@ def get_polar_sessions():
       - polar_summary: dict with total stats
       - polar_monthly: list of monthly aggregate dicts
       - polar_notable: list of notable cardio events (for milestones/notableWorkouts)
-    """
-    import glob as glob_module
 
-    polar_dir = os.path.join(SCRIPT_DIR, '..', 'data', 'polar-user-data')
-    pattern = os.path.join(polar_dir, 'training-session-*.json')
-    files = sorted(glob_module.glob(pattern))
+    When session_cache (a dict) is given, parsed files are kept in it keyed by
+    path and reused on later calls while their size and mtime are unchanged.
+    """
+    files = list_polar_files(polar_dir)
 
     # Per-session records keyed by date for aggregation
     by_date = {}  # date -> list of session dicts
 
     for filepath in files:
-        try:
-            with open(filepath, encoding='utf-8') as f:
-                d = json.load(f)
-        except Exception:
-            continue
-
-        start_time = d.get('startTime', '')
-        if not start_time:
+        parsed = None
+        if session_cache is not None:
+            st = os.stat(filepath)
+            signature = (st.st_size, st.st_mtime_ns)
+            cached = session_cache.get(filepath)
+            if cached and cached[0] == signature:
+                parsed = cached[1]
+            else:
+                parsed = parse_polar_session(filepath)
+                session_cache[filepath] = (signature, parsed)
+        else:
+            parsed = parse_polar_session(filepath)
+        if parsed is None:
             continue
-        date_str = start_time[:10]  # YYYY-MM-DD
-
-        avg_hr = d.get('averageHeartRate') or 0
-        max_hr = d.get('maximumHeartRate') or 0
-        kcal = d.get('kiloCalories') or 0
-        duration_minutes = parse_pt_seconds(d.get('duration', ''))
-
-        # Extract exercise-level fields
-        exercises = d.get('exercises', [])
-        ex = exercises[0] if exercises else {}
-        min_hr = (ex.get('heartRate') or {}).get('min') or 0
-        sport = ex.get('sport', '') or d.get('name', 'UNKNOWN')
-
-        load_info = d.get('loadInformation') or ex.get('loadInformation') or {}
-        cardio_load = load_info.get('cardioLoad') or None
-        cardio_load_interp = load_info.get('cardioLoadInterpretation') or None
-
-        phys = d.get('physicalInformationSnapshot') or {}
-        vo2_max = phys.get('vo2Max') or None
-        resting_hr = phys.get('restingHeartRate') or None
-        weight_kg = phys.get('weight, kg') or None
-
-        session = {
-            'avgHr': avg_hr,
-            'maxHr': max_hr,
-            'minHr': min_hr,
-            'durationMinutes': duration_minutes,
-            'kiloCalories': kcal,
-            'sport': sport,
-            'cardioLoad': cardio_load,
-            'cardioLoadInterpretation': cardio_load_interp,
-            'vo2Max': vo2_max,
-            'restingHeartRate': resting_hr,
-            'weightKg': weight_kg,
-        }
+        date_str, session = parsed
         by_date.setdefault(date_str, []).append(session)
 
+    if session_cache is not None:
+        # Forget files that have been removed since the last call
+        for stale in set(session_cache) - set(files):
+            del session_cache[stale]
+
     # Aggregate multi-session days
     polar_calendar = {}
     for date_str, sessions in sorted(by_date.items()):
@@ -1675,193 +1857,355 @@ def get_polar_sessions():
     return polar_calendar, polar_summary, polar_monthly, polar_notable
 
 
-def main():
-    """Main execution function."""
-    parser = argparse.ArgumentParser(description='Extract training data from SQLite DB and produce training_data.json')
-    parser.add_argument('-d', '--db', dest='db_path', default=DB_PATH, help='Path to SQLite database file')
-    parser.add_argument('-o', '--out', dest='output_path', default=OUTPUT_PATH, help='Output JSON path')
-    parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
-    args = parser.parse_args()
-
-    if args.verbose:
-        print(f"Connecting to database at {args.db_path}...")
-    conn = connect_db(args.db_path)
-
-    print("Extracting summary statistics...")
-    summary = get_summary_stats(conn)
-
-    print("Calculating volume time series...")
-    volume_time_series = get_volume_time_series(conn)
-
-    print("Generating workout calendar...")
-    workout_calendar = get_workout_calendar(conn)
+# Fields of a Polar day, each shipped as one column of the dense calendar
+CALENDAR_POLAR_FIELDS = ('avgHr', 'maxHr', 'minHr', 'durationMinutes', 'kiloCalories', 'cardioLoad',
+                         'cardioLoadInterpretation', 'sport', 'sessionCount')
 
-    print("Analyzing exercise progress...")
-    exercise_progress = get_exercise_progress(conn)
+def encode_calendar(workout_calendar, polar_calendar):
+    """Dense workoutCalendar: parallel arrays over the active days (a workout or a Polar session).
 
-    print("Calculating Big 3 estimated 1RM progression...")
-    big_three_e1rm = get_big_three_e1rm(conn)
-
-    print("Extracting Big 3 volume history...")
-    big_three_volume = get_big_three_volume(conn)
-
-    print("Getting program history...")
-    programs = get_programs(conn)
+    runs alternates rest-day and active-day run lengths from startDate (the
+    first active day, so it starts with 0 rest days); count, volumeLbs and
+    volumeKg hold one value per active day in date order. polar is None
+    without Polar data, otherwise one column per CALENDAR_POLAR_FIELDS entry
+    with None on days without a session.
+    """
+    dates = sorted(set(workout_calendar) | set(polar_calendar))
+    calendar = {'startDate': dates[0] if dates else None, 'days': 0, 'runs': [],
+                'count': [], 'volumeLbs': [], 'volumeKg': [], 'polar': None}
+    if not dates:
+        return calendar
+
+    start = date.fromisoformat(dates[0]).toordinal()
+    runs = calendar['runs']
+    polar_columns = {field: [] for field in CALENDAR_POLAR_FIELDS} if polar_calendar else None
+    next_offset = 0
+    for date_str in dates:
+        offset = date.fromisoformat(date_str).toordinal() - start
+        if runs and offset == next_offset:
+            runs[-1] += 1
+        else:
+            runs += [offset - next_offset, 1]
+        next_offset = offset + 1
+
+        workout_day = workout_calendar.get(date_str)
+        calendar['count'].append(workout_day['count'] if workout_day else 0)
+        calendar['volumeLbs'].append(workout_day['volumeLbs'] if workout_day else 0)
+        calendar['volumeKg'].append(workout_day['volumeKg'] if workout_day else 0)
+        if polar_columns is not None:
+            polar_day = polar_calendar.get(date_str) or {}
+            for field, column in polar_columns.items():
+                column.append(polar_day.get(field))
+
+    calendar['days'] = next_offset
+    calendar['polar'] = polar_columns
+    return calendar
 
-    print("Analyzing workout patterns...")
-    workouts_by_day = get_workouts_by_day_of_week(conn)
+def build_workout_calendar(conn, polar):
+    """Workout calendar with Polar days overlaid, densely encoded (see encode_calendar)."""
+    return encode_calendar(get_workout_calendar(conn), polar()[0])
 
-    print("Finding notable workouts...")
+def build_notable_workouts(conn, polar):
+    """Notable lifting workouts merged with notable Polar cardio events."""
     notable_workouts = get_notable_workouts(conn)
-
-    print("Calculating milestones...")
-    milestones = get_milestones(conn, summary)
-
-    print("Extracting Polar heart rate data...")
-    polar_calendar, polar_summary, polar_monthly, polar_notable = get_polar_sessions()
-
-    # Merge Polar data into workout_calendar (overlay polar key, add cardio-only days)
-    for date_str, polar_day in polar_calendar.items():
-        if date_str in workout_calendar:
-            workout_calendar[date_str]['polar'] = polar_day
-        else:
-            # Cardio-only day — create a stub entry
-            workout_calendar[date_str] = {
-                'count': 0,
-                'volumeLbs': 0,
-                'volumeKg': 0,
-                'polar': polar_day,
-            }
-
-    # Merge polar notable events into existing lists
-    notable_workouts.extend(polar_notable)
+    notable_workouts.extend(polar()[3])
     notable_workouts.sort(key=lambda x: x['date'], reverse=True)
+    return notable_workouts
+
+def build_milestones(conn, polar):
+    """Volume/workout milestones merged with cumulative Polar kcal milestones."""
+    milestones = get_milestones(conn)
     milestones.extend([
         {'date': n['date'], 'milestone': n['reason'], 'volumeLbs': 0, 'volumeKg': 0}
-        for n in polar_notable if 'kcal' in n['reason'] and 'Highest' not in n['reason']
+        for n in polar()[3] if 'kcal' in n['reason'] and 'Highest' not in n['reason']
     ])
     milestones.sort(key=lambda x: x['date'])
+    return milestones
 
-    print("Calculating plate milestones...")
-    plate_milestones = get_plate_milestones(conn)
-
-    print("Calculating powerlifting totals...")
+def build_powerlifting_totals(conn, polar):
+    """Powerlifting totals without the full per-date history (not shipped to the dashboard)."""
     powerlifting_totals = get_powerlifting_totals(conn)
-
-    print("Extracting all-time PRs...")
-    all_time_prs = get_all_time_prs(conn)
-
-    print("Calculating days since last PR...")
-    days_since_last_pr = get_days_since_last_pr(conn)
-
-    print("Calculating bar travel statistics...")
-    bar_travel_stats = get_bar_travel_stats(conn)
-
-    print("Extracting body weight data...")
-    body_weight_data = get_body_weight_data(conn)
-
-    print("Calculating relative strength metrics...")
-    relative_strength = get_relative_strength(conn)
-
-    # Compile all data
-    data = {
-        'summary': summary,
-        'volumeTimeSeries': volume_time_series,
-        'workoutCalendar': workout_calendar,
-        'exerciseProgress': exercise_progress,
-        'bigThreeE1RM': big_three_e1rm,
-        'bigThreeVolume': big_three_volume,
-        'programs': programs,
-        'workoutsByDayOfWeek': workouts_by_day,
-        'notableWorkouts': notable_workouts,
-        'milestones': milestones,
-        'plateMilestones': plate_milestones,
-        'powerliftingTotals': {
-            'current': powerlifting_totals['current'],
-            'peak': powerlifting_totals['peak'],
-            'clubMilestones': powerlifting_totals['clubMilestones']
-        },
-        'allTimePRs': all_time_prs,
-        'daysSinceLastPR': days_since_last_pr,
-        'barTravel': bar_travel_stats,
-        'bodyWeight': body_weight_data,
-        'relativeStrength': relative_strength,
-        'polarSummary': polar_summary,
-        'polarMonthly': polar_monthly,
+    return {
+        'current': powerlifting_totals['current'],
+        'peak': powerlifting_totals['peak'],
+        'clubMilestones': powerlifting_totals['clubMilestones']
     }
 
-    output_path = args.output_path
-    if args.verbose:
-        print(f"Writing output to {output_path}...")
-    with open(output_path, 'w') as f:
-        json.dump(data, f, indent=2)
+# Database tables the sections read
+DB_TABLES = ('history', 'history_exercises', 'exercises', 'programs', 'body_weight')
+HISTORY_TABLES = ('history', 'history_exercises')
+# Per-lift sections read the shared lift sets, which match exercise names
+LIFT_TABLES = HISTORY_TABLES + ('exercises',)
+
+# Output sections in file order: (key, progress message, builder(conn, polar), sources).
+# `polar` is a zero-argument loader returning the get_polar_sessions() tuple, parsed
+# at most once per run. Sources are the inputs a section reads: the DB_TABLES it
+# queries (directly or through the shared lift sets, day index and local days),
+# 'polar' for the Polar export and 'today' for sections relative to the current date.
+SECTIONS = [
+    ('summary', 'Extracting summary statistics...',
+     lambda conn, polar: get_summary_stats(conn), HISTORY_TABLES),
+    ('volumeTimeSeries', 'Calculating volume time series...',
+     lambda conn, polar: get_volume_time_series(conn), HISTORY_TABLES),
+    ('workoutCalendar', 'Generating workout calendar...',
+     build_workout_calendar, HISTORY_TABLES + ('polar',)),
+    ('exerciseProgress', 'Analyzing exercise progress...',
+     lambda conn, polar: get_exercise_progress(conn), LIFT_TABLES),
+    ('bigThreeE1RM', 'Calculating Big 3 estimated 1RM progression...',
+     lambda conn, polar: get_big_three_e1rm(conn), LIFT_TABLES),
+    ('bigThreeVolume', 'Extracting Big 3 volume history...',
+     lambda conn, polar: get_big_three_volume(conn), LIFT_TABLES),
+    ('programs', 'Getting program history...',
+     lambda conn, polar: get_programs(conn), HISTORY_TABLES + ('programs',)),
+    ('workoutsByDayOfWeek', 'Analyzing workout patterns...',
+     lambda conn, polar: get_workouts_by_day_of_week(conn), HISTORY_TABLES),
+    ('notableWorkouts', 'Finding notable workouts...',
+     build_notable_workouts, HISTORY_TABLES + ('programs', 'polar')),
+    ('milestones', 'Calculating milestones...',
+     build_milestones, HISTORY_TABLES + ('polar',)),
+    ('plateMilestones', 'Calculating plate milestones...',
+     lambda conn, polar: get_plate_milestones(conn), LIFT_TABLES),
+    ('powerliftingTotals', 'Calculating powerlifting totals...',
+     build_powerlifting_totals, LIFT_TABLES),
+    ('allTimePRs', 'Extracting all-time PRs...',
+     lambda conn, polar: get_all_time_prs(conn), LIFT_TABLES),
+    ('daysSinceLastPR', 'Calculating days since last PR...',
+     lambda conn, polar: get_days_since_last_pr(conn), LIFT_TABLES + ('today',)),
+    ('barTravel', 'Calculating bar travel statistics...',
+     lambda conn, polar: get_bar_travel_stats(conn), LIFT_TABLES),
+    ('bodyWeight', 'Extracting body weight data...',
+     lambda conn, polar: get_body_weight_data(conn), ('body_weight',)),
+    ('relativeStrength', 'Calculating relative strength metrics...',
+     lambda conn, polar: get_relative_strength(conn), LIFT_TABLES + ('body_weight',)),
+    ('trainingLoad', 'Calculating rolling training load...',
+     lambda conn, polar: get_training_load(conn, polar()[0]), HISTORY_TABLES + ('polar',)),
+    ('polarSummary', 'Summarizing Polar sessions...',
+     lambda conn, polar: polar()[1], ('polar',)),
+    ('polarMonthly', 'Aggregating Polar sessions by month...',
+     lambda conn, polar: polar()[2], ('polar',)),
+]
+
+SECTION_KEYS = [key for key, _, _, _ in SECTIONS]
+
+def section_names(value):
+    """argparse type for --sections/--exclude: comma-separated section keys."""
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SECTION_KEYS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown section: {', '.join(unknown)} (choose from {', '.join(SECTION_KEYS)})")
+    return names
+
+def select_sections(only=None, exclude=None, existing=None):
+    """Section keys to compute, in file order: `only` (default all) minus `exclude`.
+
+    Sections do not read each other's output; what they share (local days,
+    lift sets, the workout table, the Polar parse) is built by whichever
+    selected section needs it first. Sections missing from `existing` (the
+    dataset the result is merged into) are added, so the merged files stay
+    complete.
+    """
+    selected = set(only or SECTION_KEYS) - set(exclude or ())
+    if existing is not None:
+        selected |= {key for key in SECTION_KEYS if key not in existing}
+    return [key for key in SECTION_KEYS if key in selected]
 
-    # Write split files for performance optimization
-    output_dir = os.path.dirname(output_path) or '.'
+def sections_reading(sources):
+    """Return the keys of every section that reads any of the given sources.
 
-    # Core data (~80KB) - loaded immediately
-    core_data = {
-        'summary': summary,
-        'allTimePRs': all_time_prs,
-        'daysSinceLastPR': days_since_last_pr,
-        'barTravel': bar_travel_stats,
-        'powerliftingTotals': {
-            'current': powerlifting_totals['current'],
-            'peak': powerlifting_totals['peak'],
-            'clubMilestones': powerlifting_totals['clubMilestones']
-        },
+    Sources are table names, 'polar' and 'today'; 'db' stands for every table.
+    """
+    sources = set(sources)
+    if 'db' in sources:
+        sources |= set(DB_TABLES)
+    return [key for key, _, _, section_sources in SECTIONS if set(section_sources) & sources]
+
+def section_inputs(conn, polar_dir, cache):
+    """Return inputs(sources): what a section reading `sources` is computed from, for its cache key."""
+    from section_cache import code_version
+
+    shared = {'code': code_version(), 'timezone': conn.timezone, 'lifts': get_lift_registry(conn)}
+    by_source = {}
+
+    def inputs(sources):
+        for source in sources:
+            if source not in by_source:
+                if source in DB_TABLES:
+                    by_source.update(cache.table_fingerprints(conn, DB_TABLES))
+                elif source == 'polar':
+                    by_source[source] = polar_manifest(polar_dir)
+                elif source == 'today':
+                    by_source[source] = date.today().isoformat()
+        return {**shared, **{source: by_source[source] for source in sources}}
+
+    return inputs
+
+def extract_all(conn, polar_dir=POLAR_DIR, sections=None, polar_cache=None, progress=True, cache=None):
+    """Run the extraction sections against an open connection and return the dataset.
+
+    sections limits the run to the given output keys (default: all of them);
+    polar_cache is passed through to get_polar_sessions() as its session cache;
+    progress=False silences the per-section progress lines; cache (a
+    section_cache.SectionCache) serves sections whose inputs are unchanged
+    and stores the ones computed, recording in cache.reasons which inputs
+    made each of them run.
+    """
+    if cache is not None:
+        inputs = section_inputs(conn, polar_dir, cache)
+    local_days_ready = False
+    polar_result = []
+
+    def polar():
+        if not polar_result:
+            if progress:
+                print("Extracting Polar heart rate data...")
+            polar_result.append(get_polar_sessions(polar_dir, polar_cache))
+        return polar_result[0]
+
+    data = {}
+    for key, message, builder, sources in SECTIONS:
+        if sections is not None and key not in sections:
+            continue
+        if cache is not None:
+            cache_key, hit, value = cache.lookup(key, inputs(sources))
+            if hit:
+                if progress:
+                    print(f"{message} (cached)")
+                data[key] = value
+                continue
+        if not local_days_ready:
+            # Every date-bucketing query joins the local-day tables
+            ensure_local_days(conn)
+            local_days_ready = True
+        if progress:
+            print(message if cache is None else f"{message} ({cache.reasons[key]})")
+        started = time.perf_counter()
+        data[key] = builder(conn, polar)
+        if cache is not None:
+            cache.put(cache_key, key, data[key], time.perf_counter() - started)
+
+    if cache is not None:
+        cache.save()
+    return data
+
+def write_json_atomic(path, obj):
+    """Write JSON to a temporary file beside path, then rename it into place.
+
+    Readers (the dev server, a watching browser) never see a half-written file.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(obj, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# Sections each split file is built from
+CORE_SECTIONS = ['summary', 'allTimePRs', 'daysSinceLastPR', 'barTravel', 'powerliftingTotals',
+                 'volumeTimeSeries', 'polarSummary']
+DEFERRED_SECTIONS = ['volumeTimeSeries', 'workoutCalendar', 'exerciseProgress', 'bigThreeE1RM',
+                     'bigThreeVolume', 'programs', 'workoutsByDayOfWeek', 'notableWorkouts', 'milestones',
+                     'plateMilestones', 'bodyWeight', 'relativeStrength', 'polarMonthly']
+
+def core_payload(data):
+    """Core data (~80KB) - loaded immediately."""
+    volume_time_series = data['volumeTimeSeries']
+    return {
+        'summary': data['summary'],
+        'allTimePRs': data['allTimePRs'],
+        'daysSinceLastPR': data['daysSinceLastPR'],
+        'barTravel': data['barTravel'],
+        'powerliftingTotals': data['powerliftingTotals'],
         # Include only weekly, monthly, yearly volume data
         'volumeTimeSeries': {
             'weekly': volume_time_series['weekly'],
             'monthly': volume_time_series['monthly'],
             'yearly': volume_time_series['yearly']
         },
-        'polarSummary': polar_summary,
+        'polarSummary': data['polarSummary'],
     }
 
+def deferred_payload(data):
+    """Deferred data (~700KB) - lazy loaded on scroll."""
+    return {
+        'volumeTimeSeriesDaily': data['volumeTimeSeries'].get('daily', []),
+        'workoutCalendar': data['workoutCalendar'],
+        'exerciseProgress': data['exerciseProgress'],
+        'bigThreeE1RM': data['bigThreeE1RM'],
+        'bigThreeVolume': data['bigThreeVolume'],
+        'programs': data['programs'],
+        'workoutsByDayOfWeek': data['workoutsByDayOfWeek'],
+        'notableWorkouts': data['notableWorkouts'],
+        'milestones': data['milestones'],
+        'plateMilestones': data['plateMilestones'],
+        'bodyWeight': data['bodyWeight'],
+        'relativeStrength': data['relativeStrength'],
+        'polarMonthly': data['polarMonthly'],
+        # LTTB index lists into the long series above, drawn before the full detail
+        'chartLevels': chart_levels(data),
+    }
+
+def write_outputs(data, output_path, verbose=False):
+    """Write the full dataset plus the core/deferred split files next to it."""
+    if verbose:
+        print(f"Writing output to {output_path}...")
+    write_json_atomic(output_path, data)
+
+    # Write split files for performance optimization
+    output_dir = os.path.dirname(output_path) or '.'
+
     core_path = os.path.join(output_dir, 'training_core.json')
-    if args.verbose:
+    if verbose:
         print(f"Writing core data to {core_path}...")
-    with open(core_path, 'w') as f:
-        json.dump(core_data, f, indent=2)
-
-    # Deferred data (~700KB) - lazy loaded on scroll
-    deferred_data = {
-        'volumeTimeSeriesDaily': volume_time_series.get('daily', []),
-        'workoutCalendar': workout_calendar,
-        'exerciseProgress': exercise_progress,
-        'bigThreeE1RM': big_three_e1rm,
-        'bigThreeVolume': big_three_volume,
-        'programs': programs,
-        'workoutsByDayOfWeek': workouts_by_day,
-        'notableWorkouts': notable_workouts,
-        'milestones': milestones,
-        'plateMilestones': plate_milestones,
-        'bodyWeight': body_weight_data,
-        'relativeStrength': relative_strength,
-        'polarMonthly': polar_monthly,
-    }
+    write_json_atomic(core_path, core_payload(data))
 
     deferred_path = os.path.join(output_dir, 'training_deferred.json')
-    if args.verbose:
+    if verbose:
         print(f"Writing deferred data to {deferred_path}...")
-    with open(deferred_path, 'w') as f:
-        json.dump(deferred_data, f, indent=2)
-
-    if args.verbose:
+    # Compare in JSON form (lists, string keys), as clients and the previous file hold it
+    deferred = json.loads(json.dumps(deferred_payload(data)))
+    deferred['version'] = payload_version(deferred)
+    previous = read_previous(deferred_path)
+    delta = build_delta(previous, deferred)
+    write_json_atomic(deferred_path, deferred)
+    # Clients holding the previous version apply this instead of fetching the full file
+    if delta is not None:
+        write_json_atomic(delta_path(deferred_path), delta)
+    elif (previous or {}).get('version') != deferred['version'] and os.path.exists(delta_path(deferred_path)):
+        # No versioned previous file: an older delta would not lead to this version
+        os.remove(delta_path(deferred_path))
+
+    if verbose:
         print(f"Successfully generated {output_path}")
         print(f"Successfully generated {core_path}")
         print(f"Successfully generated {deferred_path}")
+        if delta is not None:
+            print(f"Successfully generated {delta_path(deferred_path)} "
+                  f"({len(delta['sections'])} changed sections from {delta['from']})")
+
+def print_summary(data):
+    """Print a short human-readable summary of an extracted dataset."""
+    summary = data['summary']
+    powerlifting_totals = data['powerliftingTotals']
+    bar_travel_stats = data['barTravel']
+    body_weight_data = data['bodyWeight']
+    relative_strength = data['relativeStrength']
+    polar_summary = data['polarSummary']
+
     print(f"\nSummary:")
     print(f"  - Total Workouts: {summary['totalWorkouts']}")
     print(f"  - Total Volume: {summary['totalVolumeLbs']:,.0f} lbs / {summary['totalVolumeKg']:,.0f} kg")
     print(f"  - Date Range: {summary['firstWorkout']} to {summary['lastWorkout']}")
-    print(f"  - Unique Exercises: {len(exercise_progress)}")
+    print(f"  - Unique Exercises: {len(data['exerciseProgress'])}")
 
     # Print powerlifting total info
     if powerlifting_totals.get('current'):
         current = powerlifting_totals['current']
-        print(f"  - Current Total: {current['totalLbs']:.0f} lbs (S:{current['squatE1rm']:.0f} B:{current['benchE1rm']:.0f} D:{current['deadliftE1rm']:.0f})")
+        lifts = ' '.join(f"{key[:-4][0].upper()}:{value:.0f}" for key, value in current.items() if key.endswith('E1rm'))
+        print(f"  - Current Total: {current['totalLbs']:.0f} lbs ({lifts})")
 
     # Print bar travel info
     if bar_travel_stats:
@@ -1872,11 +2216,137 @@ def main():
         print(f"  - Current Body Weight: {body_weight_data['current']['lbs']} lbs / {body_weight_data['current']['kg']} kg")
     if relative_strength.get('totalMultiple'):
         tm = relative_strength['totalMultiple']
-        print(f"  - Best BW Multiples: S:{tm['squat']}× B:{tm['bench']}× D:{tm['deadlift']}× (Total: {tm['best']}×)")
+        lifts = ' '.join(f"{key[0].upper()}:{value}×" for key, value in tm.items() if key != 'best')
+        print(f"  - Best BW Multiples: {lifts} (Total: {tm['best']}×)")
     if relative_strength.get('wilks'):
         print(f"  - Best Wilks Score: {relative_strength['wilks']['best']}")
     print(f"  - Polar Sessions: {polar_summary['totalSessions']} sessions, {polar_summary['totalCalories']:,} kcal total")
 
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description='Extract training data from SQLite DB and produce training_data.json')
+    parser.add_argument('-d', '--db', dest='db_path', default=DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('-o', '--out', dest='output_path', help='Output JSON path (output root directory with --batch)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
+    parser.add_argument('--polar-dir', default=POLAR_DIR, help='Directory of Polar training-session JSON files')
+    parser.add_argument('--timezone', type=timezone_name, default=DEFAULT_TIMEZONE,
+                        help='IANA timezone for assigning workouts to days (default: $TRAINING_TIMEZONE or UTC)')
+    parser.add_argument('--snapshot', choices=SNAPSHOT_MODES,
+                        help='Extract from a consistent read-only image: copied into memory, or memory-mapped')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and re-extract affected sections when the database or Polar files change')
+    parser.add_argument('--debounce', type=float, default=2.0,
+                        help='Seconds the inputs must be quiet before a --watch refresh')
+    parser.add_argument('--poll-interval', type=float, default=5.0,
+                        help='Polling interval in seconds for --watch where inotify is unavailable')
+    parser.add_argument('--serve', action='store_true',
+                        help='Serve sections over HTTP at /data/<section>.json instead of writing files')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface for --serve')
+    parser.add_argument('--port', type=int, default=8765, help='Port for --serve')
+    parser.add_argument('--batch', metavar='SOURCE',
+                        help='Extract every athlete database in a directory or JSON manifest')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Maximum worker processes for --batch')
+    parser.add_argument('--force', action='store_true',
+                        help='With --batch, re-extract athletes whose database fingerprint is unchanged')
+    parser.add_argument('--audit-plans', dest='audit_path', metavar='PATH',
+                        help='Capture EXPLAIN QUERY PLAN for every executed query and write the report to PATH')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Compute every section instead of reusing results cached from earlier runs')
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help='Section cache directory (default: $TRAINING_CACHE_DIR or data/section-cache)')
+    parser.add_argument('--sections', type=section_names, action='extend', metavar='KEY[,KEY...]',
+                        help='Only compute these sections and merge them into the existing output files')
+    parser.add_argument('--exclude', type=section_names, action='extend', metavar='KEY[,KEY...]',
+                        help='Compute every section except these, keeping their existing output')
+    args = parser.parse_args()
+    partial = args.sections is not None or args.exclude is not None
+    if partial and (args.batch or args.serve or args.watch):
+        parser.error('--sections and --exclude apply to a single extraction, not --batch, --serve or --watch')
+
+    if args.batch:
+        from batch_extract import run_batch
+        output_root = args.output_path or os.path.join(OUTPUT_DIR, 'athletes')
+        failures = run_batch(args.batch, output_root, jobs=args.jobs, force=args.force, verbose=args.verbose,
+                             timezone=args.timezone, snapshot=args.snapshot)
+        sys.exit(1 if failures else 0)
+
+    if args.serve:
+        from data_server import serve
+        serve(args.db_path, polar_dir=args.polar_dir, host=args.host, port=args.port, verbose=args.verbose,
+              timezone=args.timezone)
+        return
+
+    args.output_path = args.output_path or OUTPUT_PATH
+    if args.watch:
+        from watch_extract import run_watch
+        run_watch(args.db_path, args.output_path, polar_dir=args.polar_dir, debounce=args.debounce,
+                  poll_interval=args.poll_interval, verbose=args.verbose, timezone=args.timezone)
+        return
+
+    if args.verbose:
+        print(f"Connecting to database at {args.db_path}...")
+    started = time.perf_counter()
+    conn = connect_db(args.db_path, timezone=args.timezone, snapshot=args.snapshot)
+
+    audit = None
+    if args.audit_path:
+        from query_audit import QueryAudit
+        audit = QueryAudit()
+        audit.attach(conn)
+
+    cache = None
+    if not args.no_cache and not args.audit_path:
+        from section_cache import SectionCache
+        cache = SectionCache(args.cache_dir)
+
+    sections = None
+    if partial:
+        # Sections left out keep what the existing output holds
+        existing = read_previous(args.output_path) or {}
+        sections = select_sections(args.sections, args.exclude, existing)
+
+    extract_started = time.perf_counter()
+    data = extract_all(conn, polar_dir=args.polar_dir, sections=sections, cache=cache)
+    extract_seconds = time.perf_counter() - extract_started
+    if partial:
+        data = {key: data[key] if key in data else existing[key] for key in SECTION_KEYS}
+
+    write_outputs(data, args.output_path, verbose=args.verbose)
+    print_summary(data)
+    if partial:
+        from section_cache import recorded_seconds
+        seconds = recorded_seconds(args.cache_dir)
+        kept = [key for key in SECTION_KEYS if key not in sections]
+        saved = sum(seconds[key] for key in kept if key in seconds)
+        unknown = sum(1 for key in kept if key not in seconds)
+        print(f"  - Sections: {len(sections)} extracted in {extract_seconds:.2f}s, "
+              f"{len(kept)} kept from {args.output_path}")
+        if kept:
+            # Sections missing from the existing output were extracted too
+            print(f"      extracted: {', '.join(sections) or 'none'}")
+            print(f"      about {saved:.2f}s saved (the kept sections' last computed times"
+                  f"{f'; {unknown} never timed' if unknown else ''})")
+    if cache is not None:
+        print(f"  - Section cache: {cache.hits} reused, {cache.misses} computed "
+              f"({time.perf_counter() - started:.2f}s total)")
+        by_reason = {}
+        for key, reason in cache.reasons.items():
+            by_reason.setdefault(reason, []).append(key)
+        for reason, keys in by_reason.items():
+            print(f"      {reason}: {', '.join(keys)}")
+    if conn.snapshot:
+        print(f"  - Snapshot ({conn.snapshot}): {conn.snapshot_seconds:.3f}s to open, "
+              f"{time.perf_counter() - started:.2f}s total")
+
+    if audit:
+        audit.detach(conn)
+        report = audit.report(conn)
+        with open(args.audit_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"  - Query Plan Audit: {report['totals']['statements']} statements, "
+              f"{report['totals']['flagged']} flagged (written to {args.audit_path})")
+
     conn.close()
 
 if __name__ == '__main__':
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Set-based timestamp corrections for MyApp.db.
+
+Selects the rows of `history` (or `body_weight`) belonging to a program
+and/or a date range and shifts their `date` by a rule:
+
+  --offset HOURS       fixed shift, e.g. -19 or -5.5
+  --local-as-utc TZ    timestamps hold TZ wall-clock time stored as if it were
+                       UTC; shift each row by TZ's UTC offset at that time
+                       (DST-aware)
+
+The new timestamps are computed in one INSERT ... SELECT into a temp table and
+applied with a single UPDATE ... FROM inside one transaction. Without --apply
+the tool only prints a diff of what would change.
+
+Every applied correction is recorded in `timestamp_corrections` (plus the old
+and new value of each row in `timestamp_correction_rows`) in the same
+transaction. Re-running the same correction is a no-op, and --revert NAME
+restores the logged values.
+
+    python fix_timestamps.py --program StrongLifts --offset -19
+    python fix_timestamps.py --from 2019-01-23 --to 2019-04-17 --local-as-utc America/New_York --apply
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import date, datetime, timezone
+
+import extract_data
+from db_backup import backup_database
+from local_days import MAX_MS, MIN_MS, OFFSET_TABLE_SQL, get_tzinfo, offset_lookup, timezone_name, utc_offset_ranges
+
+TABLES = ('history', 'body_weight')
+
+LOG_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS timestamp_corrections (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        table_name TEXT NOT NULL,
+        selector TEXT NOT NULL,
+        rule TEXT NOT NULL,
+        rows INTEGER NOT NULL,
+        applied_at INTEGER NOT NULL,
+        reverted_at INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS timestamp_correction_rows (
+        correction_id INTEGER NOT NULL REFERENCES timestamp_corrections(id),
+        row_id INTEGER NOT NULL,
+        old_date INTEGER NOT NULL,
+        new_date INTEGER NOT NULL,
+        PRIMARY KEY (correction_id, row_id)
+    ) WITHOUT ROWID;
+"""
+
+def parse_bound(value, end=False):
+    """Parse a --from/--to bound: epoch milliseconds or a YYYY-MM-DD (UTC) day.
+
+    A day given as the upper bound includes that whole day; an epoch-ms upper
+    bound is exclusive (rows with date < bound).
+    """
+    if value is None:
+        return None
+    if value.lstrip('-').isdigit():
+        return int(value)
+    day = date.fromisoformat(value)
+    ms = int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+    return ms + 86400000 if end else ms
+
+def resolve_program(conn, program):
+    """Return the program id for an id or routine name; ValueError if unknown or ambiguous."""
+    if program.isdigit():
+        row = conn.execute("SELECT id FROM programs WHERE id = ?", (int(program),)).fetchone()
+        if row:
+            return row[0]
+    rows = conn.execute("SELECT id FROM programs WHERE routine = ?", (program,)).fetchall()
+    if len(rows) == 1:
+        return rows[0][0]
+    raise ValueError(f"{'ambiguous' if rows else 'unknown'} program: {program}")
+
+def build_selector(table, program_id=None, start_ms=None, end_ms=None):
+    """Return (WHERE clause, params, description) selecting the rows to correct."""
+    clauses = ["date IS NOT NULL"]
+    params = []
+    parts = []
+    if program_id is not None:
+        if table != 'history':
+            raise ValueError("--program only applies to the history table")
+        clauses.append("program_id = ?")
+        params.append(program_id)
+        parts.append(f"program={program_id}")
+    if start_ms is not None:
+        clauses.append("date >= ?")
+        params.append(start_ms)
+        parts.append(f"from={start_ms}")
+    if end_ms is not None:
+        clauses.append("date < ?")
+        params.append(end_ms)
+        parts.append(f"to={end_ms}")
+    if not parts:
+        raise ValueError("select rows with --program and/or --from/--to")
+    return ' AND '.join(clauses), params, ' '.join(parts)
+
+def local_as_utc_ranges(tz, start_ms, end_ms):
+    """Offset spans in wall-clock milliseconds for rows that stored TZ local time as UTC.
+
+    Wall time w of an instant with offset o is w = utc + o, so each UTC span of
+    constant offset maps to a wall-clock span shifted by that offset. Spans are
+    made contiguous: wall times skipped by a DST gap keep the earlier offset and
+    times repeated by a fall-back resolve to their first occurrence, like
+    zoneinfo with fold=0.
+    """
+    spans = utc_offset_ranges(tz, start_ms - 86400000, end_ms + 86400000)
+    ranges = []
+    start = MIN_MS
+    for i, (_, hi, offset) in enumerate(spans):
+        if hi == MAX_MS:
+            end = MAX_MS
+        else:
+            # hi + offset is where this offset stops; hi + next offset is where the next starts
+            end = max(hi + offset * 1000, hi + spans[i + 1][2] * 1000)
+        ranges.append((start, end, offset))
+        start = end
+    return ranges
+
+def stage_correction(conn, table, where, params, offset_hours=None, tz_name=None):
+    """Compute old/new timestamps for the selected rows into temp.fix_rows; returns the row count."""
+    conn.execute("DROP TABLE IF EXISTS temp.fix_rows")
+    conn.execute("CREATE TEMP TABLE fix_rows (id INTEGER PRIMARY KEY, old_date INTEGER, new_date INTEGER)")
+    if offset_hours is not None:
+        conn.execute(f"""
+            INSERT INTO temp.fix_rows (id, old_date, new_date)
+            SELECT id, date, date + ?
+            FROM main.{table}
+            WHERE {where}
+        """, [int(round(offset_hours * 3600000))] + params)
+    else:
+        start_ms, end_ms = conn.execute(f"SELECT MIN(date), MAX(date) FROM main.{table} WHERE {where}",
+                                        params).fetchone()
+        conn.execute("DROP TABLE IF EXISTS temp.fix_offsets")
+        conn.execute(OFFSET_TABLE_SQL.format(name='fix_offsets'))
+        if start_ms is not None:
+            conn.executemany("INSERT INTO temp.fix_offsets VALUES (?, ?, ?)",
+                             local_as_utc_ranges(get_tzinfo(tz_name), start_ms, end_ms))
+        conn.execute(f"""
+            INSERT INTO temp.fix_rows (id, old_date, new_date)
+            SELECT id, date, date - 1000 * {offset_lookup('date', 'temp.fix_offsets')}
+            FROM main.{table}
+            WHERE {where}
+        """, params)
+    return conn.execute("SELECT COUNT(*) FROM temp.fix_rows").fetchone()[0]
+
+def ms_to_utc(ms):
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def print_diff(conn, limit=10):
+    """Print a summary of the staged change and the first `limit` rows."""
+    count, shifts, first, last = conn.execute("""
+        SELECT COUNT(*), COUNT(DISTINCT new_date - old_date), MIN(old_date), MAX(old_date)
+        FROM temp.fix_rows
+    """).fetchone()
+    if not count:
+        print("No rows selected")
+        return
+    print(f"{count} rows from {ms_to_utc(first)} to {ms_to_utc(last)} UTC, {shifts} distinct shift(s)")
+    print(f"\n{'ID':>8}  {'Current (UTC)':<19}  {'Corrected (UTC)':<19}  Change")
+    print('-' * 62)
+    for row_id, old, new in conn.execute(
+            "SELECT id, old_date, new_date FROM temp.fix_rows ORDER BY old_date LIMIT ?", (limit,)):
+        print(f"{row_id:>8}  {ms_to_utc(old):<19}  {ms_to_utc(new):<19}  {(new - old) / 3600000:+g}h")
+    if count > limit:
+        print(f"... and {count - limit} more")
+
+def applied_correction(conn, name):
+    """Return (id, rows, applied_at) if a correction with this name is currently applied."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'timestamp_corrections'").fetchone():
+        return None
+    return conn.execute("""
+        SELECT id, rows, applied_at FROM timestamp_corrections
+        WHERE name = ? AND reverted_at IS NULL
+    """, (name,)).fetchone()
+
+def apply_correction(conn, name, table, where, params, selector, rule, offset_hours=None, tz_name=None):
+    """Stage, apply and log a correction in one transaction; returns rows updated or None if already applied.
+
+    The rows are re-staged after BEGIN IMMEDIATE, so a writer that got in after the preview cannot leave the
+    update or the logged old dates stale.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for statement in LOG_SCHEMA.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        if applied_correction(conn, name):
+            conn.execute("ROLLBACK")
+            return None
+        # A reverted correction keeps its name; re-applying replaces the old log entry
+        old = conn.execute("SELECT id FROM timestamp_corrections WHERE name = ?", (name,)).fetchone()
+        if old:
+            conn.execute("DELETE FROM timestamp_correction_rows WHERE correction_id = ?", (old[0],))
+            conn.execute("DELETE FROM timestamp_corrections WHERE id = ?", (old[0],))
+
+        stage_correction(conn, table, where, params, offset_hours, tz_name)
+        updated = conn.execute(f"""
+            UPDATE main.{table} SET date = f.new_date
+            FROM temp.fix_rows f
+            WHERE f.id = {table}.id
+        """).rowcount
+        correction_id = conn.execute("""
+            INSERT INTO timestamp_corrections (name, table_name, selector, rule, rows, applied_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (name, table, selector, rule, updated, int(time.time() * 1000))).lastrowid
+        conn.execute("""
+            INSERT INTO timestamp_correction_rows (correction_id, row_id, old_date, new_date)
+            SELECT ?, id, old_date, new_date FROM temp.fix_rows
+        """, (correction_id,))
+        conn.execute("COMMIT")
+        return updated
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def revert_correction(conn, name):
+    """Restore the logged old timestamps of an applied correction; returns rows restored or None."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        applied = applied_correction(conn, name)
+        if not applied:
+            conn.execute("ROLLBACK")
+            return None
+        correction_id = applied[0]
+        table = conn.execute("SELECT table_name FROM timestamp_corrections WHERE id = ?",
+                             (correction_id,)).fetchone()[0]
+        restored = conn.execute(f"""
+            UPDATE main.{table} SET date = r.old_date
+            FROM timestamp_correction_rows r
+            WHERE r.correction_id = ? AND r.row_id = {table}.id
+        """, (correction_id,)).rowcount
+        conn.execute("UPDATE timestamp_corrections SET reverted_at = ? WHERE id = ?",
+                     (int(time.time() * 1000), correction_id))
+        conn.execute("COMMIT")
+        return restored
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+def print_log(conn):
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'timestamp_corrections'").fetchone():
+        print("No corrections recorded")
+        return
+    for name, table, rows, applied_at, reverted_at in conn.execute("""
+            SELECT name, table_name, rows, applied_at, reverted_at FROM timestamp_corrections ORDER BY id"""):
+        state = f"reverted {ms_to_utc(reverted_at)}" if reverted_at else 'applied'
+        print(f"{ms_to_utc(applied_at)}  {table:<11}  {rows:>7} rows  {state:<28}  {name}")
+
+def correct_timestamps(db_path, table='history', program=None, start=None, end=None, offset_hours=None,
+                       tz_name=None, name=None, apply=False, backup_path=None, limit=10):
+    """Preview a correction, print its diff and optionally apply it. Returns rows updated (0 for a dry run)."""
+    if (offset_hours is None) == (tz_name is None):
+        raise ValueError("give exactly one of --offset or --local-as-utc")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        program_id = resolve_program(conn, program) if program is not None else None
+        where, params, selector = build_selector(table, program_id, parse_bound(start), parse_bound(end, end=True))
+        rule = f"offset={offset_hours:g}h" if offset_hours is not None else f"local-as-utc={tz_name}"
+        name = name or f"{table} {selector} {rule}"
+
+        previous = applied_correction(conn, name)
+        if previous:
+            print(f"Correction '{name}' already applied to {previous[1]} rows at {ms_to_utc(previous[2])} UTC; nothing to do")
+            return 0
+
+        started = time.perf_counter()
+        staged = stage_correction(conn, table, where, params, offset_hours, tz_name)
+        print(f"Correction '{name}':")
+        print_diff(conn, limit)
+        if not apply:
+            print(f"\nDry run ({(time.perf_counter() - started) * 1000:.0f} ms); pass --apply to write the change")
+            return 0
+
+        if backup_path:
+            print(f"\nCreating backup: {backup_path}")
+            backup_database(db_path, backup_path)
+        started = time.perf_counter()
+        updated = apply_correction(conn, name, table, where, params, selector, rule, offset_hours, tz_name)
+        if updated is None:
+            print("Correction was applied concurrently; nothing to do")
+            return 0
+        if updated != staged:
+            print(f"\nThe table changed since the preview: {updated} rows matched instead of {staged}")
+        print(f"\nUpdated {updated} rows in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return updated
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Shift workout or body-weight timestamps with a set-based, logged correction')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('--table', choices=TABLES, default='history', help='Table whose date column is corrected')
+    parser.add_argument('--program', help='Program id or routine name whose workouts are corrected')
+    parser.add_argument('--from', dest='start', help='First affected timestamp (YYYY-MM-DD UTC day or epoch ms)')
+    parser.add_argument('--to', dest='end', help='End of the range: YYYY-MM-DD UTC day (inclusive) or epoch ms (exclusive)')
+    rule = parser.add_mutually_exclusive_group()
+    rule.add_argument('--offset', type=float, metavar='HOURS', help='Shift every selected timestamp by HOURS')
+    rule.add_argument('--local-as-utc', type=timezone_name, metavar='TZ',
+                      help='Timestamps hold TZ wall-clock time stored as UTC; convert them to real UTC')
+    parser.add_argument('--name', help='Correction name used for idempotency (default: derived from selection and rule)')
+    parser.add_argument('--apply', action='store_true', help='Write the change (default: dry-run diff only)')
+    parser.add_argument('--backup', metavar='PATH', help='Back up the database here before applying (.gz to compress; default: <db>.backup)')
+    parser.add_argument('--no-backup', action='store_true', help='Apply without taking a backup first')
+    parser.add_argument('--limit', type=int, default=10, help='Rows shown in the diff')
+    parser.add_argument('--revert', metavar='NAME', help='Restore the timestamps changed by an applied correction')
+    parser.add_argument('--log', action='store_true', help='List recorded corrections')
+    args = parser.parse_args()
+
+    if args.log or args.revert:
+        conn = sqlite3.connect(args.db_path, isolation_level=None)
+        try:
+            if args.log:
+                print_log(conn)
+            else:
+                restored = revert_correction(conn, args.revert)
+                print(f"Restored {restored} rows" if restored is not None else f"No applied correction named '{args.revert}'")
+        finally:
+            conn.close()
+        return
+
+    backup_path = None if args.no_backup else (args.backup or args.db_path + '.backup')
+    try:
+        correct_timestamps(args.db_path, args.table, args.program, args.start, args.end, args.offset,
+                           args.local_as_utc, args.name, args.apply, backup_path, args.limit)
+    except ValueError as e:
+        parser.error(str(e))
+
+if __name__ == '__main__':
+    main()
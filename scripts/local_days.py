@@ -0,0 +1,159 @@
+"""
+Local-day materialization for workout and body-weight timestamps.
+
+MyApp.db stores `history.date` and `body_weight.date` as UTC milliseconds.
+Bucketing them with `date(date/1000, 'unixepoch')` re-evaluates a string
+conversion for every row of every query and puts late-evening workouts on the
+next (UTC) day. Instead, the local calendar day of every row is computed once,
+set-based, into TEMP tables keyed by row id:
+
+    temp.history_local(id, day, month, year, weekday, ymd, ym)
+    temp.body_weight_local(id, day, month, year, weekday, ymd, ym)
+
+`day` is the proleptic Gregorian ordinal (date.toordinal()) of the local date,
+`month` is year * 12 + month - 1 and `weekday` follows strftime('%w')
+(0 = Sunday), so queries group on integer keys and only select the `ymd`
+('YYYY-MM-DD') / `ym` ('YYYY-MM') labels for output.
+
+The UTC offset of the configured timezone is resolved per span between DST
+transitions (temp.tz_offsets, keyed by span start), so converting a row is one
+index seek rather than a per-row timezone computation.
+"""
+
+import argparse
+from datetime import date, datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = 'UTC'
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Sentinels for the open-ended first and last offset spans
+MIN_MS = -(1 << 62)
+MAX_MS = 1 << 62
+
+def get_tzinfo(name):
+    if not name or name.upper() == 'UTC':
+        return dt_timezone.utc
+    return ZoneInfo(name)
+
+def timezone_name(value):
+    """argparse type for --timezone: 'UTC' or an IANA name such as 'America/New_York'."""
+    try:
+        get_tzinfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise argparse.ArgumentTypeError(f"unknown timezone: {value}")
+    return value
+
+def utc_offset_ranges(tz, start_ms, end_ms, step_seconds=7 * 86400):
+    """Split time into spans of constant UTC offset: [(start_ms, end_ms, offset_seconds)].
+
+    The span containing start_ms extends back to MIN_MS and the last one forward to
+    MAX_MS. Transitions are located by stepping a week at a time (DST changes are
+    months apart) and bisecting to the exact second.
+    """
+    if tz is dt_timezone.utc:
+        return [(MIN_MS, MAX_MS, 0)]
+
+    def offset_at(seconds):
+        return int(datetime.fromtimestamp(seconds, tz).utcoffset().total_seconds())
+
+    t = start_ms // 1000
+    end = end_ms // 1000 + 1
+    current = offset_at(t)
+    span_start = MIN_MS
+    ranges = []
+    while t < end:
+        nxt = min(t + step_seconds, end)
+        offset = offset_at(nxt)
+        if offset != current:
+            lo, hi = t, nxt
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if offset_at(mid) == current:
+                    lo = mid
+                else:
+                    hi = mid
+            ranges.append((span_start, hi * 1000, current))
+            span_start = hi * 1000
+            current = offset
+        t = nxt
+    ranges.append((span_start, MAX_MS, current))
+    return ranges
+
+OFFSET_TABLE_SQL = "CREATE TEMP TABLE {name} (start_ms INTEGER PRIMARY KEY, end_ms INTEGER, offset_seconds INTEGER)"
+
+def offset_lookup(column, table='temp.tz_offsets'):
+    """SQL expression for the UTC offset (seconds) in effect at the epoch-ms `column`."""
+    return f"(SELECT offset_seconds FROM {table} WHERE start_ms <= {column} ORDER BY start_ms DESC LIMIT 1)"
+
+LOCAL_TABLE_SQL = """
+    CREATE TEMP TABLE {name} (
+        id INTEGER PRIMARY KEY,
+        day INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        year INTEGER NOT NULL,
+        weekday INTEGER NOT NULL,
+        ymd TEXT NOT NULL,
+        ym TEXT NOT NULL
+    )
+"""
+
+# One row per source row; the strftime calls run once here instead of in every query
+LOCAL_INSERT_SQL = """
+    INSERT INTO temp.{name} (id, day, month, year, weekday, ymd, ym)
+    SELECT
+        id,
+        s / 86400 + {epoch},
+        CAST(strftime('%Y', s, 'unixepoch') AS INTEGER) * 12 + CAST(strftime('%m', s, 'unixepoch') AS INTEGER) - 1,
+        CAST(strftime('%Y', s, 'unixepoch') AS INTEGER),
+        (s / 86400 + {epoch}) % 7,
+        date(s, 'unixepoch'),
+        strftime('%Y-%m', s, 'unixepoch')
+    FROM (
+        SELECT t.id, t.date / 1000 + {offset} AS s
+        FROM main.{source} t
+        WHERE t.date IS NOT NULL
+    )
+"""
+
+def materialize_offsets(conn, tz_name=DEFAULT_TIMEZONE):
+    """(Re)build temp.tz_offsets for tz_name over the span of history and body_weight dates."""
+    tz = get_tzinfo(tz_name)
+    start_ms, end_ms = conn.execute("""
+        SELECT MIN(lo), MAX(hi) FROM (
+            SELECT MIN(date) AS lo, MAX(date) AS hi FROM main.history
+            UNION ALL
+            SELECT MIN(date), MAX(date) FROM main.body_weight
+        )
+    """).fetchone()
+    ranges = utc_offset_ranges(tz, start_ms or 0, end_ms or 0)
+
+    conn.execute("DROP TABLE IF EXISTS temp.tz_offsets")
+    conn.execute(OFFSET_TABLE_SQL.format(name='tz_offsets'))
+    conn.executemany("INSERT INTO temp.tz_offsets VALUES (?, ?, ?)", ranges)
+
+def materialize_local_days(conn, tz_name=DEFAULT_TIMEZONE):
+    """(Re)build temp.history_local and temp.body_weight_local for tz_name."""
+    materialize_offsets(conn, tz_name)
+    for name, source in (('history_local', 'history'), ('body_weight_local', 'body_weight')):
+        conn.execute(f"DROP TABLE IF EXISTS temp.{name}")
+        conn.execute(LOCAL_TABLE_SQL.format(name=name))
+        conn.execute(LOCAL_INSERT_SQL.format(name=name, source=source, epoch=EPOCH_ORDINAL,
+                                             offset=offset_lookup('t.date')))
+        conn.execute(f"CREATE INDEX temp.{name}_day ON {name}(day)")
+    conn.commit()
+    return tz_name
+
+def ensure_local_days(conn):
+    """Materialize the local-day tables once per connection (and per memo reset)."""
+    tz_name = getattr(conn, 'timezone', DEFAULT_TIMEZONE)
+    memo = getattr(conn, 'memo', None)
+    if memo is None:
+        return materialize_local_days(conn, tz_name)
+    if memo.get('local_days') != tz_name:
+        memo['local_days'] = materialize_local_days(conn, tz_name)
+    return tz_name
+
+def day_to_iso(day):
+    """Convert a local day ordinal back to a YYYY-MM-DD string."""
+    return date.fromordinal(day).isoformat()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Audit the query plans of every statement executed by extract_data.py.
+
+Each statement is captured through SQLite's trace callback, tagged with the
+extraction section (the outermost get_* function) that issued it, and run
+through EXPLAIN QUERY PLAN. Plans are flagged for full table scans, automatic
+indexes and temp B-trees built for GROUP BY / ORDER BY / DISTINCT.
+
+Run standalone to compare the raw database against indexed variants so plan
+regressions show up side by side:
+
+    python query_audit.py --db ../data/MyApp.db \\
+        --index "CREATE INDEX idx_he_history ON history_exercises(history_id)"
+    python query_audit.py --db ../data/MyApp.db --compare ../data/MyApp-indexed.db
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+
+import extract_data
+
+EXTRACTOR_FILE = os.path.basename(extract_data.__file__)
+
+# Statements worth explaining; PRAGMAs, BEGIN/COMMIT and DDL have no plan
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+FLAG_LABELS = {
+    'full_scan': 'full table scan',
+    'automatic_index': 'automatic index',
+    'temp_btree': 'temp B-tree',
+}
+
+def normalize_sql(sql):
+    """Collapse literals and whitespace so repeated executions share one key."""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    return ' '.join(sql.split())
+
+def classify_plan(plan):
+    """Return the sorted list of flags raised by a list of EXPLAIN QUERY PLAN details."""
+    # Subqueries and CTEs show up as CO-ROUTINE/MATERIALIZE nodes; scanning those is expected
+    transient = set()
+    for detail in plan:
+        m = re.match(r'(?:CO-ROUTINE|MATERIALIZE) (\S+)', detail)
+        if m:
+            transient.add(m.group(1))
+
+    flags = set()
+    for detail in plan:
+        m = re.match(r'SCAN (\S+)(.*)', detail)
+        if m and m.group(1) not in transient and m.group(1) != 'CONSTANT' and 'INDEX' not in m.group(2):
+            flags.add('full_scan')
+        if 'AUTOMATIC' in detail:
+            flags.add('automatic_index')
+        if 'TEMP B-TREE' in detail:
+            flags.add('temp_btree')
+    return sorted(flags)
+
+def calling_section(frame):
+    """Find the extraction section and innermost extractor function behind a statement."""
+    section = None
+    caller = None
+    while frame is not None:
+        code = frame.f_code
+        if os.path.basename(code.co_filename) == EXTRACTOR_FILE:
+            if caller is None:
+                caller = code.co_name
+            if code.co_name.startswith('get_'):
+                section = code.co_name
+        frame = frame.f_back
+    return section or caller or '<external>', caller or '<external>'
+
+class QueryAudit:
+    """Collects executed statements from a connection and explains them on demand."""
+
+    def __init__(self):
+        self.statements = {}
+
+    def attach(self, conn):
+        conn.set_trace_callback(self._trace)
+
+    def detach(self, conn):
+        conn.set_trace_callback(None)
+
+    def _trace(self, sql):
+        stripped = sql.lstrip()
+        if not stripped.upper().startswith(EXPLAINABLE):
+            return
+        section, caller = calling_section(sys._getframe(1))
+        key = (section, normalize_sql(stripped))
+        entry = self.statements.get(key)
+        if entry is None:
+            self.statements[key] = {'section': section, 'caller': caller, 'sql': stripped, 'executions': 1}
+        else:
+            entry['executions'] += 1
+
+    def report(self, conn, label=None):
+        """Explain every captured statement on conn and summarize the flags."""
+        results = []
+        for (section, key), entry in self.statements.items():
+            try:
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {entry['sql']}")]
+                error = None
+            except sqlite3.Error as e:
+                plan = []
+                error = str(e)
+            results.append({
+                'section': section,
+                'caller': entry['caller'],
+                'key': key,
+                'executions': entry['executions'],
+                'plan': plan,
+                'flags': classify_plan(plan),
+                'error': error,
+                'sql': ' '.join(entry['sql'].split()),
+            })
+        results.sort(key=lambda r: (r['section'], r['key']))
+
+        by_flag = {flag: sum(1 for r in results if flag in r['flags']) for flag in FLAG_LABELS}
+        return {
+            'database': label,
+            'totals': {
+                'statements': len(results),
+                'executions': sum(r['executions'] for r in results),
+                'flagged': sum(1 for r in results if r['flags']),
+                **by_flag,
+            },
+            'statements': results,
+        }
+
+def audit_database(conn, label):
+    """Run the full extraction against conn with auditing enabled and return the report."""
+    audit = QueryAudit()
+    audit.attach(conn)
+    with contextlib.redirect_stdout(io.StringIO()):
+        extract_data.extract_all(conn)
+    audit.detach(conn)
+    return audit.report(conn, label)
+
+def open_indexed_variant(db_path, index_statements):
+    """Copy db_path into memory and apply the given CREATE INDEX statements."""
+    source = sqlite3.connect(db_path)
+    conn = extract_data.connect_db(':memory:')
+    source.backup(conn)
+    source.close()
+    for statement in index_statements:
+        conn.execute(statement)
+    conn.execute('ANALYZE')
+    return conn
+
+def compare_reports(base, variant):
+    """Diff flags statement by statement; new flags in the variant are regressions."""
+    base_by_key = {(r['section'], r['key']): r for r in base['statements']}
+    changes = []
+    for r in variant['statements']:
+        before = base_by_key.get((r['section'], r['key']))
+        if before is None:
+            continue
+        regressions = sorted(set(r['flags']) - set(before['flags']))
+        improvements = sorted(set(before['flags']) - set(r['flags']))
+        if regressions or improvements or before['plan'] != r['plan']:
+            changes.append({
+                'section': r['section'],
+                'key': r['key'],
+                'regressions': regressions,
+                'improvements': improvements,
+                'before': before['plan'],
+                'after': r['plan'],
+            })
+    return {
+        'base': base['database'],
+        'variant': variant['database'],
+        'regressions': sum(1 for c in changes if c['regressions']),
+        'improvements': sum(1 for c in changes if c['improvements']),
+        'changes': changes,
+    }
+
+def print_report(report):
+    """Print one line per flagged statement, grouped by section."""
+    totals = report['totals']
+    print(f"\n{report['database']}: {totals['statements']} statements "
+          f"({totals['executions']} executions), {totals['flagged']} flagged")
+    for flag, label in FLAG_LABELS.items():
+        print(f"  - {label}: {totals[flag]}")
+    for r in report['statements']:
+        if r['flags'] or r['error']:
+            marks = ', '.join(FLAG_LABELS[f] for f in r['flags']) or f"error: {r['error']}"
+            print(f"  {r['section']:<28} x{r['executions']:<4} {marks}")
+
+def print_comparison(comparison):
+    print(f"\n{comparison['variant']} vs {comparison['base']}: "
+          f"{comparison['regressions']} regressions, {comparison['improvements']} improvements")
+    for c in comparison['changes']:
+        if c['regressions']:
+            print(f"  REGRESSION  {c['section']:<28} +{', '.join(c['regressions'])}")
+        elif c['improvements']:
+            print(f"  improved    {c['section']:<28} -{', '.join(c['improvements'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit EXPLAIN QUERY PLAN output for every extractor query')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('--compare', action='append', default=[], metavar='DB',
+                        help='Additional database (e.g. an indexed copy) to audit and compare; repeatable')
+    parser.add_argument('--index', action='append', default=[], metavar='SQL',
+                        help='CREATE INDEX statement applied to an in-memory copy of --db; repeatable')
+    parser.add_argument('-o', '--out', dest='output_path', help='Write the full JSON report to this path')
+    args = parser.parse_args()
+
+    conn = extract_data.connect_db(args.db_path)
+    base = audit_database(conn, args.db_path)
+    conn.close()
+    print_report(base)
+
+    variants = []
+    for path in args.compare:
+        conn = extract_data.connect_db(path)
+        variants.append(audit_database(conn, path))
+        conn.close()
+    if args.index:
+        conn = open_indexed_variant(args.db_path, args.index)
+        variants.append(audit_database(conn, f"{args.db_path} + {len(args.index)} index(es)"))
+        conn.close()
+
+    comparisons = []
+    for variant in variants:
+        print_report(variant)
+        comparison = compare_reports(base, variant)
+        print_comparison(comparison)
+        comparisons.append(comparison)
+
+    if args.output_path:
+        with open(args.output_path, 'w') as f:
+            json.dump({'base': base, 'variants': variants, 'comparisons': comparisons}, f, indent=2)
+        print(f"\nWrote audit report to {args.output_path}")
+
+    if any(c['regressions'] for c in comparisons):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
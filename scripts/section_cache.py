@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of computed extraction sections.
+
+Each section result is stored under a key built from everything it was
+computed from, as declared by the section's sources in extract_data.SECTIONS:
+
+  - the fingerprint of each table the section reads: row count, max rowid
+    and a hash of the table's pages in the database file (of every row in
+    rowid order where the pages cannot be read directly); any insert, delete
+    or edit changes it, including a value moved between rows or stored with
+    another type
+  - the Polar file manifest (name, size, mtime), for sections that read Polar
+  - the current date, for sections relative to today
+  - the code version: a hash of the extractor's source files, plus the
+    timezone and the lift registry the section is computed under
+
+A change to one table therefore only recomputes the sections that read it
+(a new weigh-in reruns bodyWeight and relativeStrength); the rest load from
+the cache. Table fingerprints are themselves reused while the database
+file's inode, size and mtime are unchanged, so a fully cached run does not
+scan the tables at all. The inputs each section was last used with are kept
+too, so a recomputation can say which of them changed, and each entry
+records how long its section took to compute: what a run that skips the
+section (--sections / --exclude) saves. Entries are evicted
+least-recently-used first once the cache grows past its size limit.
+
+    python section_cache.py            # list entries
+    python section_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import pickle
+import sqlite3
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Source files whose code decides section results
+CODE_FILES = ('extract_data.py', 'day_index.py', 'local_days.py', 'training_load.py', 'e1rm.py')
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+INDEX_FILE = 'index.json'
+TABLES_FILE = 'tables.json'
+INPUTS_FILE = 'inputs.json'
+
+def table_fingerprint(conn, table, pages_digest=None):
+    """Content fingerprint of one table: row count, max rowid and a content hash, JSON-ready.
+
+    The hash is pages_digest when given (see table_pages_digests), otherwise a
+    hash of every row in rowid order.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+    if not columns:
+        return None
+    fingerprint = list(cursor.execute(f"SELECT COUNT(*), MAX(rowid) FROM {table}").fetchone())
+    if pages_digest is not None:
+        fingerprint.append(pages_digest)
+        return fingerprint
+
+    # marshal keeps value types apart (1, 1.0 and '1'), so text stored in a numeric
+    # column or a value swapped between rows changes the hash; column totals did not
+    digest = hashlib.sha256()
+    quoted = ', '.join(f'"{name}"' for name in columns)
+    cursor.execute(f"SELECT rowid, {quoted} FROM {table} ORDER BY rowid")
+    while True:
+        rows = cursor.fetchmany(10000)
+        if not rows:
+            break
+        digest.update(marshal.dumps(rows))
+    fingerprint.append(digest.hexdigest())
+    return fingerprint
+
+def table_pages_digests(conn, tables):
+    """{table: hash of the b-tree pages holding it}, read from the database file; None if unavailable.
+
+    Hashing a table's raw pages costs a sequential read instead of decoding
+    every row (a few ms for the sample database instead of ~100 ms). It needs
+    the dbstat table to map tables to pages and a rollback-journal database
+    file: in WAL mode recent pages live in the -wal file, and snapshots are in
+    memory. A read transaction keeps writers out while the pages are read.
+    """
+    path = next((file for _, name, file in conn.execute("PRAGMA database_list") if name == 'main'), '')
+    if not path:
+        return None
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        conn.execute("BEGIN")
+    try:
+        # Read the schema first so the journal mode is the file's current one
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        if conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal':
+            return None
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        digests = {}
+        with open(path, 'rb') as f:
+            for table in tables:
+                digest = hashlib.sha256()
+                for (pageno,) in conn.execute("SELECT pageno FROM dbstat WHERE name = ? ORDER BY pageno",
+                                              (table,)):
+                    f.seek((pageno - 1) * page_size)
+                    digest.update(f.read(page_size))
+                digests[table] = digest.hexdigest()
+        return digests
+    except (OSError, sqlite3.OperationalError):
+        # No dbstat in this SQLite build, or the file moved away
+        return None
+    finally:
+        if own_transaction:
+            conn.execute("COMMIT")
+
+def table_fingerprints(conn, tables):
+    """{table: table_fingerprint()} for the given tables, hashing their pages where possible."""
+    digests = table_pages_digests(conn, tables) or {}
+    return {table: table_fingerprint(conn, table, digests.get(table)) for table in tables}
+
+def code_version(files=CODE_FILES):
+    """Hash of the extractor's source files; any code change invalidates every entry."""
+    digest = hashlib.sha256()
+    for name in files:
+        with open(os.path.join(SCRIPT_DIR, name), 'rb') as f:
+            digest.update(name.encode('utf-8') + b'\0' + f.read())
+    return digest.hexdigest()
+
+def recorded_seconds(directory):
+    """{section: seconds} its most recently used cached result took to compute, from directory's index."""
+    try:
+        with open(os.path.join(directory, INDEX_FILE), encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    seconds = {}
+    for entry in sorted(index.values(), key=lambda entry: entry['used']):
+        if 'seconds' in entry:
+            seconds[entry['section']] = entry['seconds']
+    return seconds
+
+def section_key(section, inputs):
+    """Cache key of a section computed from `inputs` (a JSON-serializable dict)."""
+    return input_digest([section, inputs])
+
+def input_digest(value):
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class SectionCache:
+    """Section results on disk (one pickle per key) with an LRU index bounded by total size."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Section -> why it was computed this run
+        self.reasons = {}
+        os.makedirs(directory, exist_ok=True)
+        self.index = self._read_json(INDEX_FILE) or {}
+        # Section -> {input name: digest} it was last used with
+        self.inputs = self._read_json(INPUTS_FILE) or {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_json(self, name):
+        try:
+            with open(self._path(name), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_atomic(self, name, data):
+        path = self._path(name)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def table_fingerprints(self, conn, tables):
+        """Fingerprints of the given tables; reused while conn's database file is unchanged.
+
+        conn.db_signature is taken before the connection is opened, so a write
+        during the run can only make the stored signature stale, never newer
+        than the fingerprints it is stored with.
+        """
+        signature = json.loads(json.dumps(getattr(conn, 'db_signature', None)))
+        db_path = os.path.abspath(getattr(conn, 'db_path', None) or '')
+        stored_by_db = self._read_json(TABLES_FILE) or {}
+        stored = stored_by_db.get(db_path) or {}
+        if not signature or stored.get('signature') != signature:
+            stored = {'signature': signature, 'tables': {}}
+        if all(table in stored['tables'] for table in tables):
+            return {table: stored['tables'][table] for table in tables}
+
+        missing = [table for table in tables if table not in stored['tables']]
+        stored['tables'].update(table_fingerprints(conn, missing))
+        if signature:
+            stored_by_db[db_path] = stored
+            self._write_atomic(TABLES_FILE, json.dumps(stored_by_db).encode('utf-8'))
+        return {table: stored['tables'][table] for table in tables}
+
+    def get(self, key):
+        """(True, value) on a hit, (False, None) on a miss."""
+        entry = self.index.get(key)
+        if entry is not None:
+            try:
+                with open(self._path(key + '.pickle'), 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                del self.index[key]
+            else:
+                entry['used'] = time.time()
+                self.hits += 1
+                return True, value
+        self.misses += 1
+        return False, None
+
+    def lookup(self, section, inputs):
+        """(key, hit, value) for a section computed from `inputs`; a miss is explained in self.reasons."""
+        key = section_key(section, inputs)
+        hit, value = self.get(key)
+        if not hit:
+            self.explain(section, inputs)
+        self.inputs[section] = {name: input_digest(value) for name, value in inputs.items()}
+        return key, hit, value
+
+    def explain(self, section, inputs):
+        """Why a section missed: the inputs that differ from the ones it was last used with."""
+        previous = self.inputs.get(section)
+        if previous is None:
+            reason = 'not cached'
+        else:
+            changed = sorted(name for name, value in inputs.items() if previous.get(name) != input_digest(value))
+            changed += sorted(name for name in previous if name not in inputs)
+            reason = f"{', '.join(changed)} changed" if changed else 'evicted'
+        self.reasons[section] = reason
+        return reason
+
+    def put(self, key, section, value, seconds=None):
+        """Store a section result; seconds is what computing it took."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write_atomic(key + '.pickle', data)
+        self.index[key] = {'section': section, 'bytes': len(data), 'used': time.time()}
+        if seconds is not None:
+            self.index[key]['seconds'] = round(seconds, 4)
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits max_bytes; returns the keys removed."""
+        total = sum(entry['bytes'] for entry in self.index.values())
+        removed = []
+        for key in sorted(self.index, key=lambda k: self.index[k]['used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.index.pop(key)['bytes']
+            removed.append(key)
+            try:
+                os.remove(self._path(key + '.pickle'))
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def save(self):
+        """Evict down to the size limit and persist the index."""
+        removed = self.evict()
+        self._write_atomic(INDEX_FILE, json.dumps(self.index, indent=2).encode('utf-8'))
+        self._write_atomic(INPUTS_FILE, json.dumps(self.inputs, indent=2).encode('utf-8'))
+        return removed
+
+    def clear(self):
+        for key in list(self.index):
+            try:
+                os.remove(self._path(key + '.pickle'))
+            except FileNotFoundError:
+                pass
+        self.index = {}
+        self.inputs = {}
+        for name in (INDEX_FILE, TABLES_FILE, INPUTS_FILE):
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+def main():
+    import extract_data
+
+    parser = argparse.ArgumentParser(description='Inspect or clear the extraction section cache')
+    parser.add_argument('--cache-dir', default=extract_data.CACHE_DIR, help='Cache directory')
+    parser.add_argument('--clear', action='store_true', help='Remove every cached section')
+    args = parser.parse_args()
+
+    cache = SectionCache(args.cache_dir)
+    if args.clear:
+        count = len(cache.index)
+        cache.clear()
+        print(f"Removed {count} cached sections from {args.cache_dir}")
+        return
+
+    entries = sorted(cache.index.items(), key=lambda item: item[1]['used'], reverse=True)
+    for key, entry in entries:
+        used = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['used']))
+        seconds = f"{entry['seconds']:7.2f}s" if 'seconds' in entry else ' ' * 8
+        print(f"{entry['section']:<22} {entry['bytes']:>10,} bytes {seconds}  last used {used}  {key[:12]}")
+    total = sum(entry['bytes'] for _, entry in entries)
+    print(f"{len(entries)} entries, {total:,} of {cache.max_bytes:,} bytes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Time and peak memory of each extraction section.
+
+Sections run in output order on one connection, as in a normal extraction,
+so a section that builds a shared intermediate (the lift sets, the workout
+table, the day index) is charged for it and later ones reuse it. After each
+section the process's peak resident set size is read from getrusage(); since
+the peak only grows, a section that streams its rows leaves it where it was,
+and one that materializes a result set shows up as a step.
+
+    python synth_db.py --factor 100 -o /tmp/MyApp-100x.db
+    python section_profile.py -d /tmp/MyApp-100x.db
+"""
+
+import argparse
+import resource
+import sys
+import time
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def profile_sections(conn, polar_dir, sections=None):
+    """[(section, seconds, peak RSS bytes after it)] for every section, run uncached in order."""
+    import extract_data
+
+    started = time.perf_counter()
+    extract_data.ensure_local_days(conn)
+    profile = [('(local days)', time.perf_counter() - started, peak_rss_bytes())]
+    for key, _, _, _ in extract_data.SECTIONS:
+        if sections is not None and key not in sections:
+            continue
+        started = time.perf_counter()
+        extract_data.extract_all(conn, polar_dir, sections=[key], progress=False)
+        profile.append((key, time.perf_counter() - started, peak_rss_bytes()))
+    return profile
+
+def main():
+    import extract_data
+
+    parser = argparse.ArgumentParser(description='Time each extraction section and track peak memory')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('--polar-dir', default=extract_data.POLAR_DIR, help='Directory of Polar training-session JSON files')
+    parser.add_argument('--section', action='append', help='Only profile this section (repeatable)')
+    args = parser.parse_args()
+
+    conn = extract_data.connect_db(args.db_path)
+    profile = profile_sections(conn, args.polar_dir, args.section)
+    conn.close()
+
+    previous = 0
+    print(f"{'section':<22} {'seconds':>8} {'peak RSS':>10} {'growth':>9}")
+    for key, seconds, peak in profile:
+        print(f"{key:<22} {seconds:8.2f} {peak / 2**20:8.1f}MB {(peak - previous) / 2**20:+7.1f}MB")
+        previous = peak
+    print(f"{'total':<22} {sum(seconds for _, seconds, _ in profile):8.2f} {profile[-1][2] / 2**20:8.1f}MB")
+
+if __name__ == '__main__':
+    main()
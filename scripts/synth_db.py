@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Build a scaled-up synthetic copy of MyApp.db for benchmarks.
+
+The source history is repeated `factor` times back to back: copy k is shifted
+k spans (rounded up to whole weeks, so weekdays and times of day are kept)
+into the future, which keeps even 1000x histories within datetime's range, and
+gets ids offset by k * stride, with history_exercises re-pointed at the copied
+workouts. Each copy is one INSERT ... SELECT per table.
+
+    python synth_db.py --factor 100 -o /tmp/MyApp-100x.db
+    python synth_db.py --factor 1000 --history-only -o /tmp/MyApp-1000x.db
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+
+import extract_data
+
+WEEK_MS = 7 * 86400000
+
+# table -> {column: expression}; `k` is the copy number, :names are the shift and id strides
+REMAPPED_COLUMNS = {
+    'history': {'id': 'id + k * :history_stride', 'date': 'date + k * :shift'},
+    'history_exercises': {'id': 'id + k * :exercise_stride', 'history_id': 'history_id + k * :history_stride'},
+    'body_weight': {'id': 'id + k * :body_weight_stride', 'date': 'date + k * :shift'},
+}
+
+def copy_database(source_path, dest_path):
+    """Copy the source into a fresh dest_path with the backup API."""
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    dest = sqlite3.connect(dest_path)
+    try:
+        source.backup(dest)
+    finally:
+        source.close()
+    return dest
+
+def synthesize(source_path, dest_path, factor, history_only=False):
+    """Write a copy of source_path with its history repeated `factor` times; returns row counts."""
+    conn = copy_database(source_path, dest_path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    lo, hi = conn.execute("SELECT MIN(date), MAX(date) FROM history").fetchone()
+    params = {
+        # Whole weeks, so copies keep their weekday and time of day
+        'shift': ((hi - lo) // WEEK_MS + 1) * WEEK_MS,
+        'history_stride': conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM history").fetchone()[0],
+        'exercise_stride': conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM history_exercises").fetchone()[0],
+        'body_weight_stride': conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM body_weight").fetchone()[0],
+        'copies': factor - 1,
+    }
+
+    tables = ['history'] if history_only else list(REMAPPED_COLUMNS)
+    if history_only:
+        conn.execute("DELETE FROM history_exercises")
+    for table in tables:
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        select = ', '.join(REMAPPED_COLUMNS[table].get(c, c) for c in columns)
+        conn.execute(f"""
+            WITH RECURSIVE copies(k) AS (SELECT 1 UNION ALL SELECT k + 1 FROM copies WHERE k < :copies)
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {select} FROM {table}, copies
+        """, params)
+    conn.commit()
+
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in REMAPPED_COLUMNS}
+    conn.close()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a scaled-up synthetic training database for benchmarks')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Source SQLite database')
+    parser.add_argument('-o', '--out', dest='dest_path', required=True, help='Synthetic database to write')
+    parser.add_argument('--factor', type=int, default=100, help='Number of copies of the history')
+    parser.add_argument('--history-only', action='store_true',
+                        help='Only scale the history table (no sets), for timestamp analyses')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = synthesize(args.db_path, args.dest_path, args.factor, args.history_only)
+    print(f"Wrote {args.dest_path} in {time.perf_counter() - started:.1f}s: "
+          + ', '.join(f"{table} {count:,}" for table, count in counts.items()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Rolling training load over the dense daily series.
+
+Every metric is a trailing window over one value per calendar day (the day
+index's volume, or Polar cardio load): a running sum adds the day entering the
+window and subtracts the day leaving it, so a whole history costs O(days)
+whatever the window length, instead of one range query per day.
+
+  - acute: total load of the last 7 days
+  - chronic: average weekly load of the last 28 days (28-day total / 4)
+  - acwr: acute:chronic workload ratio, acute / chronic
+  - monotony: mean / standard deviation of the last 7 daily loads (Foster)
+
+    python training_load.py --last 14
+    python training_load.py --benchmark
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from array import array
+from datetime import date, timedelta
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+MONOTONY_DAYS = 7
+
+# Running sums pick up rounding error as days enter and leave the window; totals
+# and variances this close to zero (relative to the load) are treated as zero
+ZERO_LOAD = 1e-6
+ZERO_VARIANCE = 1e-9
+
+class RollingWindow:
+    """Trailing sum and sum of squares over the last `days` values fed to add()."""
+
+    __slots__ = ('days', 'values', 'total', 'squares')
+
+    def __init__(self, days):
+        self.days = days
+        self.values = array('d', bytes(8 * days))  # ring buffer, zero before the first day
+        self.total = 0.0
+        self.squares = 0.0
+
+    def add(self, i, value):
+        """Push the value of day i, dropping day i - days."""
+        slot = i % self.days
+        old = self.values[slot]
+        self.values[slot] = value
+        self.total += value - old
+        self.squares += value * value - old * old
+        if abs(self.total) < ZERO_LOAD:
+            self.total = self.squares = 0.0
+
+    def mean(self):
+        return self.total / self.days
+
+    def sd(self):
+        mean = self.mean()
+        variance = self.squares / self.days - mean * mean
+        return math.sqrt(variance) if variance > ZERO_VARIANCE * mean * mean else 0.0
+
+def rolling_load(values, acute_days=ACUTE_DAYS, chronic_days=CHRONIC_DAYS, monotony_days=MONOTONY_DAYS):
+    """Acute, chronic, ACWR and monotony arrays for a dense daily series in one pass.
+
+    Days before the series starts count as zero load. ACWR and monotony are NaN
+    where they are undefined (no chronic load; a constant week).
+    """
+    n = len(values)
+    acute, chronic, acwr, monotony = (array('d', bytes(8 * n)) for _ in range(4))
+    acute_window = RollingWindow(acute_days)
+    chronic_window = RollingWindow(chronic_days)
+    monotony_window = acute_window if monotony_days == acute_days else RollingWindow(monotony_days)
+    weeks = chronic_days / 7
+    nan = math.nan
+
+    for i, value in enumerate(values):
+        acute_window.add(i, value)
+        chronic_window.add(i, value)
+        if monotony_window is not acute_window:
+            monotony_window.add(i, value)
+
+        acute[i] = acute_window.total
+        chronic[i] = chronic_load = chronic_window.total / weeks
+        acwr[i] = acute_window.total / chronic_load if chronic_load else nan
+        sd = monotony_window.sd()
+        monotony[i] = monotony_window.mean() / sd if sd else nan
+
+    return {'acute': acute, 'chronic': chronic, 'acwr': acwr, 'monotony': monotony}
+
+def rounded(values, digits):
+    """JSON-ready list: values rounded to `digits` (ints for 0), NaN as None."""
+    if digits == 0:
+        return [None if math.isnan(v) else int(round(v)) for v in values]
+    return [None if math.isnan(v) else round(v, digits) for v in values]
+
+def cardio_series(polar_calendar, start, days):
+    """Dense per-day Polar cardio load from `start`; None when no session has a cardio load."""
+    series = array('d', bytes(8 * days))
+    found = False
+    for date_str, day in polar_calendar.items():
+        if day.get('cardioLoad') is None:
+            continue
+        i = (date.fromisoformat(date_str) - start).days
+        if 0 <= i < days:
+            series[i] += day['cardioLoad']
+            found = True
+    return series if found else None
+
+def build_training_load(day_index, polar_calendar=None):
+    """The trainingLoad section: parallel per-day arrays from startDate to the last day with data.
+
+    Lifting load is the day index's volume; cardio load (when Polar sessions
+    carry one) is aligned on the same days. The span covers both sources.
+    """
+    polar_calendar = polar_calendar or {}
+    cardio_days = [d for d, day in polar_calendar.items() if day.get('cardioLoad') is not None]
+    bounds = [date.fromisoformat(d) for d in (min(cardio_days), max(cardio_days))] if cardio_days else []
+    if day_index.days:
+        bounds += [day_index.start, day_index.end]
+    if not bounds:
+        return {'startDate': None, 'acuteDays': ACUTE_DAYS, 'chronicDays': CHRONIC_DAYS, 'days': 0,
+                'lifting': None, 'cardio': None, 'current': None}
+
+    start, end = min(bounds), max(bounds)
+    days = (end - start).days + 1
+    lead = (day_index.start - start).days if day_index.days else 0
+
+    section = {
+        'startDate': start.isoformat(),
+        'acuteDays': ACUTE_DAYS,
+        'chronicDays': CHRONIC_DAYS,
+        'days': days,
+        'lifting': {},
+        'cardio': None,
+    }
+    loads = {}
+    for unit in ('Lbs', 'Kg'):
+        volume = array('d', bytes(8 * days))
+        if day_index.days:
+            volume[lead:lead + day_index.days] = day_index.values['volume' + unit]
+        loads[unit] = load = rolling_load(volume)
+        section['lifting']['acute' + unit] = rounded(load['acute'], 0)
+        section['lifting']['chronic' + unit] = rounded(load['chronic'], 0)
+    # The ratios are unit-free
+    section['lifting']['acwr'] = rounded(loads['Lbs']['acwr'], 2)
+    section['lifting']['monotony'] = rounded(loads['Lbs']['monotony'], 2)
+
+    cardio = cardio_series(polar_calendar, start, days)
+    if cardio is not None:
+        load = rolling_load(cardio)
+        section['cardio'] = {
+            'acute': rounded(load['acute'], 1),
+            'chronic': rounded(load['chronic'], 1),
+            'acwr': rounded(load['acwr'], 2),
+        }
+
+    section['current'] = current_load(section, days - 1)
+    return section
+
+def current_load(section, i):
+    """The metrics of day i of a trainingLoad section as one flat dict."""
+    current = {'date': (date.fromisoformat(section['startDate']) + timedelta(days=i)).isoformat()}
+    for name, values in section['lifting'].items():
+        current[name] = values[i]
+    for name, values in (section['cardio'] or {}).items():
+        current['cardio' + name[0].upper() + name[1:]] = values[i]
+    return current
+
+def benchmark(lengths=(1000, 10000, 100000, 1000000), seed=0):
+    """Time rolling_load on random series of each length; returns (days, seconds) pairs."""
+    rng = random.Random(seed)
+    results = []
+    for n in lengths:
+        # Roughly every other day is a training day
+        values = array('d', (rng.uniform(5000, 40000) if rng.random() < 0.5 else 0.0 for _ in range(n)))
+        started = time.perf_counter()
+        rolling_load(values)
+        results.append((n, time.perf_counter() - started))
+    return results
+
+def main():
+    import extract_data
+
+    parser = argparse.ArgumentParser(description='Rolling training load (acute, chronic, ACWR, monotony)')
+    parser.add_argument('-d', '--db', dest='db_path', default=extract_data.DB_PATH, help='Path to SQLite database file')
+    parser.add_argument('--polar-dir', default=extract_data.POLAR_DIR, help='Polar training-session directory')
+    parser.add_argument('--timezone', type=extract_data.timezone_name, default=extract_data.DEFAULT_TIMEZONE,
+                        help='IANA timezone for assigning workouts to days')
+    parser.add_argument('--last', type=int, default=14, metavar='DAYS', help='Print the last DAYS days')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Time the engine on synthetic series of growing length instead')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for n, seconds in benchmark():
+            print(f"{n:>9,} days: {seconds:.3f}s ({seconds / n * 1e6:.2f} us/day)")
+        return
+
+    conn = extract_data.connect_db(args.db_path, timezone=args.timezone)
+    day_index = extract_data.get_day_index(conn)
+    conn.close()
+    section = build_training_load(day_index, extract_data.get_polar_sessions(args.polar_dir)[0])
+
+    days = [current_load(section, i) for i in range(max(0, section['days'] - args.last), section['days'])]
+    print(json.dumps(days, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Watch mode: keep the dashboard data in sync with MyApp.db and the Polar export.
+
+The database file (with its -wal/-journal siblings) and the Polar directory are
+monitored with inotify on Linux and by polling elsewhere. Once a burst of
+changes settles (debounce), the tables of a changed database are fingerprinted
+(see section_cache.py) and only the sections that read a changed table, the
+Polar export or (after midnight) the current date are recomputed, merged into
+the previous dataset, and the output files are swapped in atomically. The
+SQLite connection and parsed Polar sessions stay warm between refreshes, so a
+refresh only pays for the sections it reruns.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import extract_data
+from section_cache import table_fingerprints
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+class InotifyWatcher:
+    """Wakes up when the kernel reports activity in any of the watched directories."""
+
+    def __init__(self, directories):
+        self.directories = directories
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._arm()
+
+    def _arm(self):
+        # Re-adding an existing watch is a no-op; this also picks up a Polar
+        # directory created after startup
+        for directory in self.directories:
+            if os.path.isdir(directory):
+                if self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+                    raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {directory}')
+
+    def wait(self, timeout=None):
+        """Block until events arrive (True) or timeout seconds pass (False)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        self._arm()
+        return True
+
+    def settle(self, debounce):
+        """Return once no events have arrived for debounce seconds."""
+        while self.wait(debounce):
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for platforms without inotify: wake up every interval seconds."""
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    def wait(self, timeout=None):
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        return True
+
+    def settle(self, debounce):
+        time.sleep(debounce)
+
+    def close(self):
+        pass
+
+def make_watcher(directories, poll_interval):
+    """Use inotify where the platform offers it, otherwise poll."""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(poll_interval)
+
+def seconds_until_midnight():
+    """Seconds until the next local midnight, when the sections relative to today go stale."""
+    now = datetime.now()
+    return (datetime.combine(now.date() + timedelta(days=1), datetime.min.time()) - now).total_seconds()
+
+def run_extraction(conn, polar_dir, polar_cache, sections, verbose):
+    """Extract the given sections; per-section progress lines stay out of the log unless verbose."""
+    return extract_data.extract_all(conn, polar_dir, sections=sections, polar_cache=polar_cache,
+                                    progress=verbose)
+
+def run_watch(db_path, output_path, polar_dir=extract_data.POLAR_DIR, debounce=2.0, poll_interval=5.0,
+              verbose=False, timezone=None):
+    """Extract once, then re-extract affected sections whenever the inputs change."""
+    conn = extract_data.connect_db(db_path, timezone=timezone)
+    polar_cache = {}
+
+    state = extract_data.source_signatures(db_path, polar_dir)
+    tables = table_fingerprints(conn, extract_data.DB_TABLES)
+    today = date.today()
+    started = time.perf_counter()
+    data = run_extraction(conn, polar_dir, polar_cache, None, verbose)
+    extract_data.write_outputs(data, output_path, verbose=verbose)
+    print(f"Initial extraction: {len(data)} sections in {time.perf_counter() - started:.2f}s")
+
+    watcher = make_watcher([os.path.dirname(os.path.abspath(db_path)), polar_dir], poll_interval)
+    mode = 'inotify' if isinstance(watcher, InotifyWatcher) else f'polling every {poll_interval:g}s'
+    print(f"Watching {db_path} and {polar_dir} ({mode}); press Ctrl+C to stop")
+
+    try:
+        while True:
+            # Wake up at midnight even without file activity, to refresh the date-relative sections
+            watcher.wait(seconds_until_midnight() + 1)
+            current = extract_data.source_signatures(db_path, polar_dir)
+            if current == state and date.today() == today:
+                continue
+
+            if current != state:
+                # Debounce: wait until the inputs stop changing (a sync copies in many writes)
+                while True:
+                    watcher.settle(debounce)
+                    latest = extract_data.source_signatures(db_path, polar_dir)
+                    if latest == current:
+                        break
+                    current = latest
+
+            changed = [source for source in ('db', 'polar') if current[source] != state[source]]
+            latest_tables = tables
+            if 'db' in changed:
+                old_inode = state['db'][0][1] if state['db'] else None
+                new_inode = current['db'][0][1] if current['db'] else None
+                if old_inode != new_inode:
+                    # The file was replaced rather than written in place; the open
+                    # connection still points at the old inode
+                    conn.close()
+                    conn = extract_data.connect_db(db_path, timezone=timezone)
+                else:
+                    conn.memo.clear()
+                latest_tables = table_fingerprints(conn, extract_data.DB_TABLES)
+            latest_today = date.today()
+
+            # Narrow 'db' down to the tables whose contents changed
+            reads = [table for table in extract_data.DB_TABLES if latest_tables[table] != tables[table]]
+            if 'polar' in changed:
+                reads.append('polar')
+            if latest_today != today:
+                reads.append('today')
+            if not reads:
+                state = current
+                print(f"[{time.strftime('%H:%M:%S')}] database written but no extracted table changed")
+                continue
+
+            sections = extract_data.sections_reading(reads)
+            started = time.perf_counter()
+            try:
+                data.update(run_extraction(conn, polar_dir, polar_cache, sections, verbose))
+                extract_data.write_outputs(data, output_path, verbose=verbose)
+            except Exception as e:
+                # Keep the previous state so the next change retries the refresh
+                print(f"[{time.strftime('%H:%M:%S')}] Refresh failed: {type(e).__name__}: {e}")
+                continue
+
+            state, tables, today = current, latest_tables, latest_today
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"[{time.strftime('%H:%M:%S')}] {', '.join(reads)} changed: "
+                  f"refreshed {len(sections)} sections ({', '.join(sections)}) in {elapsed_ms:.0f} ms")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.close()
+        conn.close()
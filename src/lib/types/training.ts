@@ -56,11 +56,27 @@ export interface YearlyTimeSeriesPoint {
 	workouts: number;
 }
 
+export interface IsoWeeklyTimeSeriesPoint {
+	isoWeek: string;
+	volumeLbs: number;
+	volumeKg: number;
+	workouts: number;
+}
+
+export interface QuarterlyTimeSeriesPoint {
+	quarter: string;
+	volumeLbs: number;
+	volumeKg: number;
+	workouts: number;
+}
+
 export interface VolumeTimeSeries {
 	daily: TimeSeriesPoint[];
 	weekly: WeeklyTimeSeriesPoint[];
 	monthly: MonthlyTimeSeriesPoint[];
 	yearly: YearlyTimeSeriesPoint[];
+	isoWeekly?: IsoWeeklyTimeSeriesPoint[];
+	quarterly?: QuarterlyTimeSeriesPoint[];
 }
 
 export interface PolarDayData {
@@ -100,6 +116,27 @@ export interface WorkoutCalendarDay {
 	polar?: PolarDayData;
 }
 
+/**
+ * Dense workoutCalendar: `runs` alternates rest-day and active-day run lengths
+ * from startDate; the other arrays hold one entry per active day, and each
+ * Polar field is a column with null on days without a session
+ */
+export interface DenseWorkoutCalendar {
+	startDate: string | null;
+	days: number;
+	runs: number[];
+	count: number[];
+	volumeLbs: number[];
+	volumeKg: number[];
+	polar: { [K in keyof PolarDayData]-?: (PolarDayData[K] | null)[] } | null;
+}
+
+/** workoutCalendar as extracted now (dense) or by older extractor versions (keyed by date) */
+export type WorkoutCalendar =
+	| DenseWorkoutCalendar
+	| WorkoutCalendarDay[]
+	| Record<string, Omit<WorkoutCalendarDay, 'date'>>;
+
 export interface PRRecord {
 	date: string;
 	weightLbs: number;
@@ -337,6 +374,46 @@ export interface BodyWeight {
 		endDate: string;
 		days: number;
 	}[];
+	rollingAverages?: {
+		windowDays: number[];
+		dates: string[];
+		avg7Lbs: (number | null)[];
+		avg7Kg: (number | null)[];
+		avg30Lbs: (number | null)[];
+		avg30Kg: (number | null)[];
+	};
+}
+
+// Downsampled (LTTB) levels of a series: index lists into the full series, keyed by point budget.
+// Budgets at or above the series length are absent; the full series is that level.
+export type SeriesLevels = Record<string, number[]>;
+
+export interface ChartLevels {
+	budgets: number[];
+	volumeDaily: SeriesLevels;
+	e1rm: Record<string, SeriesLevels>;
+}
+
+// Rolling load per day from startDate; arrays are parallel, one entry per day
+export interface TrainingLoad {
+	startDate: string | null;
+	acuteDays: number;
+	chronicDays: number;
+	days: number;
+	lifting: {
+		acuteLbs: number[];
+		chronicLbs: number[];
+		acuteKg: number[];
+		chronicKg: number[];
+		acwr: (number | null)[];
+		monotony: (number | null)[];
+	} | null;
+	cardio: {
+		acute: number[];
+		chronic: number[];
+		acwr: (number | null)[];
+	} | null;
+	current: Record<string, string | number | null> | null;
 }
 
 export interface RelativeStrengthRecord {
@@ -402,7 +479,7 @@ export interface RelativeStrength {
 export interface TrainingData {
 	summary: Summary;
 	volumeTimeSeries: VolumeTimeSeries;
-	workoutCalendar: WorkoutCalendarDay[];
+	workoutCalendar: WorkoutCalendar;
 	exerciseProgress: Record<string, ExerciseProgress>;
 	bigThreeE1RM: BigThreeE1RM;
 	bigThreeVolume: BigThreeVolume;
@@ -417,6 +494,7 @@ export interface TrainingData {
 	barTravel: BarTravel;
 	bodyWeight: BodyWeight;
 	relativeStrength: RelativeStrength;
+	trainingLoad?: TrainingLoad;
 }
 
 // Split data types for lazy loading optimization
@@ -437,7 +515,7 @@ export interface CoreTrainingData {
 
 export interface DeferredTrainingData {
 	volumeTimeSeriesDaily: TimeSeriesPoint[];
-	workoutCalendar: WorkoutCalendarDay[];
+	workoutCalendar: WorkoutCalendar;
 	exerciseProgress: Record<string, ExerciseProgress>;
 	bigThreeE1RM: BigThreeE1RM;
 	bigThreeVolume: BigThreeVolume;
@@ -449,6 +527,9 @@ export interface DeferredTrainingData {
 	bodyWeight: BodyWeight;
 	relativeStrength: RelativeStrength;
 	polarMonthly?: PolarMonthlyPoint[];
+	chartLevels?: ChartLevels;
+	/** Content hash written by the extractor; deltas go from one version to the next */
+	version?: string;
 }
 
 // Unit system types
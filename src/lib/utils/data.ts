@@ -1,3 +1,10 @@
+import type {
+	DenseWorkoutCalendar,
+	PolarDayData,
+	WorkoutCalendar,
+	WorkoutCalendarDay
+} from '$lib/types/training';
+
 /**
  * Simple memoization helper for expensive calculations
  */
@@ -87,3 +94,168 @@ export const rollingAverage = memoize((values: number[], windowSize: number): nu
 	}
 	return result;
 });
+
+/**
+ * Minimum points a downsampled level must show in the visible window before
+ * a chart draws it instead of a finer level
+ */
+export const MIN_VISIBLE_POINTS = 150;
+
+/**
+ * Pick the coarsest downsampled level (LTTB index list) that still shows
+ * minVisible points between start and end (inclusive YYYY-MM-DD), or null for
+ * the full series
+ */
+export function chooseLevel<T extends { date: string }>(
+	points: T[],
+	levels: Record<string, number[]> | undefined,
+	start: string,
+	end: string,
+	minVisible: number = MIN_VISIBLE_POINTS
+): number[] | null {
+	if (!levels) return null;
+	const budgets = Object.keys(levels)
+		.map(Number)
+		.sort((a, b) => a - b);
+	for (const budget of budgets) {
+		const indices = levels[String(budget)];
+		let visible = 0;
+		for (const i of indices) {
+			const date = points[i]?.date;
+			if (date && date >= start && date <= end) visible++;
+		}
+		if (visible >= minVisible) return indices;
+	}
+	return null;
+}
+
+/**
+ * Points of a downsampled level, or the full series when indices is null
+ */
+export function pickLevel<T>(points: T[], indices: number[] | null): T[] {
+	if (!indices) return points;
+	return indices.map((i) => points[i]).filter((point) => point !== undefined);
+}
+
+const DAY_MS = 86_400_000;
+
+/**
+ * Workout calendar as typed columns: `row` maps each day offset from startMs
+ * to its active-day row (-1 on rest days), and the other arrays are indexed by
+ * row
+ */
+export interface CalendarColumns {
+	startMs: number;
+	days: number;
+	row: Int32Array;
+	year: Uint16Array;
+	count: Uint32Array;
+	volumeLbs: Float64Array;
+	volumeKg: Float64Array;
+	polar: DenseWorkoutCalendar['polar'];
+}
+
+/**
+ * Dense encoding of a calendar keyed by date, as written by older extractors
+ */
+function denseFromDays(days: WorkoutCalendarDay[]): DenseWorkoutCalendar {
+	const sorted = [...days].sort((a, b) => (a.date < b.date ? -1 : a.date > b.date ? 1 : 0));
+	const calendar: DenseWorkoutCalendar = {
+		startDate: sorted.length ? sorted[0].date : null,
+		days: 0,
+		runs: [],
+		count: [],
+		volumeLbs: [],
+		volumeKg: [],
+		polar: null
+	};
+	if (!sorted.length) return calendar;
+
+	const startMs = Date.parse(sorted[0].date);
+	const polarDays = sorted.some((day) => day.polar);
+	const polar: Record<string, unknown[]> = {};
+	let nextOffset = 0;
+	sorted.forEach((day, i) => {
+		const offset = Math.round((Date.parse(day.date) - startMs) / DAY_MS);
+		if (calendar.runs.length && offset === nextOffset) {
+			calendar.runs[calendar.runs.length - 1]++;
+		} else {
+			calendar.runs.push(offset - nextOffset, 1);
+		}
+		nextOffset = offset + 1;
+		calendar.count.push(day.count);
+		calendar.volumeLbs.push(day.volumeLbs);
+		calendar.volumeKg.push(day.volumeKg);
+		if (polarDays && day.polar) {
+			for (const [field, value] of Object.entries(day.polar)) {
+				if (!polar[field]) polar[field] = new Array(sorted.length).fill(null);
+				polar[field][i] = value;
+			}
+		}
+	});
+	calendar.days = nextOffset;
+	if (polarDays) calendar.polar = polar as unknown as DenseWorkoutCalendar['polar'];
+	return calendar;
+}
+
+/**
+ * Decode a workoutCalendar (dense, or keyed by date from older extractors)
+ * into typed columns indexed by day offset
+ */
+export function decodeCalendar(data: WorkoutCalendar | null | undefined): CalendarColumns {
+	let dense: DenseWorkoutCalendar;
+	if (Array.isArray(data)) {
+		dense = denseFromDays(data);
+	} else if (data && 'runs' in data && Array.isArray(data.runs)) {
+		dense = data as DenseWorkoutCalendar;
+	} else {
+		const keyed = (data ?? {}) as Record<string, Omit<WorkoutCalendarDay, 'date'>>;
+		dense = denseFromDays(Object.entries(keyed).map(([date, day]) => ({ date, ...day })));
+	}
+
+	const rows = dense.count.length;
+	const startMs = dense.startDate ? Date.parse(dense.startDate) : 0;
+	const columns: CalendarColumns = {
+		startMs,
+		days: dense.days,
+		row: new Int32Array(dense.days).fill(-1),
+		year: new Uint16Array(rows),
+		count: Uint32Array.from(dense.count),
+		volumeLbs: Float64Array.from(dense.volumeLbs),
+		volumeKg: Float64Array.from(dense.volumeKg),
+		polar: dense.polar
+	};
+
+	let offset = 0;
+	let row = 0;
+	for (let i = 0; i + 1 < dense.runs.length; i += 2) {
+		offset += dense.runs[i];
+		for (let j = 0; j < dense.runs[i + 1] && row < rows; j++, offset++, row++) {
+			columns.row[offset] = row;
+			columns.year[row] = new Date(startMs + offset * DAY_MS).getUTCFullYear();
+		}
+	}
+	return columns;
+}
+
+/**
+ * Active-day row of a YYYY-MM-DD date, or -1 for a rest day or a date outside the calendar
+ */
+export function calendarRow(columns: CalendarColumns, date: string): number {
+	const offset = Math.round((Date.parse(date) - columns.startMs) / DAY_MS);
+	return offset >= 0 && offset < columns.days ? columns.row[offset] : -1;
+}
+
+/**
+ * Polar data of an active-day row, or undefined when the day has no session
+ */
+export function calendarPolar(columns: CalendarColumns, row: number): PolarDayData | undefined {
+	const polar = columns.polar;
+	const avgHr = row >= 0 ? polar?.avgHr?.[row] : undefined;
+	if (!polar || avgHr === null || avgHr === undefined) return undefined;
+	const day: Record<string, unknown> = {};
+	for (const [field, values] of Object.entries(polar)) {
+		day[field] = values[row];
+	}
+	return day as unknown as PolarDayData;
+}
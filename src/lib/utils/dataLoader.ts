@@ -1,14 +1,140 @@
 /**
  * Data loader utility with caching for deferred training data
+ *
+ * The last loaded copy is kept in localStorage with its version. On the next
+ * visit the small delta file is fetched instead; if it starts at the stored
+ * version it is applied, otherwise the full file is fetched.
  */
 
 import type { DeferredTrainingData } from '$lib/types/training';
 import { base } from '$app/paths';
+import { browser } from '$app/environment';
+
+const STORAGE_KEY = 'training_deferred';
+
+/**
+ * One change between two versions (see scripts/delta.py)
+ */
+export type DeltaOp =
+	| { op: 'replace'; value: unknown }
+	| { op: 'patch'; fields: Record<string, DeltaOp>; remove?: string[] }
+	| { op: 'splice'; start: number; end: number; items: unknown[] };
+
+export interface DeferredDelta {
+	from: string;
+	to: string;
+	sections: Record<string, DeltaOp>;
+	remove: string[];
+}
 
 // Cache for deferred data
 let deferredDataCache: DeferredTrainingData | null = null;
 let loadingPromise: Promise<DeferredTrainingData> | null = null;
 
+/**
+ * Apply one delta op to a value, returning the new value (the input is not modified)
+ */
+export function applyDeltaOp(value: unknown, op: DeltaOp): unknown {
+	switch (op.op) {
+		case 'replace':
+			return op.value;
+		case 'patch': {
+			if (typeof value !== 'object' || value === null || Array.isArray(value)) {
+				throw new Error('Delta patch applied to a non-object');
+			}
+			const result: Record<string, unknown> = { ...(value as Record<string, unknown>) };
+			for (const key of op.remove ?? []) {
+				delete result[key];
+			}
+			for (const [key, fieldOp] of Object.entries(op.fields)) {
+				result[key] = applyDeltaOp(result[key], fieldOp);
+			}
+			return result;
+		}
+		case 'splice': {
+			if (!Array.isArray(value) || op.end > value.length) {
+				throw new Error('Delta splice out of range');
+			}
+			return [...value.slice(0, op.start), ...op.items, ...value.slice(op.end)];
+		}
+	}
+}
+
+/**
+ * Bring a stored copy up to the delta's target version
+ */
+export function applyDeferredDelta(
+	data: DeferredTrainingData,
+	delta: DeferredDelta
+): DeferredTrainingData {
+	if (data.version !== delta.from) {
+		throw new Error(`Delta starts at ${delta.from}, not ${data.version}`);
+	}
+	const result = applyDeltaOp(data, {
+		op: 'patch',
+		fields: delta.sections,
+		remove: delta.remove
+	}) as DeferredTrainingData;
+	result.version = delta.to;
+	return result;
+}
+
+function readStored(): DeferredTrainingData | null {
+	if (!browser) return null;
+	try {
+		const stored = localStorage.getItem(STORAGE_KEY);
+		return stored ? (JSON.parse(stored) as DeferredTrainingData) : null;
+	} catch {
+		return null;
+	}
+}
+
+function store(data: DeferredTrainingData): void {
+	if (!browser || !data.version) return;
+	try {
+		localStorage.setItem(STORAGE_KEY, JSON.stringify(data));
+	} catch {
+		// Over quota: the next visit fetches the full file again
+		localStorage.removeItem(STORAGE_KEY);
+	}
+}
+
+async function fetchJson<T>(path: string): Promise<T> {
+	const response = await fetch(`${base}/data/${path}`, { cache: 'no-cache' });
+	if (!response.ok) {
+		throw new Error(`Failed to load ${path}: ${response.statusText}`);
+	}
+	return response.json();
+}
+
+/**
+ * Update the stored copy with the current delta; null when it cannot be used
+ */
+async function loadFromDelta(stored: DeferredTrainingData): Promise<DeferredTrainingData | null> {
+	try {
+		const delta = await fetchJson<DeferredDelta>('training_deferred.delta.json');
+		if (delta.to === stored.version) return stored;
+		if (delta.from !== stored.version) return null;
+		return applyDeferredDelta(stored, delta);
+	} catch {
+		return null;
+	}
+}
+
+async function fetchDeferredData(): Promise<DeferredTrainingData> {
+	const stored = readStored();
+	const updated = stored?.version ? await loadFromDelta(stored) : null;
+	if (updated) {
+		if (updated !== stored) store(updated);
+		return updated;
+	}
+
+	// No stored copy, or it is not the delta's starting version
+	const data = await fetchJson<DeferredTrainingData>('training_deferred.json');
+	store(data);
+	return data;
+}
+
 /**
  * Load deferred training data from the server
  * Uses caching to avoid multiple fetches
@@ -25,13 +151,7 @@ export async function loadDeferredData(): Promise<DeferredTrainingData> {
 	}
 
 	// Start loading
-	loadingPromise = fetch(`${base}/data/training_deferred.json`)
-		.then((response) => {
-			if (!response.ok) {
-				throw new Error(`Failed to load deferred data: ${response.statusText}`);
-			}
-			return response.json();
-		})
+	loadingPromise = fetchDeferredData()
 		.then((data: DeferredTrainingData) => {
 			deferredDataCache = data;
 			loadingPromise = null;
@@ -58,4 +178,5 @@ export function isDeferredDataLoaded(): boolean {
 export function clearDeferredDataCache(): void {
 	deferredDataCache = null;
 	loadingPromise = null;
+	if (browser) localStorage.removeItem(STORAGE_KEY);
 }